@@ -33,21 +33,29 @@
 # 標準庫
 # =============================================================================
 import base64
-import io
+import json
 import logging
+import multiprocessing
 import os
 import random
+import re
 import select
 import socket
 import sys
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
+import urllib.request
+from collections import deque
+from concurrent.futures import (
+    Future, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError,
+    as_completed, wait as wait_futures,
+)
 from contextlib import contextmanager, suppress
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
+from multiprocessing import resource_tracker, shared_memory
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Protocol, Set, Tuple, Union
+from typing import Any, Callable, Deque, Dict, FrozenSet, List, Optional, Protocol, Set, Tuple, Union
 
 # =============================================================================
 # 全域輸出緩衝設置 - 避免多執行緒環境下的輸出阻塞
@@ -86,10 +94,13 @@ from selenium.common.exceptions import (
     StaleElementReferenceException,
     ElementNotInteractableException,
     NoSuchElementException,
+    InvalidSessionIdException,
+    NoSuchWindowException,
 )
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
+import websocket  # websocket-client（selenium 的依賴套件），CDP 事件通道使用
 
 
 # =============================================================================
@@ -133,6 +144,7 @@ class Constants:
     DEFAULT_CREDENTIALS_FILE: str = "用戶資料.txt"
     DEFAULT_RULES_FILE: str = "用戶規則.txt"
     DEFAULT_SETTINGS_FILE: str = "用戶設定.txt"
+    DEFAULT_NETWORK_RULES_FILE: str = "網路狀態規則.txt"
     
     # =========================================================================
     # 代理伺服器配置
@@ -187,6 +199,25 @@ class Constants:
     MAX_THREAD_WORKERS: int = 10
     MAX_BROWSER_COUNT: int = 16
     
+    # 瀏覽器任務優先權（數字越小越先執行，同優先權依提交順序）
+    TASK_PRIORITY_RECOVERY: int = 0            # 恢復任務（插隊到一般任務之前）
+    TASK_PRIORITY_NORMAL: int = 1              # 一般任務
+    TASK_PRIORITY_LEVELS: int = 2              # 優先權層數
+    # 控制面板並行操作執行緒池（錯誤監控、指令與規則執行可能同時對所有瀏覽器操作）
+    FANOUT_WORKERS_PER_BROWSER: int = 3        # 每個瀏覽器的執行緒數
+    FANOUT_SLOW_BROWSER_FACTOR: float = 2.0    # 平均耗時超過所有瀏覽器中位數的倍數時列為慢速瀏覽器
+    FANOUT_SLOW_BROWSER_MIN_SAMPLES: int = 3   # 列為慢速瀏覽器所需的最少執行次數
+    
+    # 瀏覽器存活檢查（心跳執行緒定期檢查並快取結果，熱循環只讀快取）
+    BROWSER_HEARTBEAT_INTERVAL: float = 5.0    # 心跳檢查間隔（秒），0 表示停用（每次查詢都實際檢查）
+    BROWSER_LIVENESS_STALE_FACTOR: float = 3.0 # 快取超過「間隔 × 此倍數」時改為即時檢查（心跳停止時的保險）
+    # 代表瀏覽器或 WebDriver 連線已中斷的錯誤關鍵字（發生時立即標記為離線）
+    BROWSER_DEAD_ERROR_KEYWORDS: Tuple[str, ...] = (
+        'chrome not reachable', 'disconnected', 'session deleted', 'invalid session id',
+        'no such window', 'target window already closed', 'web view not found',
+        'connection refused', 'max retries exceeded', 'failed to establish a new connection',
+    )
+    
     # =========================================================================
     # 視窗配置
     # =========================================================================
@@ -256,6 +287,19 @@ class Constants:
     DETECTION_PROGRESS_INTERVAL: int = 20
     RECOVERY_DETECTION_ATTEMPTS: int = 30  # 恢復流程檢測最大次數
     
+    # =========================================================================
+    # 檢測等待輪詢配置
+    # =========================================================================
+    # 等待畫面出現/消失的循環以短間隔開始，畫面持續沒有變化時間隔逐次乘以倍數
+    # （加上隨機抖動），最長不超過上限；觀察到畫面變化時回到最短間隔
+    # 格式: 呼叫位置 → (最短間隔秒數, 最長間隔秒數, 倍數)
+    WAIT_POLL_PROFILES: Dict[str, Tuple[float, float, float]] = {
+        "lobby": (0.3, 4.0, 1.5),       # 登入流程：等待所有瀏覽器的畫面出現或消失（遊戲載入較慢）
+        "recovery": (0.3, 3.0, 1.5),    # 恢復流程：等待單一瀏覽器的畫面消失
+    }
+    WAIT_POLL_JITTER: float = 0.2             # 間隔隨機抖動比例（±20%），避免多個瀏覽器同時截圖
+    RECOVERY_RECLICK_INTERVAL: float = 20.0   # 恢復流程等待圖片消失時，重新點擊按鈕的間隔（秒）
+    
     # =========================================================================
     # Canvas 點擊座標比例
     # =========================================================================
@@ -341,6 +385,16 @@ class Constants:
     BLACKSCREEN_CROP_MARGIN_X: int = 100
     BLACKSCREEN_CROP_MARGIN_Y: int = 50
     
+    # 黑屏檢測方式: "template"（模板比對）或 "luminance"（亮度統計，不需模板）
+    # 亮度統計無法計算區域時改用模板比對
+    BLACKSCREEN_DETECTION_MODES: Tuple[str, ...] = ("template", "luminance")
+    BLACKSCREEN_DETECTION_MODE: str = "template"
+    BLACKSCREEN_LUMA_SAMPLE_SIZE: Tuple[int, int] = (64, 32)  # 亮度統計前的縮圖尺寸 (寬, 高)
+    BLACKSCREEN_LUMA_MAX_MEAN: float = 16.0        # 平均亮度上限（0-255）
+    BLACKSCREEN_LUMA_MAX_STDDEV: float = 8.0       # 亮度標準差上限
+    BLACKSCREEN_LUMA_DARK_LEVEL: int = 32          # 亮度低於此值視為暗像素
+    BLACKSCREEN_LUMA_MIN_DARK_RATIO: float = 0.98  # 暗像素比例下限
+    
     # =========================================================================
     # 錯誤提醒模板配置
     # =========================================================================
@@ -363,6 +417,160 @@ class Constants:
     LOBBY_RETURN_BUTTON_X_RATIO: float = 0.5      # 返回大廳按鈕 X 座標比例
     LOBBY_RETURN_BUTTON_Y_RATIO: float = 0.72     # 返回大廳按鈕 Y 座標比例
     
+    # =========================================================================
+    # 模板搜尋區域（ROI）配置
+    # =========================================================================
+    # 固定位置的模板只在截圖上的已知區域內搜尋，不必掃描整張截圖
+    # 格式: 模板檔名 → (中心 X 比例, 中心 Y 比例, 水平搜尋邊距, 垂直搜尋邊距)
+    # 中心比例為整窗截圖比例，與截取模板時（_capture_cropped_template）相同
+    # 搜尋邊距為模板半寬/半高之外額外容許的偏移量（CSS 像素）
+    # LOBBY_RETURN 模板為整窗截圖，不設定 ROI
+    TEMPLATE_ROI: Dict[str, Tuple[float, float, int, int]] = {
+        BLACK_SCREEN: (BLACKSCREEN_CENTER_X, BLACKSCREEN_CENTER_Y, 50, 50),
+        ERROR_REMIND: (ERROR_REMIND_CENTER_X, ERROR_REMIND_CENTER_Y, 50, 50),
+    }
+    CANVAS_GEOMETRY_CACHE_TTL: float = 5.0  # Canvas 位置與視窗尺寸快取有效時間（秒）
+    
+    # 截圖方式：True 時透過 CDP Page.captureScreenshot 只擷取需要比對的區域
+    SCREENSHOT_CLIP_ENABLED: bool = True
+    
+    # =========================================================================
+    # 粗到細金字塔比對配置
+    # =========================================================================
+    # 大範圍搜尋時先以縮小的模板與畫面找出候選位置，再於候選附近以原解析度精修
+    PYRAMID_MATCH_ENABLED: bool = True
+    PYRAMID_FACTORS: Tuple[int, ...] = (4, 2)       # 縮小倍率（依序選用第一個可用的倍率）
+    PYRAMID_MIN_TEMPLATE_SIDE: int = 16             # 縮小後模板最短邊下限（像素）
+    PYRAMID_MIN_SEARCH_PIXELS: int = 300_000        # 搜尋區域像素數低於此值時直接以原解析度比對
+    PYRAMID_CANDIDATES: int = 3                     # 精修的粗比對候選數
+    PYRAMID_SCORE_TOLERANCE: float = 0.15           # 粗比對分數可低於匹配閾值的容許差
+    PYRAMID_REFINE_MARGIN: int = 2                  # 精修範圍在候選位置外額外擴張的像素（原解析度）
+    
+    # =========================================================================
+    # 模板尺寸縮放配置
+    # =========================================================================
+    # 截取模板時將當下的 Canvas 尺寸（截圖像素）記錄在 PNG 旁的描述檔，
+    # 檢測時 Canvas 尺寸不同則改用依比例預先縮放的模板（每個模板 × Canvas 尺寸只縮放一次）
+    TEMPLATE_CANVAS_SUFFIX: str = ".canvas.json"    # 模板 Canvas 尺寸描述檔副檔名（取代 .png）
+    TEMPLATE_RESCALE_TOLERANCE: float = 0.02        # 尺寸比例差異在此範圍內時直接使用原模板
+    
+    # =========================================================================
+    # 視覺處理程序池配置
+    # =========================================================================
+    # thread: 各監控執行緒自行解碼與比對（預設）
+    # process: 監控執行緒只擷取畫面位元組，經共享記憶體交由工作程序解碼與比對
+    VISION_POOL_MODES: Tuple[str, ...] = ("thread", "process")
+    VISION_POOL_MODE: str = "thread"
+    VISION_POOL_WORKERS: int = 0                    # 工作程序數（0 表示 CPU 核心數）
+    VISION_POOL_START_TIMEOUT: float = 30.0         # 等待工作程序啟動的時間（秒）
+    VISION_POOL_TASK_TIMEOUT: float = 10.0          # 單次比對等待結果的逾時時間（秒）
+    VISION_POOL_MIN_BUFFER_SIZE: int = 4 * 1024 * 1024  # 共享記憶體區塊最小容量（位元組）
+    
+    # =========================================================================
+    # CDP 畫面串流配置
+    # =========================================================================
+    # on: 錯誤監控與恢復檢測優先使用 Page.startScreencast 推送的畫面，不輪詢截圖
+    # 畫面只在內容變化時推送，超過 SCREENCAST_MAX_FRAME_AGE 秒沒有新畫面時改回截圖
+    # 串流畫面為有損 JPEG，截圖格式（MONITOR_CAPTURE_FORMAT 等）為無損 png 的檢測不使用串流畫面
+    SCREENCAST_MODES: Tuple[str, ...] = ("off", "on")
+    SCREENCAST_MODE: str = "off"
+    SCREENCAST_FORMAT: str = "jpeg"
+    SCREENCAST_QUALITY: int = 80                    # JPEG 品質（1-100）
+    SCREENCAST_MAX_WIDTH: int = 800                 # 串流畫面最大寬度（像素，超過時等比例縮小）
+    SCREENCAST_MAX_HEIGHT: int = 600                # 串流畫面最大高度（像素）
+    SCREENCAST_EVERY_NTH_FRAME: int = 15            # 每 N 個合成影格推送一張（60 Hz 約每秒 4 張）
+    SCREENCAST_BUFFER_SIZE: int = 8                 # 每個瀏覽器保留的畫面數
+    SCREENCAST_MAX_FRAME_AGE: float = 5.0           # 最新畫面超過此時間（秒）即改用截圖
+    SCREENCAST_RETRY_INTERVAL: float = 30.0         # 串流啟動失敗後重試的間隔（秒）
+    CDP_CHANNEL_CONNECT_TIMEOUT: float = 5.0        # DevTools 連線逾時（秒）
+    CDP_CHANNEL_COMMAND_TIMEOUT: float = 5.0        # CDP 指令等待回應逾時（秒）
+    CDP_CHANNEL_RECV_TIMEOUT: float = 1.0           # 事件接收執行緒檢查關閉的間隔（秒）
+    
+    # =========================================================================
+    # CDP 輸入配置
+    # =========================================================================
+    # devtools: 點擊與按鍵經由分頁的 DevTools WebSocket 一次送出整組輸入事件，只等待一次回應
+    # driver: 每個輸入事件各自經由 chromedriver 的 execute_cdp_cmd 送出（每個事件一次 HTTP 往返）
+    # devtools 無法連線時自動改用 driver，INPUT_DISPATCH_RETRY_INTERVAL 秒後再重新連線
+    INPUT_DISPATCH_MODES: Tuple[str, ...] = ("devtools", "driver")
+    INPUT_DISPATCH_MODE: str = "devtools"
+    INPUT_DISPATCH_TIMEOUT: float = 5.0             # 等待整組輸入事件回應的逾時時間（秒）
+    INPUT_DISPATCH_RETRY_INTERVAL: float = 30.0     # DevTools 連線失敗後重試的間隔（秒）
+    
+    # =========================================================================
+    # 網路狀態感測配置
+    # =========================================================================
+    # on: 監聽遊戲的 WebSocket 訊息與 HTTP 回應，依網路狀態規則判斷錯誤、斷線與返回大廳
+    # 感測正常（NETWORK_SENSOR_IDLE_TIMEOUT 秒內遊戲 WebSocket 有訊息）時，已有規則的狀態不再以截圖比對
+    NETWORK_SENSOR_MODES: Tuple[str, ...] = ("off", "on")
+    NETWORK_SENSOR_MODE: str = "off"
+    NETWORK_RECORD_MODES: Tuple[str, ...] = ("off", "on")
+    NETWORK_RECORD_MODE: str = "off"                # on: 將收到的網路訊息記錄到 NETWORK_RECORD_DIR（供離線重播）
+    NETWORK_RECORD_DIR: str = "network_logs"
+    NETWORK_STATES: Tuple[str, ...] = ("error", "disconnect", "lobby_return", "spin_done")
+    NETWORK_SOURCES: Tuple[str, ...] = ("ws", "http", "close")  # WebSocket 訊息 / HTTP 回應 / WebSocket 關閉
+    # 網路狀態 → 觸發的恢復類型（spin_done 僅記錄，不觸發恢復）
+    NETWORK_STATE_RECOVERY: Dict[str, str] = {
+        "error": "error",
+        "disconnect": "blackscreen",
+        "lobby_return": "lobby_return",
+    }
+    # 網路狀態 → 感測正常時不再截圖比對的模板
+    NETWORK_STATE_TEMPLATES: Dict[str, str] = {
+        "error": ERROR_REMIND,
+        "disconnect": BLACK_SCREEN,
+        "lobby_return": LOBBY_RETURN,
+    }
+    NETWORK_SENSOR_IDLE_TIMEOUT: float = 30.0       # 超過此時間（秒）遊戲 WebSocket 沒有訊息即恢復截圖比對
+    # 遊戲 WebSocket 網址的正規表達式（只有這些連線的訊息代表遊戲正常）
+    # 空白時以遊戲 iframe（跨網域子 target）內建立的 WebSocket 為準
+    NETWORK_GAME_SOCKET_PATTERN: str = ""
+    NETWORK_STATE_COOLDOWN: float = 10.0            # 同一狀態重複觸發的最短間隔（秒）
+    NETWORK_SENSOR_RETRY_INTERVAL: float = 30.0     # 感測啟動失敗後重試的間隔（秒）
+    NETWORK_PAYLOAD_MAX_CHARS: int = 4096           # 每則訊息只比對（與記錄）前 N 個字元
+    # 自動附加子 target（跨網域 iframe）；flatten 讓子 target 共用同一條 DevTools 連線
+    NETWORK_AUTO_ATTACH_PARAMS: Dict[str, Any] = {
+        "autoAttach": True,
+        "waitForDebuggerOnStart": False,
+        "flatten": True,
+    }
+    
+    # =========================================================================
+    # 影像運算資源配置
+    # =========================================================================
+    # 限制同時進行的解碼與比對數量，避免每個瀏覽器一個執行緒再加上
+    # OpenCV 內部執行緒造成 CPU 核心超額使用
+    VISION_COMPUTE_SLOTS: int = 0                   # 同時進行影像運算的上限（0 表示 CPU 核心數）
+    VISION_OPENCV_THREADS: int = 0                  # OpenCV 內部執行緒數（0 表示 CPU 核心數 ÷ 上限）
+    
+    # =========================================================================
+    # 截圖格式配置
+    # =========================================================================
+    # 格式字串: "png"（無損）、"jpeg:品質"、"webp:品質"（品質 1-100）
+    # 有損格式只用於判斷模板是否出現的路徑；金額識別固定使用 PNG
+    CAPTURE_FORMATS: Tuple[str, ...] = ("png", "jpeg", "webp")
+    DEFAULT_LOSSY_QUALITY: int = 80
+    MONITOR_CAPTURE_FORMAT: str = "png"   # 錯誤監控（黑屏、錯誤訊息、返回大廳）
+    RECOVERY_CAPTURE_FORMAT: str = "png"  # 恢復流程圖片檢測
+    LOBBY_CAPTURE_FORMAT: str = "png"     # 登入階段圖片檢測（遊戲登入、遊戲開始）
+    
+    # =========================================================================
+    # 共用畫面配置
+    # =========================================================================
+    # 同一瀏覽器的各個循環在容許的畫面年齡內共用同一張整窗截圖
+    # 年齡需小於各循環在點擊後的等待時間，確保不會讀到點擊前的畫面
+    FRAME_SHARE_MAX_AGE: float = 0.5        # 錯誤監控、恢復檢測可接受的畫面年齡（秒）
+    BETSIZE_FRAME_MAX_AGE: float = 0.3      # 金額識別可接受的畫面年齡（秒）
+    FRAME_CAPTURE_WAIT_TIMEOUT: float = 10.0  # 等待其他執行緒完成擷取的最長時間（秒）
+    
+    # =========================================================================
+    # 畫面變化閘門配置
+    # =========================================================================
+    # 畫面縮圖與上次比對時幾乎相同時，沿用上次的檢測結果，不重新執行模板比對
+    FRAME_GATE_THUMBNAIL_SIZE: Tuple[int, int] = (32, 32)  # 指紋縮圖尺寸 (寬, 高)
+    FRAME_GATE_DIFF_THRESHOLD: float = 2.0   # 縮圖平均絕對差（灰階 0-255）低於此值視為未變化
+    FRAME_GATE_MAX_STALENESS: float = 15.0   # 沿用結果的最長時間（秒），0 表示停用閘門
+    
     # =========================================================================
     # 模板顯示名稱對應表
     # =========================================================================
@@ -410,10 +618,29 @@ class Constants:
     BETSIZE_DECREASE_BUTTON_X: float = 0.63    # 減少金額按鈕 X 座標比例
     BETSIZE_DECREASE_BUTTON_Y: float = 0.89    # 減少金額按鈕 Y 座標比例
     BETSIZE_MATCH_THRESHOLD: float = 0.85      # 金額識別匹配閾值
-    BETSIZE_ADJUST_STEP_WAIT: float = 1.0      # 調整金額每步等待時間
+    BETSIZE_ADJUST_STEP_WAIT: float = 1.0      # 調整金額每輪點擊後等待畫面更新的時間
+    BETSIZE_BURST_CLICK_GAP: float = 0.15      # 同一輪連續點擊調整按鈕的間隔
     BETSIZE_ADJUST_RETRY_WAIT: float = 1.0     # 調整金額重試等待時間
+    BETSIZE_ADJUST_DEADLINE: float = 0.0       # 調整金額時等待所有瀏覽器的期限（秒），0 表示無限等待（預設）
+    BETSIZE_ADJUST_STRAGGLER_POLICY: str = "abort"  # 超過期限的瀏覽器處理方式: proceed / quarantine / abort
     BETSIZE_READ_RETRY_WAIT: float = 0.5       # 讀取金額重試等待時間
     BETSIZE_READ_MAX_RETRIES: int = 2          # 讀取金額最大重試次數
+    BETSIZE_TEMPLATE_DIR: str = "bet_size"     # 金額模板子目錄（位於 IMAGE_DIR 下）
+    BETSIZE_BANK_RESCAN_INTERVAL: float = 2.0  # 金額模板庫檔案狀態重新檢查間隔（秒）
+    
+    # 金額識別方式:
+    #   "glyph": 將金額區域切割為單一字元逐字辨識，字元庫由已截取的金額模板自動建立，
+    #            新增金額不需重新截取；無法辨識時改用整組金額模板比對
+    #   "template": 以每個金額模板逐一比對
+    BETSIZE_READ_MODES: Tuple[str, ...] = ("glyph", "template")
+    BETSIZE_READ_MODE: str = "glyph"
+    BETSIZE_GLYPH_SIZE: Tuple[int, int] = (12, 20)    # 字元正規化尺寸 (寬, 高)
+    BETSIZE_GLYPH_MATCH_THRESHOLD: float = 0.7        # 字元辨識匹配閾值（金額採用另需達 BETSIZE_MATCH_THRESHOLD）
+    BETSIZE_GLYPH_MIN_AREA: int = 2                   # 字元最小像素數（過濾雜點）
+    BETSIZE_GLYPH_DOT_MAX_HEIGHT: float = 0.35        # 小數點高度上限（相對於字元列高度）
+    BETSIZE_GLYPH_MIN_HEIGHT: float = 0.7             # 數字高度下限（相對於字元列高度），較矮的元件視為筆畫碎片
+    BETSIZE_GLYPH_MAX_GAP: float = 1.0                # 同一金額字元間距上限（相對於字元列高度）
+    BETSIZE_GLYPH_MAX_ASPECT: float = 0.9             # 單一字元寬高比上限，超過時視為相連字元並切開
     
     # =========================================================================
     # 可重試錯誤關鍵字（網路錯誤 + WebDriver 瞬態錯誤）
@@ -423,6 +650,24 @@ class Constants:
     # =========================================================================
     CONFIGURABLE_SETTINGS: Dict[str, Tuple[str, type]] = {
         'AUTO_CLICK_INTERVAL': ('AUTO_CLICK_INTERVAL', int),
+        'MONITOR_CAPTURE_FORMAT': ('MONITOR_CAPTURE_FORMAT', str),
+        'RECOVERY_CAPTURE_FORMAT': ('RECOVERY_CAPTURE_FORMAT', str),
+        'LOBBY_CAPTURE_FORMAT': ('LOBBY_CAPTURE_FORMAT', str),
+        'FRAME_GATE_MAX_STALENESS': ('FRAME_GATE_MAX_STALENESS', float),
+        'BLACKSCREEN_DETECTION_MODE': ('BLACKSCREEN_DETECTION_MODE', str),
+        'BETSIZE_READ_MODE': ('BETSIZE_READ_MODE', str),
+        'VISION_POOL_MODE': ('VISION_POOL_MODE', str),
+        'VISION_POOL_WORKERS': ('VISION_POOL_WORKERS', int),
+        'VISION_COMPUTE_SLOTS': ('VISION_COMPUTE_SLOTS', int),
+        'VISION_OPENCV_THREADS': ('VISION_OPENCV_THREADS', int),
+        'SCREENCAST_MODE': ('SCREENCAST_MODE', str),
+        'INPUT_DISPATCH_MODE': ('INPUT_DISPATCH_MODE', str),
+        'NETWORK_SENSOR_MODE': ('NETWORK_SENSOR_MODE', str),
+        'NETWORK_RECORD_MODE': ('NETWORK_RECORD_MODE', str),
+        'NETWORK_GAME_SOCKET_PATTERN': ('NETWORK_GAME_SOCKET_PATTERN', str),
+        'BROWSER_HEARTBEAT_INTERVAL': ('BROWSER_HEARTBEAT_INTERVAL', float),
+        'BETSIZE_ADJUST_DEADLINE': ('BETSIZE_ADJUST_DEADLINE', float),
+        'BETSIZE_ADJUST_STRAGGLER_POLICY': ('BETSIZE_ADJUST_STRAGGLER_POLICY', str),
     }
 
     @classmethod
@@ -636,6 +881,16 @@ class ProxyServerError(AutoSlotGameError):
     """
 
 
+class CdpChannelError(AutoSlotGameError):
+    """CDP 事件通道錯誤。
+
+    當無法連線分頁的 DevTools WebSocket 或 CDP 指令失敗時拋出。
+
+    範例:
+        >>> raise CdpChannelError("WebDriver 未提供 debuggerAddress")
+    """
+
+
 class ImageDetectionError(AutoSlotGameError):
     """圖片檢測錯誤。
 
@@ -757,6 +1012,49 @@ class BetRule:
             raise ValueError(f"無效的規則類型: {self.rule_type}，必須是 'a'、's' 或 'f'")
 
 
+@dataclass(frozen=True)
+class NetworkStateRule:
+    """網路狀態規則資料結構（不可變）。
+
+    格式為 ``狀態:來源:正規表達式``，網路訊息符合正規表達式時判定為該狀態。
+
+    屬性:
+        state: 遊戲狀態，可為 ``'error'``、``'disconnect'``、``'lobby_return'`` 或 ``'spin_done'``。
+        source: 訊息來源，``'ws'`` (WebSocket 訊息內容)、``'http'`` (``狀態碼 網址``)
+            或 ``'close'`` (關閉的 WebSocket 網址)。
+        pattern: 正規表達式（以 re.search 比對）。
+
+    異常:
+        ValueError: 當狀態、來源或正規表達式無效時。
+
+    範例:
+        >>> rule = NetworkStateRule(state='error', source='ws', pattern=r'"errorCode":\s*[1-9]')
+        >>> rule.matches('{"errorCode": 3}')
+        True
+    """
+    state: str
+    source: str
+    pattern: str
+
+    def __post_init__(self) -> None:
+        """驗證資料完整性並預先編譯正規表達式。"""
+        if self.state not in Constants.NETWORK_STATES:
+            valid_states = ", ".join(Constants.NETWORK_STATES)
+            raise ValueError(f"網路狀態必須是 {valid_states}: {self.state}")
+        if self.source not in Constants.NETWORK_SOURCES:
+            valid_sources = ", ".join(Constants.NETWORK_SOURCES)
+            raise ValueError(f"訊息來源必須是 {valid_sources}: {self.source}")
+        try:
+            compiled = re.compile(self.pattern)
+        except re.error as e:
+            raise ValueError(f"正規表達式無效 '{self.pattern}': {e}") from e
+        object.__setattr__(self, '_compiled', compiled)
+
+    def matches(self, text: str) -> bool:
+        """訊息內容是否符合此規則。"""
+        return self._compiled.search(text) is not None
+
+
 @dataclass(frozen=True)
 class ProxyInfo:
     """代理伺服器資訊資料結構（不可變）。
@@ -889,6 +1187,11 @@ class BrowserThread(threading.Thread):
         browser_manager: 瀏覽器管理器實例。
         context: 瀏覽器上下文（建立後填充）。
         driver: WebDriver 實例。
+        frame_provider: 共用畫面來源。
+        screencast: CDP 畫面串流（SCREENCAST_MODE 為 on 時啟動）。
+        network_sensor: 網路狀態感測（NETWORK_SENSOR_MODE 為 on 時啟動）。
+        input_dispatcher: CDP 輸入事件派送器（建立瀏覽器後登記）。
+        liveness: 存活狀態快取 (是否存活, 檢查時間)，由 BrowserHeartbeat 定期更新。
 
     範例:
         >>> thread = BrowserThread(
@@ -934,12 +1237,32 @@ class BrowserThread(threading.Thread):
         self._ready_event = threading.Event()  # 瀏覽器就緒事件
         self._creation_error: Optional[Exception] = None
 
-        # 任務佇列
-        self._task_queue: List[Tuple[Callable, tuple, dict]] = []
-        self._task_lock = threading.Lock()
-        self._task_event = threading.Event()  # 新任務通知
-        self._task_result: Any = None
-        self._task_done_event = threading.Event()  # 任務完成事件
+        # 任務佇列（每個優先權一個佇列，每個任務有自己的 Future）
+        self._task_queues: Tuple[Deque[Tuple[Future, Callable, tuple, dict, float]], ...] = tuple(
+            deque() for _ in range(Constants.TASK_PRIORITY_LEVELS)
+        )
+        self._task_condition = threading.Condition()  # 新任務或停止通知
+        self._task_stats: Dict[str, float] = {
+            'completed': 0, 'failed': 0, 'cancelled': 0,
+            'wait_total': 0.0, 'wait_max': 0.0, 'run_total': 0.0, 'peak_depth': 0,
+        }
+
+        # 共用畫面來源（各監控與恢復循環共用同一張截圖）
+        self.frame_provider = FrameProvider(f"瀏覽器 {index}")
+
+        # CDP 畫面串流（啟動後畫面由 Chrome 主動推送）
+        self.screencast: Optional[ScreencastSession] = None
+        self._screencast_failed_at: float = 0.0
+
+        # 網路狀態感測（由 GameControlCenter 提供分類器與回呼）
+        self.network_sensor: Optional[NetworkStateSensor] = None
+        self._network_sensor_failed_at: float = 0.0
+
+        # 存活狀態快取（(是否存活, 檢查時間)，整組替換，讀取端不需加鎖）
+        self._liveness: Tuple[bool, float] = (False, 0.0)
+
+        # CDP 輸入事件派送器（點擊與按鍵整組送出）
+        self.input_dispatcher: Optional[InputDispatcher] = None
 
     def run(self) -> None:
         """控制器主迴圈。
@@ -960,12 +1283,12 @@ class BrowserThread(threading.Thread):
             # 2. 通知瀏覽器已就緒
             self._ready_event.set()
 
-            # 3. 等待任務或停止信號
-            while not self._stop_event.is_set():
-                # 每秒檢查一次
-                if self._task_event.wait(timeout=1.0):
-                    self._task_event.clear()
-                    self._process_tasks()
+            # 3. 等待任務或停止信號（阻塞等待，不輪詢）
+            while True:
+                task = self._next_task()
+                if task is None:
+                    break
+                self._run_task(*task)
 
         except Exception as e:
             self.logger.error(f"瀏覽器 {self.index} 發生異常: {e}")
@@ -991,31 +1314,73 @@ class BrowserThread(threading.Thread):
                 proxy_port=self.proxy_port
             )
 
+            self.input_dispatcher = InputDispatcher(self.driver, f"瀏覽器 {self.index}", self.logger)
+            InputDispatcher.register(self.input_dispatcher)
+
         except Exception as e:
             self._creation_error = e
             self._ready_event.set()
 
-    def _process_tasks(self) -> None:
-        """處理任務佇列中的所有任務。
+    def _next_task(self) -> Optional[Tuple[Future, Callable, tuple, dict, float]]:
+        """阻塞等待並取出優先權最高的任務。
 
-        依序執行佇列中的任務，並將結果儲存到 _task_result。
+        回傳:
+            任務，收到停止信號時為 None
         """
-        while True:
-            with self._task_lock:
-                if not self._task_queue:
-                    break
-                func, args, kwargs = self._task_queue.pop(0)
+        with self._task_condition:
+            while not self._stop_event.is_set():
+                for queue in self._task_queues:
+                    if queue:
+                        return queue.popleft()
+                self._task_condition.wait()
+            return None
 
-            try:
-                # 將 context 注入到任務中
-                self._task_result = func(self.context, *args, **kwargs)
-            except Exception as e:
-                self._task_result = e
-            finally:
-                self._task_done_event.set()
+    def _run_task(self, future: Future, func: Callable, args: tuple, kwargs: dict, submitted_at: float) -> None:
+        """執行單一任務，並將結果或例外設定到該任務的 Future。"""
+        if not future.set_running_or_notify_cancel():
+            # 提交者已因超時取消
+            with self._task_condition:
+                self._task_stats['cancelled'] += 1
+            return
+
+        started_at = time.monotonic()
+        try:
+            # 將 context 注入到任務中
+            result = func(self.context, *args, **kwargs)
+        except Exception as e:
+            self.report_command_error(e)
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finished_at = time.monotonic()
+
+        with self._task_condition:
+            stats = self._task_stats
+            stats['failed' if future.exception() is not None else 'completed'] += 1
+            stats['wait_total'] += started_at - submitted_at
+            stats['wait_max'] = max(stats['wait_max'], started_at - submitted_at)
+            stats['run_total'] += finished_at - started_at
+
+    def _fail_pending_tasks(self) -> None:
+        """以「瀏覽器已關閉」結束佇列中尚未執行的任務。"""
+        with self._task_condition:
+            pending = [task for queue in self._task_queues for task in queue]
+            for queue in self._task_queues:
+                queue.clear()
+        for future, *_ in pending:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError(f"瀏覽器 {self.index} 已關閉"))
 
     def _cleanup(self) -> None:
         """清理瀏覽器資源。"""
+        self._stop_event.set()
+        self._fail_pending_tasks()
+        self.stop_screencast()
+        self.stop_network_sensor()
+        if self.input_dispatcher is not None:
+            self.logger.debug(f"瀏覽器 {self.index} 輸入派送統計: {self.input_dispatcher.get_stats()}")
+            self.input_dispatcher.close()
+            self.input_dispatcher = None
         if self.driver:
             try:
                 self.driver.quit()
@@ -1045,19 +1410,62 @@ class BrowserThread(threading.Thread):
         """
         return self._creation_error
 
+    def submit_task(
+        self,
+        func: Callable[[BrowserContext], Any],
+        *args: Any,
+        priority: int = Constants.TASK_PRIORITY_NORMAL,
+        **kwargs: Any
+    ) -> Future:
+        """將任務加入瀏覽器的任務佇列，不等待完成。
+
+        優先權較高（數字較小）的任務先執行，同優先權依提交順序執行；
+        正在執行的任務不會被中斷。
+
+        參數:
+            func: 要執行的函數，第一個參數會是 BrowserContext。
+            *args: 額外的位置參數。
+            priority: 任務優先權（Constants.TASK_PRIORITY_*）。
+            **kwargs: 額外的關鍵字參數。
+
+        回傳:
+            該任務的 Future（結果或例外由任務設定）。
+
+        異常:
+            RuntimeError: 當瀏覽器已關閉時。
+        """
+        if not self.is_alive():
+            raise RuntimeError(f"瀏覽器 {self.index} 已關閉")
+
+        level = min(max(priority, 0), Constants.TASK_PRIORITY_LEVELS - 1)
+        future: Future = Future()
+        with self._task_condition:
+            if self._stop_event.is_set():
+                raise RuntimeError(f"瀏覽器 {self.index} 已關閉")
+            self._task_queues[level].append((future, func, args, kwargs, time.monotonic()))
+            depth = sum(len(queue) for queue in self._task_queues)
+            self._task_stats['peak_depth'] = max(self._task_stats['peak_depth'], depth)
+            self._task_condition.notify()
+        return future
+
     def execute_task(
         self,
         func: Callable[[BrowserContext], Any],
         *args: Any,
         timeout: Optional[float] = None,
+        priority: int = Constants.TASK_PRIORITY_NORMAL,
         **kwargs: Any
     ) -> Any:
-        """在瀏覽器中執行任務。
+        """在瀏覽器中執行任務並等待結果。
+
+        每次呼叫有自己的結果與超時，多個呼叫者可同時提交任務。
+        超時時尚未開始執行的任務會被取消。
 
         參數:
             func: 要執行的函數，第一個參數會是 BrowserContext。
             *args: 額外的位置參數。
             timeout: 超時時間（秒）。
+            priority: 任務優先權（Constants.TASK_PRIORITY_*）。
             **kwargs: 額外的關鍵字參數。
 
         回傳:
@@ -1067,47 +1475,286 @@ class BrowserThread(threading.Thread):
             RuntimeError: 當瀏覽器已關閉時。
             TimeoutError: 當任務執行超時時。
         """
-        if not self.is_alive() or self._stop_event.is_set():
-            raise RuntimeError(f"瀏覽器 {self.index} 已關閉")
+        future = self.submit_task(func, *args, priority=priority, **kwargs)
+        return self.wait_task(future, timeout)
 
-        # 重置任務完成事件
-        self._task_done_event.clear()
-        self._task_result = None
+    def wait_task(self, future: Future, timeout: Optional[float] = None) -> Any:
+        """等待 submit_task 提交的任務完成。
 
-        # 加入任務佇列
-        with self._task_lock:
-            self._task_queue.append((func, args, kwargs))
-        
-        # 通知有新任務
-        self._task_event.set()
-        
-        # 等待任務完成
-        if self._task_done_event.wait(timeout=timeout):
-            result = self._task_result
-            if isinstance(result, Exception):
-                raise result
-            return result
-        else:
+        參數:
+            future: submit_task 回傳的 Future。
+            timeout: 超時時間（秒），None 表示無限等待。
+
+        回傳:
+            任務執行的結果。
+
+        異常:
+            TimeoutError: 當任務執行超時時（尚未開始執行的任務會被取消）。
+        """
+        done, _ = wait_futures([future], timeout=timeout)
+        if not done:
+            future.cancel()
             raise TimeoutError(f"瀏覽器 {self.index} 任務執行超時")
-    
+        return future.result()
+
+    def get_task_stats(self) -> Dict[str, float]:
+        """取得任務佇列統計。
+
+        回傳:
+            包含 completed（成功數）、failed（失敗數）、cancelled（超時取消數）、
+            queued（目前排隊數）、peak_depth（最多排隊數）、avg_wait_ms / max_wait_ms
+            （提交到開始執行的時間）與 avg_run_ms（執行時間）的字典
+        """
+        with self._task_condition:
+            stats = dict(self._task_stats)
+            queued = sum(len(queue) for queue in self._task_queues)
+        finished = max(1, stats['completed'] + stats['failed'])
+        return {
+            'completed': stats['completed'],
+            'failed': stats['failed'],
+            'cancelled': stats['cancelled'],
+            'queued': queued,
+            'peak_depth': stats['peak_depth'],
+            'avg_wait_ms': stats['wait_total'] / finished * 1000,
+            'max_wait_ms': stats['wait_max'] * 1000,
+            'avg_run_ms': stats['run_total'] / finished * 1000,
+        }
+
     def stop(self) -> None:
         """停止瀏覽器並釋放資源。"""
         self._stop_event.set()
-        self._task_event.set()
+        with self._task_condition:
+            self._task_condition.notify_all()
 
-    def is_browser_alive(self) -> bool:
-        """檢查瀏覽器是否仍然有效。
+    def start_screencast(self) -> bool:
+        """啟動 CDP 畫面串流，串流畫面提供給共用畫面來源。
+
+        已在串流中時直接回傳；上次啟動失敗未滿 SCREENCAST_RETRY_INTERVAL 秒時不重試。
 
         回傳:
-            瀏覽器是否仍可操作。
+            串流是否進行中
         """
+        if self.screencast is not None and self.screencast.is_active:
+            return True
         if self.driver is None:
             return False
+        if time.monotonic() - self._screencast_failed_at < Constants.SCREENCAST_RETRY_INTERVAL:
+            return False
+
+        screencast = self.screencast or ScreencastSession(self.driver, f"瀏覽器 {self.index}", self.logger)
         try:
-            _ = self.driver.current_url
+            screencast.start()
+        except Exception as e:
+            self._screencast_failed_at = time.monotonic()
+            self.logger.warning(f"瀏覽器 {self.index} 畫面串流啟動失敗，改用截圖: {e}")
+            return False
+        self.screencast = screencast
+        self.frame_provider.screencast = screencast
+        return True
+
+    def stop_screencast(self) -> None:
+        """停止 CDP 畫面串流（之後的檢測改回截圖）。"""
+        screencast = self.screencast
+        self.frame_provider.screencast = None
+        self.screencast = None
+        self._screencast_failed_at = 0.0
+        if screencast is not None:
+            screencast.stop()
+
+    def start_network_sensor(
+        self,
+        classifier: 'NetworkStateClassifier',
+        on_state: Callable[['NetworkStateEvent'], None]
+    ) -> bool:
+        """啟動網路狀態感測。
+
+        已在感測中時直接回傳；上次啟動失敗未滿 NETWORK_SENSOR_RETRY_INTERVAL 秒時不重試。
+        NETWORK_RECORD_MODE 為 on 時同時將訊息記錄到 NETWORK_RECORD_DIR。
+
+        參數:
+            classifier: 網路狀態分類器
+            on_state: 判定狀態時的回呼
+
+        回傳:
+            感測是否進行中
+        """
+        if self.network_sensor is not None and self.network_sensor.is_active:
             return True
-        except Exception:
+        if self.driver is None:
+            return False
+        if time.monotonic() - self._network_sensor_failed_at < Constants.NETWORK_SENSOR_RETRY_INTERVAL:
+            return False
+
+        record_path = None
+        if Constants.NETWORK_RECORD_MODE == "on":
+            record_path = get_resource_path(Constants.NETWORK_RECORD_DIR) / (
+                f"browser{self.index}_{time.strftime('%Y%m%d_%H%M%S')}.jsonl"
+            )
+        sensor = NetworkStateSensor(
+            self.driver, f"瀏覽器 {self.index}", classifier, on_state, self.logger, record_path
+        )
+        try:
+            sensor.start()
+        except Exception as e:
+            self._network_sensor_failed_at = time.monotonic()
+            self.logger.warning(f"瀏覽器 {self.index} 網路狀態感測啟動失敗，改用截圖: {e}")
             return False
+        self.network_sensor = sensor
+        return True
+
+    def stop_network_sensor(self) -> None:
+        """停止網路狀態感測（之後的檢測全部改回截圖）。"""
+        sensor = self.network_sensor
+        self.network_sensor = None
+        self._network_sensor_failed_at = 0.0
+        if sensor is not None:
+            sensor.stop()
+
+    @property
+    def liveness(self) -> Tuple[bool, float]:
+        """存活狀態快取 (是否存活, 檢查時間 time.monotonic())，尚未檢查時檢查時間為 0。"""
+        return self._liveness
+
+    def is_browser_alive(self) -> bool:
+        """檢查瀏覽器是否仍然有效。
+
+        讀取 BrowserHeartbeat 維護的存活狀態快取，不對瀏覽器送出指令；
+        快取不存在或過舊（心跳未執行）時才實際檢查一次；已呼叫 stop() 的瀏覽器
+        直接視為離線。
+
+        回傳:
+            瀏覽器是否仍可操作。
+        """
+        if self.driver is None or self._stop_event.is_set():
+            return False
+        alive, checked_at = self._liveness
+        interval = Constants.BROWSER_HEARTBEAT_INTERVAL
+        if interval > 0 and checked_at > 0:
+            if time.monotonic() - checked_at <= interval * Constants.BROWSER_LIVENESS_STALE_FACTOR:
+                return alive
+        return self.probe_liveness()
+
+    def probe_liveness(self) -> bool:
+        """實際向瀏覽器查詢目前網址，並更新存活狀態快取。
+
+        回傳:
+            瀏覽器是否仍可操作。
+        """
+        driver = self.driver
+        alive = False
+        if driver is not None:
+            try:
+                _ = driver.current_url
+                alive = True
+            except Exception:
+                alive = False
+        self._liveness = (alive, time.monotonic())
+        return alive
+
+    def mark_dead(self) -> None:
+        """立即將瀏覽器標記為離線（下一次心跳檢查成功時恢復）。"""
+        if self._liveness[0]:
+            self.logger.debug(f"瀏覽器 {self.index} 指令失敗，標記為離線")
+        self._liveness = (False, time.monotonic())
+
+    def report_command_error(self, error: BaseException) -> None:
+        """回報對此瀏覽器的指令失敗。
+
+        連線中斷類錯誤（is_browser_dead_error）立即標記為離線；
+        其他錯誤只讓快取過期，下一次 is_browser_alive 會實際檢查。
+
+        參數:
+            error: 指令失敗的例外
+        """
+        if is_browser_dead_error(error):
+            self.mark_dead()
+        else:
+            self._liveness = (self._liveness[0], 0.0)
+
+
+class BrowserHeartbeat:
+    """瀏覽器存活心跳。
+
+    以單一背景執行緒每隔 BROWSER_HEARTBEAT_INTERVAL 秒依序檢查各瀏覽器
+    （BrowserThread.probe_liveness），結果快取在各 BrowserThread 上，
+    讓自動按鍵、自動跳過與錯誤監控等熱循環呼叫 is_browser_alive 時不必
+    每次對瀏覽器送出指令。
+
+    範例:
+        >>> heartbeat = BrowserHeartbeat(browser_threads)
+        >>> heartbeat.start()
+        >>> heartbeat.stop()
+    """
+
+    def __init__(
+        self,
+        browser_threads: List[BrowserThread],
+        interval: Optional[float] = None,
+        logger: Optional[logging.Logger] = None
+    ) -> None:
+        """初始化存活心跳。
+
+        參數:
+            browser_threads: 瀏覽器執行緒列表（共用同一個列表，之後新增或移除的瀏覽器也會檢查）
+            interval: 檢查間隔（秒），預設 Constants.BROWSER_HEARTBEAT_INTERVAL
+            logger: 日誌記錄器（可選）
+        """
+        self.browser_threads = browser_threads
+        self.interval = Constants.BROWSER_HEARTBEAT_INTERVAL if interval is None else interval
+        self.logger = logger or LoggerFactory.get_logger()
+        self.probe_count: int = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        """心跳執行緒是否運行中。"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """啟動心跳執行緒（間隔為 0 時不啟動，is_browser_alive 改為每次實際檢查）。"""
+        if self.is_running or self.interval <= 0:
+            return
+        self._stop_event.clear()
+        self.probe_all()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="BrowserHeartbeat")
+        self._thread.start()
+        self.logger.debug(f"瀏覽器存活心跳已啟動（每 {self.interval:g} 秒）")
+
+    def stop(self) -> None:
+        """停止心跳執行緒。"""
+        self._stop_event.set()
+        thread = self._thread
+        self._thread = None
+        if thread is not None:
+            thread.join(timeout=self.interval + 1.0)
+
+    def probe_all(self) -> Dict[int, bool]:
+        """立即檢查所有瀏覽器一次。
+
+        回傳:
+            瀏覽器編號 → 是否存活
+        """
+        results: Dict[int, bool] = {}
+        for bt in list(self.browser_threads):
+            if self._stop_event.is_set():
+                break
+            was_alive, checked_at = bt.liveness
+            alive = bt.probe_liveness()
+            self.probe_count += 1
+            results[bt.index] = alive
+            if checked_at > 0 and was_alive != alive:
+                state = "恢復連線" if alive else "已離線"
+                self.logger.debug(f"瀏覽器 {bt.index} 心跳檢查：{state}")
+        return results
+
+    def _run(self) -> None:
+        """心跳主循環。"""
+        while not self._stop_event.wait(timeout=self.interval):
+            try:
+                self.probe_all()
+            except Exception as e:
+                self.logger.debug(f"瀏覽器存活心跳檢查失敗: {e}")
 
 
 class OperationResult:
@@ -1405,6 +2052,21 @@ def is_retryable_error(error: Exception) -> bool:
 is_network_error = is_retryable_error
 
 
+def is_browser_dead_error(error: BaseException) -> bool:
+    """判斷錯誤是否代表瀏覽器或 WebDriver 連線已中斷（瀏覽器關閉、session 失效等）。
+
+    參數:
+        error: 發生的例外。
+
+    回傳:
+        如果瀏覽器已無法操作則返回 True。
+    """
+    if isinstance(error, (ConnectionError, InvalidSessionIdException, NoSuchWindowException)):
+        return True
+    error_msg = str(error).lower()
+    return any(kw in error_msg for kw in Constants.BROWSER_DEAD_ERROR_KEYWORDS)
+
+
 def cv2_imread_unicode(file_path: Union[str, Path], flags: int = cv2.IMREAD_COLOR) -> Optional[np.ndarray]:
     """安全讀取圖片（支援 Unicode 路徑）。
 
@@ -1483,6 +2145,7 @@ class ConfigReader:
     讀取並解析系統所需的各種配置檔案，包含:
         - 用戶資料.txt: 使用者憑證
         - 用戶規則.txt: 下注規則
+        - 網路狀態規則.txt: 網路狀態判斷規則（可選）
 
     屬性:
         lib_path: 配置檔案目錄路徑。
@@ -1722,6 +2385,42 @@ class ConfigReader:
         
         return rules
 
+    def read_network_rules(
+        self,
+        filename: str = Constants.DEFAULT_NETWORK_RULES_FILE
+    ) -> List[NetworkStateRule]:
+        """讀取網路狀態規則檔案。
+
+        檔案格式: ``狀態:來源:正規表達式``（以 # 開頭為註釋，正規表達式可包含冒號）
+
+        參數:
+            filename: 規則檔名稱（預設 網路狀態規則.txt）。
+
+        回傳:
+            有效的規則列表。若檔案不存在則回傳空列表。
+        """
+        if not (self.lib_path / filename).exists():
+            return []
+
+        rules: List[NetworkStateRule] = []
+        lines = self._read_file_lines(filename, skip_header=False)
+
+        for line_number, line in enumerate(lines, start=1):
+            parts = line.split(':', 2)
+            if len(parts) < 3 or not parts[2].strip():
+                self.logger.warning(f"網路狀態規則第 {line_number} 行格式不完整: {line}")
+                continue
+            try:
+                rules.append(NetworkStateRule(
+                    state=parts[0].strip().lower(),
+                    source=parts[1].strip().lower(),
+                    pattern=parts[2].strip()
+                ))
+            except ValueError as e:
+                self.logger.warning(f"網路狀態規則第 {line_number} 行無法解析: {e}")
+
+        return rules
+
     def read_user_settings(
         self,
         filename: str = Constants.DEFAULT_SETTINGS_FILE
@@ -2174,12 +2873,23 @@ class BrowserHelper:
         return null;
     """
     
-    @staticmethod
-    def close_popups(driver: WebDriver) -> None:
-        """使用 JavaScript 關閉所有彈窗和遮罩層。
-        
-        參數:
-            driver: WebDriver 實例
+    JS_GET_CANVAS_GEOMETRY: str = """
+        const canvas = document.getElementById('%s');
+        if (canvas) {
+            const r = canvas.getBoundingClientRect();
+            return {x: r.left, y: r.top, w: r.width, h: r.height,
+                    vw: window.innerWidth, vh: window.innerHeight,
+                    dpr: window.devicePixelRatio || 1};
+        }
+        return null;
+    """
+    
+    @staticmethod
+    def close_popups(driver: WebDriver) -> None:
+        """使用 JavaScript 關閉所有彈窗和遮罩層。
+        
+        參數:
+            driver: WebDriver 實例
         """
         driver.execute_script(BrowserHelper.JS_CLOSE_POPUPS)
     
@@ -2209,28 +2919,83 @@ class BrowserHelper:
         return None
     
     @staticmethod
-    def execute_cdp_space_key(driver: WebDriver) -> None:
-        """使用 Chrome DevTools Protocol 按下空白鍵。
+    def get_canvas_geometry(
+        driver: WebDriver,
+        canvas_id: str = Constants.GAME_CANVAS
+    ) -> Optional[Dict[str, float]]:
+        """以單次呼叫取得 Canvas 位置與視窗尺寸（不重試）。
         
         參數:
             driver: WebDriver 實例
+            canvas_id: Canvas 元素 ID
+        
+        回傳:
+            {"x", "y", "w", "h", "vw", "vh", "dpr"}，Canvas 不存在時回傳 None
         """
-        # 按下空白鍵
-        driver.execute_cdp_cmd("Input.dispatchKeyEvent", {
-            "type": "keyDown",
-            "key": " ",
-            "code": "Space",
-            "windowsVirtualKeyCode": 32,
-            "nativeVirtualKeyCode": 32
-        })
-        # 釋放空白鍵
-        driver.execute_cdp_cmd("Input.dispatchKeyEvent", {
-            "type": "keyUp",
+        return driver.execute_script(
+            BrowserHelper.JS_GET_CANVAS_GEOMETRY % canvas_id
+        )
+    
+    # 空白鍵的按下與釋放事件（不會被修改，可重複使用）
+    SPACE_KEY_EVENTS: Tuple[Tuple[str, Dict[str, Any]], ...] = tuple(
+        ("Input.dispatchKeyEvent", {
+            "type": event_type,
             "key": " ",
             "code": "Space",
             "windowsVirtualKeyCode": 32,
             "nativeVirtualKeyCode": 32
         })
+        for event_type in ("keyDown", "keyUp")
+    )
+    
+    @staticmethod
+    def click_events(x: float, y: float) -> List[Tuple[str, Dict[str, Any]]]:
+        """建立滑鼠左鍵點擊的 CDP 輸入事件（按下與放開）。
+        
+        參數:
+            x: 點擊 X 座標
+            y: 點擊 Y 座標
+        
+        回傳:
+            (指令名稱, 參數) 列表
+        """
+        return [
+            ("Input.dispatchMouseEvent", {
+                "type": event_type,
+                "x": x,
+                "y": y,
+                "button": "left",
+                "clickCount": 1
+            })
+            for event_type in ("mousePressed", "mouseReleased")
+        ]
+    
+    @staticmethod
+    def dispatch_input(driver: WebDriver, commands: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """送出一組 CDP 輸入事件。
+        
+        WebDriver 已登記 InputDispatcher 時整組事件一次送出，
+        否則以 execute_cdp_cmd 逐一送出。
+        
+        參數:
+            driver: WebDriver 實例
+            commands: (指令名稱, 參數) 列表
+        """
+        dispatcher = InputDispatcher.for_driver(driver)
+        if dispatcher is not None:
+            dispatcher.dispatch(commands)
+            return
+        for method, params in commands:
+            driver.execute_cdp_cmd(method, params)
+    
+    @staticmethod
+    def execute_cdp_space_key(driver: WebDriver) -> None:
+        """使用 Chrome DevTools Protocol 按下並釋放空白鍵。
+        
+        參數:
+            driver: WebDriver 實例
+        """
+        BrowserHelper.dispatch_input(driver, list(BrowserHelper.SPACE_KEY_EVENTS))
     
     @staticmethod
     def click_canvas_position(
@@ -2252,14 +3017,33 @@ class BrowserHelper:
         回傳:
             (x, y) 實際點擊座標
         """
-        # 計算點擊座標
-        x = canvas_rect["x"] + canvas_rect["w"] * x_ratio
-        y = canvas_rect["y"] + canvas_rect["h"] * y_ratio
-        
-        # 執行 CDP 點擊
-        BrowserHelper.execute_cdp_click(driver, x, y)
+        return BrowserHelper.click_canvas_positions(driver, canvas_rect, [(x_ratio, y_ratio)])[0]
+    
+    @staticmethod
+    def click_canvas_positions(
+        driver: WebDriver,
+        canvas_rect: Dict[str, float],
+        ratios: List[Tuple[float, float]]
+    ) -> List[Tuple[float, float]]:
+        """依序點擊 Canvas 上的多個位置，所有點擊事件一次送出。
         
-        return x, y
+        參數:
+            driver: WebDriver 實例
+            canvas_rect: Canvas 區域資訊 {"x", "y", "w", "h"}
+            ratios: (X 座標比例, Y 座標比例) 列表
+            
+        回傳:
+            各位置的實際點擊座標 (x, y)
+        """
+        positions = [
+            (canvas_rect["x"] + canvas_rect["w"] * x_ratio, canvas_rect["y"] + canvas_rect["h"] * y_ratio)
+            for x_ratio, y_ratio in ratios
+        ]
+        commands: List[Tuple[str, Dict[str, Any]]] = []
+        for x, y in positions:
+            commands.extend(BrowserHelper.click_events(x, y))
+        BrowserHelper.dispatch_input(driver, commands)
+        return positions
     
     @staticmethod
     def execute_cdp_click(driver: WebDriver, x: float, y: float) -> None:
@@ -2270,14 +3054,7 @@ class BrowserHelper:
             x: 點擊 X 座標
             y: 點擊 Y 座標
         """
-        for event_type in ["mousePressed", "mouseReleased"]:
-            driver.execute_cdp_cmd("Input.dispatchMouseEvent", {
-                "type": event_type,
-                "x": x,
-                "y": y,
-                "button": "left",
-                "clickCount": 1
-            })
+        BrowserHelper.dispatch_input(driver, BrowserHelper.click_events(x, y))
     
     @staticmethod
     def enter_game_from_lobby(driver: WebDriver) -> bool:
@@ -2324,251 +3101,3616 @@ class BrowserHelper:
         return True
 
 
-# =============================================================================
-# 圖片檢測器
-# =============================================================================
-
-class ImageDetector:
-    """圖片檢測器。
-
-    提供螢幕截圖、圖片比對和座標定位功能。
-    使用 OpenCV 的 TM_CCOEFF_NORMED 方法進行模板匹配。
-
-    此類別是圖片識別功能的核心，支援:
-        - 瀏覽器截圖
-        - 模板匹配
-        - 各種模板的截取和儲存
+class CdpEventChannel:
+    """Chrome DevTools Protocol 事件通道。
 
-    屬性:
-        logger: 日誌記錄器。
-        project_root: 專案根目錄路徑。
-        image_dir: 圖片目錄路徑。
+    chromedriver 的 execute_cdp_cmd 只能送出指令，無法接收 CDP 事件。
+    本類別透過 chromedriver 回報的 debuggerAddress 找到目前分頁，
+    直接連線該分頁的 DevTools WebSocket，在背景執行緒接收事件並分派給訂閱者。
+    與 chromedriver 的連線互不影響，可同時使用。
+    以 Target.setAutoAttach（flatten）附加的子 target（例如跨網域 iframe）共用同一連線，
+    送出指令時指定 session_id 即送往該子 target。
 
     範例:
-        >>> detector = ImageDetector()
-        >>> result = detector.detect_in_browser(driver, "遊戲登入.png")
-        >>> if result:
-        ...     x, y, confidence = result
-        ...     print(f"找到圖片於 ({x}, {y}), 信心度: {confidence:.2f}")
+        >>> channel = CdpEventChannel(driver, "瀏覽器 1")
+        >>> channel.connect()
+        >>> channel.subscribe("Page.screencastFrame", on_frame)
+        >>> channel.send("Page.startScreencast", {"format": "jpeg"})
     """
 
-    def __init__(self, logger: Optional[logging.Logger] = None) -> None:
-        """初始化圖片檢測器。
+    def __init__(
+        self,
+        driver: WebDriver,
+        name: str = "",
+        logger: Optional[logging.Logger] = None
+    ) -> None:
+        """初始化事件通道（需呼叫 connect 才會連線）。
 
         參數:
-            logger: 日誌記錄器（可選）。
+            driver: WebDriver 實例
+            name: 顯示名稱（日誌與執行緒名稱用）
+            logger: 日誌記錄器（可選）
         """
+        self.driver = driver
+        self.name = name
         self.logger = logger or LoggerFactory.get_logger()
+        self._ws: Optional[websocket.WebSocket] = None
+        self._send_lock = threading.RLock()
+        self._pending_lock = threading.Lock()
+        self._pending: Dict[int, List[Any]] = {}  # 指令編號 → [完成事件, 回應]
+        self._next_id: int = 0
+        self._subscribers: Dict[str, List[Tuple[Callable[..., None], bool]]] = {}  # 事件名稱 → [(回呼, 是否傳入 sessionId)]
+        self._reader: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+        self.events_received: int = 0
 
-        # 使用輔助函式取得專案根目錄和圖片目錄
-        self.project_root: Path = get_resource_path()
-        self.image_dir: Path = get_resource_path(Constants.IMAGE_DIR)
+    @property
+    def is_connected(self) -> bool:
+        """通道是否連線中。"""
+        return self._ws is not None and not self._closed.is_set()
 
-        # 確保圖片目錄存在
-        self.image_dir.mkdir(parents=True, exist_ok=True)
+    def get_websocket_url(self) -> str:
+        """取得目前分頁的 DevTools WebSocket 位址。
 
-    def get_template_path(self, template_name: str) -> Path:
-        """取得模板圖片路徑。
+        回傳:
+            ws:// 位址
 
-        參數:
-            template_name: 模板圖片檔名。
+        異常:
+            CdpChannelError: 無法取得 debuggerAddress 或找不到分頁
+        """
+        chrome_options = (self.driver.capabilities or {}).get('goog:chromeOptions', {})
+        address = chrome_options.get('debuggerAddress')
+        if not address:
+            raise CdpChannelError("WebDriver 未提供 debuggerAddress")
 
-        回傳:
-            模板圖片完整路徑。
+        # 本機位址不經過系統代理
+        opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+        try:
+            with opener.open(f"http://{address}/json/list", timeout=Constants.CDP_CHANNEL_CONNECT_TIMEOUT) as response:
+                targets = json.loads(response.read().decode('utf-8'))
+        except Exception as e:
+            raise CdpChannelError(f"無法取得分頁清單: {e}") from e
+
+        pages = [t for t in targets if t.get('type') == 'page' and t.get('webSocketDebuggerUrl')]
+        try:
+            handle = self.driver.current_window_handle
+        except Exception:
+            handle = None
+        # chromedriver 的視窗 handle 即為分頁的 target id
+        target = next((t for t in pages if t.get('id') == handle), None) or (pages[0] if pages else None)
+        if target is None:
+            raise CdpChannelError("找不到可連線的分頁")
+        return target['webSocketDebuggerUrl']
+
+    def connect(self) -> None:
+        """連線到分頁的 DevTools WebSocket 並啟動事件接收執行緒。
+
+        異常:
+            CdpChannelError: 連線失敗
         """
-        return self.image_dir / template_name
+        if self.is_connected:
+            return
+        url = self.get_websocket_url()
+        try:
+            # 不送出 Origin 標頭，Chrome 才不需要 --remote-allow-origins
+            ws = websocket.create_connection(
+                url, timeout=Constants.CDP_CHANNEL_CONNECT_TIMEOUT, suppress_origin=True
+            )
+            ws.settimeout(Constants.CDP_CHANNEL_RECV_TIMEOUT)
+        except Exception as e:
+            raise CdpChannelError(f"DevTools 連線失敗: {e}") from e
 
-    def template_exists(self, template_name: str) -> bool:
-        """檢查模板圖片是否存在。
+        self._ws = ws
+        self._closed.clear()
+        self._reader = threading.Thread(
+            target=self._read_loop, daemon=True, name=f"CdpEvents-{self.name}"
+        )
+        self._reader.start()
 
-        參數:
-            template_name: 模板圖片檔名。
+    def subscribe(
+        self,
+        method: str,
+        callback: Callable[..., None],
+        with_session: bool = False
+    ) -> None:
+        """訂閱 CDP 事件（callback 在事件接收執行緒中以事件參數呼叫，不可長時間阻塞）。
 
-        回傳:
-            是否存在。
+        參數:
+            method: 事件名稱，例如 "Page.screencastFrame"
+            callback: 事件處理函數
+            with_session: 為 True 時以 (事件參數, sessionId) 呼叫（分頁本身的事件 sessionId 為 None）
         """
-        return self.get_template_path(template_name).exists()
+        with self._pending_lock:
+            self._subscribers.setdefault(method, []).append((callback, with_session))
 
-    def capture_canvas_screenshot(
-        self, 
-        driver: WebDriver, 
-        save_path: Optional[Path] = None
-    ) -> Optional[np.ndarray]:
-        """只截取 Canvas 區域的畫面。
+    def send(
+        self,
+        method: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: float = Constants.CDP_CHANNEL_COMMAND_TIMEOUT,
+        session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """送出 CDP 指令並等待回應。
 
         參數:
-            driver: WebDriver 實例。
-            save_path: 儲存路徑（可選）
-            
+            method: 指令名稱
+            params: 指令參數（可選）
+            timeout: 等待回應的時間（秒）
+            session_id: 子 target 的 sessionId（可選，預設送往分頁本身）
+
         回傳:
-            OpenCV 格式的圖片陣列 (BGR)，失敗時回傳 None
+            指令結果（result 欄位）
+
+        異常:
+            CdpChannelError: 未連線、逾時或指令回傳錯誤
         """
-        try:
-            # 取得 Canvas 區域
-            rect = BrowserHelper.get_canvas_rect(driver)
-            if not rect:
-                self.logger.warning("無法取得 Canvas 區域")
-                return None
-            
-            # 取得完整截圖
-            full_screenshot = self.capture_screenshot(driver)
-            
-            # 裁切 Canvas 區域
-            x = int(rect['x'])
-            y = int(rect['y'])
-            w = int(rect['w'])
-            h = int(rect['h'])
-            
-            # 確保座標有效
-            height, width = full_screenshot.shape[:2]
-            x = max(0, min(x, width))
-            y = max(0, min(y, height))
-            w = min(w, width - x)
-            h = min(h, height - y)
-            
-            canvas_screenshot = full_screenshot[y:y+h, x:x+w]
-            
-            # 如果指定了儲存路徑，則儲存圖片
-            if save_path:
-                save_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                # 使用支援 Unicode 路徑的方式儲存圖片
-                is_success, buffer = cv2.imencode('.png', canvas_screenshot)
-                if is_success:
-                    with open(save_path, 'wb') as f:
-                        f.write(buffer.tobytes())
-                    self.logger.info(f"截圖已儲存 {save_path}")
-                else:
-                    self.logger.error("圖片編碼失敗")
-                    return None
-            
-            return canvas_screenshot
-            
-        except Exception as e:
-            self.logger.error(f"Canvas 截圖失敗: {e}")
-            return None
+        return self.wait_batch(self.post_batch([(method, params)], session_id), timeout)[0]
 
-    def capture_screenshot(self, driver: WebDriver, save_path: Optional[Path] = None) -> np.ndarray:
-        """截取瀏覽器畫面。
+    def post_batch(
+        self,
+        commands: List[Tuple[str, Optional[Dict[str, Any]]]],
+        session_id: Optional[str] = None
+    ) -> List[Tuple[int, str]]:
+        """依序送出多個 CDP 指令，不等待回應（以 wait_batch 等待）。
+
+        整組指令在同一次加鎖中連續寫入（其他執行緒的指令不會插入其中），
+        Chrome 依收到的順序處理同一分頁的指令，整組指令只需等待一次往返。
 
         參數:
-            driver: WebDriver 實例。
-            save_path: 儲存路徑（可選）
-            
+            commands: (指令名稱, 參數) 列表
+            session_id: 子 target 的 sessionId（可選，預設送往分頁本身）
+
         回傳:
-            OpenCV 格式的圖片陣列 (BGR)
-            
+            (指令編號, 指令名稱) 列表，交給 wait_batch 使用
+
         異常:
-            ImageDetectionError: 截圖失敗
+            CdpChannelError: 未連線或送出失敗
         """
+        pending: List[Tuple[int, str]] = []
+        with self._pending_lock:
+            for method, _ in commands:
+                self._next_id += 1
+                self._pending[self._next_id] = [threading.Event(), None]
+                pending.append((self._next_id, method))
         try:
-            # 取得截圖（base64 格式）
-            screenshot_base64 = driver.get_screenshot_as_base64()
-            
-            # 解碼並轉換為 OpenCV 格式
-            screenshot_bytes = base64.b64decode(screenshot_base64)
-            image = Image.open(io.BytesIO(screenshot_bytes))
-            image_cv = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-            
-            # 如果指定了儲存路徑，則儲存圖片
-            if save_path:
-                save_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                # 使用支援 Unicode 路徑的方式儲存圖片
-                is_success, buffer = cv2.imencode('.png', image_cv)
-                if is_success:
-                    with open(save_path, 'wb') as f:
-                        f.write(buffer.tobytes())
-                    self.logger.info(f"截圖已儲存 {save_path}")
-                else:
-                    raise ImageDetectionError(f"圖片編碼失敗")
-            
-            return image_cv
-            
-        except Exception as e:
-            raise ImageDetectionError(f"截圖失敗: {e}") from e
-    
-    def match_template(
-        self, 
-        screenshot: np.ndarray, 
-        template_path: Path, 
-        threshold: float = Constants.MATCH_THRESHOLD
-    ) -> Optional[Tuple[int, int, float]]:
-        """在截圖中尋找模板圖片。
-        
+            with self._send_lock:
+                for (message_id, method), (_, params) in zip(pending, commands):
+                    self._send_message(message_id, method, params, session_id)
+        except CdpChannelError:
+            self._discard_pending(pending)
+            raise
+        return pending
+
+    def wait_batch(
+        self,
+        pending: List[Tuple[int, str]],
+        timeout: float = Constants.CDP_CHANNEL_COMMAND_TIMEOUT
+    ) -> List[Dict[str, Any]]:
+        """等待 post_batch 送出的指令全部回應。
+
         參數:
-            screenshot: 截圖（OpenCV 格式）
-            template_path: 模板圖片路徑
-            threshold: 匹配閾值（0-1）
-            
+            pending: post_batch 的回傳值
+            timeout: 等待整組回應的時間（秒）
+
         回傳:
-            如果找到: (x, y, confidence) - 中心座標和信心度
-            如果未找到: None
-            
+            各指令結果（result 欄位），順序與送出時相同
+
         異常:
-            ImageDetectionError: 檢測失敗
+            CdpChannelError: 逾時、通道關閉或任一指令回傳錯誤
         """
+        deadline = time.monotonic() + timeout
         try:
-            if not template_path.exists():
-                raise FileNotFoundError(f"模板圖片不存在: {template_path}")
-            
-            # 讀取模板圖片（使用支援 Unicode 路徑的函式）
-            template = cv2_imread_unicode(template_path, cv2.IMREAD_COLOR)
-            if template is None:
-                raise ImageDetectionError(f"無法讀取模板圖片: {template_path}")
-            
-            # 取得模板尺寸
-            template_h, template_w = template.shape[:2]
-            
-            # 執行模板匹配
-            result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
-            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-            
-            # 檢查是否超過閾值
-            if max_val >= threshold:
-                # 計算中心座標
-                center_x = max_loc[0] + template_w // 2
-                center_y = max_loc[1] + template_h // 2
-                return (center_x, center_y, max_val)
-            
-            return None
-            
-        except FileNotFoundError:
-            raise
-        except Exception as e:
-            raise ImageDetectionError(f"圖片匹配失敗: {e}") from e
-    
+            with self._pending_lock:
+                entries = [self._pending[message_id] for message_id, _ in pending]
+            for (_, method), (done, _) in zip(pending, entries):
+                if not done.wait(timeout=max(0.0, deadline - time.monotonic())):
+                    raise CdpChannelError(f"CDP 指令逾時: {method}")
+            with self._pending_lock:
+                responses = [entry[1] for entry in entries]
+        finally:
+            self._discard_pending(pending)
+
+        results: List[Dict[str, Any]] = []
+        for (_, method), response in zip(pending, responses):
+            if response is None:
+                raise CdpChannelError(f"CDP 通道已關閉: {method}")
+            if 'error' in response:
+                raise CdpChannelError(f"CDP 指令失敗 {method}: {response['error'].get('message')}")
+            results.append(response.get('result', {}))
+        return results
+
+    def _discard_pending(self, pending: List[Tuple[int, str]]) -> None:
+        """移除等待回應的指令記錄。"""
+        with self._pending_lock:
+            for message_id, _ in pending:
+                self._pending.pop(message_id, None)
+
+    def send_nowait(
+        self,
+        method: str,
+        params: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None
+    ) -> None:
+        """送出 CDP 指令但不等待回應（例如畫面確認），未連線時忽略。
+
+        事件回呼中只能使用本方法送出指令（回應由事件接收執行緒處理，send 會等到逾時）。
+        """
+        with self._pending_lock:
+            self._next_id += 1
+            message_id = self._next_id
+        with suppress(CdpChannelError):
+            self._send_message(message_id, method, params, session_id)
+
+    def _send_message(
+        self,
+        message_id: int,
+        method: str,
+        params: Optional[Dict[str, Any]],
+        session_id: Optional[str] = None
+    ) -> None:
+        """序列化並送出一則指令（多執行緒共用連線，需加鎖；_send_lock 可重入，post_batch 持鎖呼叫）。"""
+        ws = self._ws
+        if ws is None or self._closed.is_set():
+            raise CdpChannelError(f"CDP 通道未連線: {method}")
+        message: Dict[str, Any] = {'id': message_id, 'method': method, 'params': params or {}}
+        if session_id is not None:
+            message['sessionId'] = session_id
+        payload = json.dumps(message)
+        try:
+            with self._send_lock:
+                ws.send(payload)
+        except Exception as e:
+            raise CdpChannelError(f"CDP 指令送出失敗 {method}: {e}") from e
+
+    def _read_loop(self) -> None:
+        """接收訊息：指令回應交給等待中的 send，事件分派給訂閱者。"""
+        ws = self._ws
+        while not self._closed.is_set() and ws is not None:
+            try:
+                raw = ws.recv()
+            except websocket.WebSocketTimeoutException:
+                continue
+            except Exception as e:
+                if not self._closed.is_set():
+                    self.logger.debug(f"{self.name} CDP 通道中斷: {e}")
+                break
+            if not raw:
+                continue
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                continue
+
+            if 'id' in message:
+                with self._pending_lock:
+                    pending = self._pending.get(message['id'])
+                    if pending is not None:
+                        pending[1] = message
+                        pending[0].set()
+                continue
+
+            method = message.get('method')
+            if method is None:
+                continue
+            self.events_received += 1
+            session_id = message.get('sessionId')
+            with self._pending_lock:
+                callbacks = list(self._subscribers.get(method, ()))
+            for callback, with_session in callbacks:
+                try:
+                    if with_session:
+                        callback(message.get('params', {}), session_id)
+                    else:
+                        callback(message.get('params', {}))
+                except Exception as e:
+                    self.logger.debug(f"{self.name} CDP 事件處理失敗 [{method}]: {e}")
+
+        self._closed.set()
+        # 喚醒所有等待中的指令（回應為 None 表示通道已關閉）
+        with self._pending_lock:
+            for pending in self._pending.values():
+                pending[0].set()
+
+    def close(self) -> None:
+        """關閉通道並停止事件接收執行緒。"""
+        self._closed.set()
+        ws = self._ws
+        self._ws = None
+        if ws is not None:
+            with suppress(Exception):
+                ws.close()
+        if self._reader is not None and self._reader is not threading.current_thread():
+            self._reader.join(timeout=Constants.CDP_CHANNEL_RECV_TIMEOUT * 2)
+        self._reader = None
+
+
+class InputDispatcher:
+    """單一瀏覽器的 CDP 輸入事件派送器。
+
+    chromedriver 的 execute_cdp_cmd 每個輸入事件都是一次 HTTP 往返（點擊需按下與放開兩次），
+    本類別改經由分頁的 DevTools WebSocket（CdpEventChannel）一次送出整組輸入事件，
+    只等待一次回應，並減少 chromedriver 的負載。
+    INPUT_DISPATCH_MODE 為 driver 或 DevTools 無法連線時，改用 execute_cdp_cmd 逐一送出。
+
+    BrowserThread 建立瀏覽器後以 register 登記，BrowserHelper 的點擊與按鍵方法
+    依 WebDriver 找到對應的派送器；未登記的 WebDriver 一律使用 execute_cdp_cmd。
+
+    範例:
+        >>> dispatcher = InputDispatcher(driver, "瀏覽器 1")
+        >>> InputDispatcher.register(dispatcher)
+        >>> dispatcher.dispatch(BrowserHelper.click_events(320, 240))
+    """
+
+    _registry: Dict[int, 'InputDispatcher'] = {}  # id(WebDriver) → 派送器
+    _registry_lock = threading.Lock()
+
+    def __init__(
+        self,
+        driver: WebDriver,
+        name: str = "",
+        logger: Optional[logging.Logger] = None
+    ) -> None:
+        """初始化派送器（第一次派送時才連線 DevTools）。
+
+        參數:
+            driver: WebDriver 實例
+            name: 顯示名稱（日誌用）
+            logger: 日誌記錄器（可選）
+        """
+        self.driver = driver
+        self.name = name
+        self.logger = logger or LoggerFactory.get_logger()
+        self._channel: Optional[CdpEventChannel] = None
+        self._channel_lock = threading.Lock()
+        self._channel_failed_at: float = 0.0
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, int] = {
+            'batches': 0, 'events': 0, 'driver_batches': 0, 'driver_events': 0, 'failures': 0,
+        }
+
+    @classmethod
+    def register(cls, dispatcher: 'InputDispatcher') -> None:
+        """登記派送器，之後對該 WebDriver 的輸入改由此派送器送出。"""
+        with cls._registry_lock:
+            cls._registry[id(dispatcher.driver)] = dispatcher
+
+    @classmethod
+    def unregister(cls, driver: WebDriver) -> None:
+        """取消登記。"""
+        with cls._registry_lock:
+            dispatcher = cls._registry.get(id(driver))
+            if dispatcher is not None and dispatcher.driver is driver:
+                del cls._registry[id(driver)]
+
+    @classmethod
+    def for_driver(cls, driver: WebDriver) -> Optional['InputDispatcher']:
+        """取得 WebDriver 對應的派送器，未登記時回傳 None。"""
+        with cls._registry_lock:
+            dispatcher = cls._registry.get(id(driver))
+        return dispatcher if dispatcher is not None and dispatcher.driver is driver else None
+
+    @property
+    def uses_devtools(self) -> bool:
+        """目前是否經由 DevTools WebSocket 派送。"""
+        channel = self._channel
+        return channel is not None and channel.is_connected
+
+    def dispatch(self, commands: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """依序送出一組 CDP 輸入指令並等待全部完成。
+
+        DevTools 連線中途失敗時不改用 execute_cdp_cmd 重送（部分事件可能已送達，
+        重送會造成重複點擊或按鍵），直接拋出例外；之後的派送改用 execute_cdp_cmd，
+        INPUT_DISPATCH_RETRY_INTERVAL 秒後再重新連線。
+
+        參數:
+            commands: (指令名稱, 參數) 列表，例如 BrowserHelper.click_events 的回傳值
+
+        異常:
+            CdpChannelError: DevTools 派送逾時或失敗
+            WebDriverException: execute_cdp_cmd 派送失敗
+        """
+        channel = self._get_channel()
+        if channel is None:
+            for method, params in commands:
+                self.driver.execute_cdp_cmd(method, params)
+            self._count('driver_batches', 'driver_events', len(commands))
+            return
+
+        try:
+            channel.wait_batch(channel.post_batch(commands), Constants.INPUT_DISPATCH_TIMEOUT)
+        except CdpChannelError as e:
+            self._count('failures')
+            self._drop_channel(channel, e)
+            raise
+        self._count('batches', 'events', len(commands))
+
+    def _count(self, batch_key: str, event_key: Optional[str] = None, events: int = 0) -> None:
+        """累計派送統計（多個執行緒可能同時對同一瀏覽器派送）。"""
+        with self._stats_lock:
+            self._stats[batch_key] += 1
+            if event_key is not None:
+                self._stats[event_key] += events
+
+    def _get_channel(self) -> Optional[CdpEventChannel]:
+        """取得連線中的 DevTools 通道，不使用或無法連線時回傳 None。"""
+        channel = self._channel
+        if channel is not None and channel.is_connected:
+            return channel
+        if self._closed or Constants.INPUT_DISPATCH_MODE != "devtools":
+            return None
+
+        with self._channel_lock:
+            channel = self._channel
+            if channel is not None and channel.is_connected:
+                return channel
+            if time.monotonic() - self._channel_failed_at < Constants.INPUT_DISPATCH_RETRY_INTERVAL:
+                return None
+            channel = CdpEventChannel(self.driver, f"{self.name} 輸入", self.logger)
+            try:
+                channel.connect()
+            except Exception as e:
+                self._channel_failed_at = time.monotonic()
+                self.logger.warning(f"{self.name} 輸入事件改用 chromedriver 送出: {e}")
+                return None
+            self._channel = channel
+            self.logger.debug(f"{self.name} 輸入事件經由 DevTools 送出")
+            return channel
+
+    def _drop_channel(self, channel: CdpEventChannel, error: Exception) -> None:
+        """關閉失敗的通道，重試間隔內改用 execute_cdp_cmd。"""
+        with self._channel_lock:
+            if self._channel is channel:
+                self._channel = None
+                self._channel_failed_at = time.monotonic()
+        channel.close()
+        self.logger.warning(f"{self.name} DevTools 輸入派送失敗，暫時改用 chromedriver: {error}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得派送統計（DevTools 與 chromedriver 各自的批次數與事件數）。"""
+        with self._stats_lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        stats['uses_devtools'] = self.uses_devtools
+        return stats
+
+    def close(self) -> None:
+        """關閉 DevTools 通道並取消登記（之後的派送改用 execute_cdp_cmd）。"""
+        self._closed = True
+        InputDispatcher.unregister(self.driver)
+        with self._channel_lock:
+            channel = self._channel
+            self._channel = None
+        if channel is not None:
+            channel.close()
+
+
+# =============================================================================
+# 網路狀態感測
+# =============================================================================
+
+@dataclass(frozen=True)
+class NetworkStateEvent:
+    """網路狀態事件。
+
+    屬性:
+        state: 判定的遊戲狀態。
+        source: 訊息來源（ws / http / close）。
+        excerpt: 觸發的訊息內容（截斷）。
+        timestamp: 訊息時間（time.time()，重播時為記錄的時間）。
+    """
+    state: str
+    source: str
+    excerpt: str
+    timestamp: float
+
+
+class NetworkStateClassifier:
+    """網路狀態分類器。
+
+    依網路狀態規則判斷單則網路訊息代表的遊戲狀態，不依賴瀏覽器，
+    同一套規則可用於即時感測與離線重播記錄的訊息。
+
+    範例:
+        >>> classifier = NetworkStateClassifier(ConfigReader().read_network_rules())
+        >>> classifier.classify("ws", '{"cmd": "kickout"}')
+        'lobby_return'
+        >>> events = classifier.replay(NetworkStateClassifier.read_frame_log(path))
+    """
+
+    EXCERPT_LENGTH: int = 120  # 事件保留的訊息長度
+
+    def __init__(self, rules: List[NetworkStateRule]) -> None:
+        """初始化分類器。
+
+        參數:
+            rules: 網路狀態規則列表（依順序比對，第一個符合的規則決定狀態）
+        """
+        self.rules = list(rules)
+        self._rules_by_source: Dict[str, List[NetworkStateRule]] = {
+            source: [rule for rule in self.rules if rule.source == source]
+            for source in Constants.NETWORK_SOURCES
+        }
+
+    @property
+    def covered_states(self) -> Set[str]:
+        """有規則可判斷的狀態。"""
+        return {rule.state for rule in self.rules}
+
+    def classify(self, source: str, text: str) -> Optional[str]:
+        """判斷單則訊息代表的狀態。
+
+        參數:
+            source: 訊息來源（ws / http / close）
+            text: 訊息內容
+
+        回傳:
+            狀態名稱，不符合任何規則時回傳 None
+        """
+        for rule in self._rules_by_source.get(source, ()):
+            if rule.matches(text):
+                return rule.state
+        return None
+
+    @staticmethod
+    def passes_cooldown(last_emitted: Dict[str, float], state: str, now: float) -> bool:
+        """同一狀態距上次觸發超過 NETWORK_STATE_COOLDOWN 秒時記錄並回傳 True。"""
+        last = last_emitted.get(state)
+        if last is not None and now - last < Constants.NETWORK_STATE_COOLDOWN:
+            return False
+        last_emitted[state] = now
+        return True
+
+    @staticmethod
+    def read_frame_log(path: Path) -> List[Dict[str, Any]]:
+        """讀取 NetworkStateSensor 記錄的訊息檔（每行一則 JSON: t / source / data）。
+
+        參數:
+            path: 記錄檔路徑
+
+        回傳:
+            訊息列表（無法解析的行略過）
+        """
+        entries: List[Dict[str, Any]] = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and 'source' in entry and 'data' in entry:
+                    entries.append(entry)
+        return entries
+
+    def replay(self, entries: List[Dict[str, Any]]) -> List[NetworkStateEvent]:
+        """離線重播記錄的訊息，回傳即時感測時會觸發的狀態事件（同樣套用重複觸發間隔）。
+
+        參數:
+            entries: read_frame_log 讀取的訊息列表
+
+        回傳:
+            依時間順序的狀態事件列表
+        """
+        events: List[NetworkStateEvent] = []
+        last_emitted: Dict[str, float] = {}
+        for entry in entries:
+            text = str(entry['data'])[:Constants.NETWORK_PAYLOAD_MAX_CHARS]
+            state = self.classify(entry['source'], text)
+            timestamp = float(entry.get('t', 0.0))
+            if state is not None and self.passes_cooldown(last_emitted, state, timestamp):
+                events.append(NetworkStateEvent(
+                    state, entry['source'], text[:self.EXCERPT_LENGTH], timestamp
+                ))
+        return events
+
+
+class NetworkStateSensor:
+    """單一瀏覽器的網路狀態感測。
+
+    透過 CdpEventChannel 監聽 Network 事件：WebSocket 文字訊息、HTTP 回應（狀態碼與網址）
+    與 WebSocket 關閉，交由 NetworkStateClassifier 判斷狀態後呼叫 on_state。
+    二進位 WebSocket 訊息只計入流量，不做比對。
+
+    遊戲在跨網域 iframe（獨立程序的子 target）中執行，分頁本身的 Network 事件收不到遊戲連線，
+    因此以 Target.setAutoAttach（flatten）附加子 target，並在各子 target 啟用 Network。
+    感測是否正常只看遊戲 WebSocket（符合 NETWORK_GAME_SOCKET_PATTERN，未設定時為子 target 內建立的
+    WebSocket）的訊息，大廳頁面的其他流量不算。
+    """
+
+    def __init__(
+        self,
+        driver: WebDriver,
+        name: str,
+        classifier: NetworkStateClassifier,
+        on_state: Callable[[NetworkStateEvent], None],
+        logger: Optional[logging.Logger] = None,
+        record_path: Optional[Path] = None
+    ) -> None:
+        """初始化感測（需呼叫 start 才會開始）。
+
+        參數:
+            driver: WebDriver 實例
+            name: 顯示名稱（日誌用）
+            classifier: 網路狀態分類器
+            on_state: 判定狀態時的回呼（在 CDP 事件接收執行緒中呼叫，不可長時間阻塞）
+            logger: 日誌記錄器（可選）
+            record_path: 訊息記錄檔路徑（可選，供離線重播）
+        """
+        self.driver = driver
+        self.name = name
+        self.classifier = classifier
+        self.on_state = on_state
+        self.logger = logger or LoggerFactory.get_logger()
+        self.record_path = record_path
+        self._channel: Optional[CdpEventChannel] = None
+        self._socket_urls: Dict[Tuple[Optional[str], str], str] = {}  # (sessionId, WebSocket requestId) → 網址
+        self._game_sockets: Set[Tuple[Optional[str], str]] = set()
+        self._game_socket_pattern = self._compile_game_socket_pattern()
+        self._last_emitted: Dict[str, float] = {}
+        self._record_lock = threading.Lock()
+        self._record_file: Optional[Any] = None
+        self.last_game_traffic_at: float = 0.0
+        self.messages_received: int = 0
+        self.game_frames_received: int = 0
+        self.events_emitted: int = 0
+
+    @property
+    def is_active(self) -> bool:
+        """感測是否仍在進行（CDP 通道連線中）。"""
+        return self._channel is not None and self._channel.is_connected
+
+    @property
+    def is_healthy(self) -> bool:
+        """感測進行中且 NETWORK_SENSOR_IDLE_TIMEOUT 秒內遊戲 WebSocket 有訊息（可取代截圖比對）。"""
+        return (
+            self.is_active
+            and time.monotonic() - self.last_game_traffic_at <= Constants.NETWORK_SENSOR_IDLE_TIMEOUT
+        )
+
+    def _compile_game_socket_pattern(self) -> Optional[re.Pattern]:
+        """編譯 NETWORK_GAME_SOCKET_PATTERN（未設定或無效時回傳 None，改以子 target 判斷）。"""
+        pattern = Constants.NETWORK_GAME_SOCKET_PATTERN.strip()
+        if not pattern:
+            return None
+        try:
+            return re.compile(pattern)
+        except re.error as e:
+            self.logger.warning(f"無效的遊戲 WebSocket 網址規則: {pattern} ({e})，改以遊戲 iframe 判斷")
+            return None
+
+    def start(self) -> None:
+        """連線 CDP 事件通道、啟用 Network 事件並自動附加子 target（遊戲 iframe）。
+
+        異常:
+            CdpChannelError: 連線或啟用失敗
+        """
+        if self.is_active:
+            return
+        self.stop()
+        channel = CdpEventChannel(self.driver, self.name, self.logger)
+        channel.connect()
+        channel.subscribe("Target.attachedToTarget", self._on_target_attached, with_session=True)
+        channel.subscribe("Target.detachedFromTarget", self._on_target_detached, with_session=True)
+        channel.subscribe("Network.webSocketCreated", self._on_socket_created, with_session=True)
+        channel.subscribe("Network.webSocketFrameReceived", self._on_socket_frame, with_session=True)
+        channel.subscribe("Network.webSocketClosed", self._on_socket_closed, with_session=True)
+        channel.subscribe("Network.responseReceived", self._on_response)
+        # 附加事件在 setAutoAttach 回應前就會送達，回呼需要 _channel 才能啟用子 target 的 Network
+        self._channel = channel
+        try:
+            channel.send("Network.enable")
+            channel.send("Target.setAutoAttach", Constants.NETWORK_AUTO_ATTACH_PARAMS)
+        except Exception:
+            self._channel = None
+            channel.close()
+            raise
+
+        if self.record_path is not None:
+            try:
+                self.record_path.parent.mkdir(parents=True, exist_ok=True)
+                self._record_file = open(self.record_path, 'a', encoding='utf-8')
+                self.logger.info(f"{self.name} 網路訊息記錄: {self.record_path}")
+            except OSError as e:
+                self.logger.warning(f"{self.name} 無法建立網路訊息記錄檔: {e}")
+        self.logger.debug(f"{self.name} 網路狀態感測已啟動")
+
+    def _on_target_attached(self, params: Dict[str, Any], session_id: Optional[str]) -> None:
+        """子 target 附加：啟用 Network，並讓其中的 iframe 也自動附加。
+
+        在事件接收執行緒中呼叫，只能以 send_nowait 送出指令。
+        """
+        channel = self._channel
+        child_session = params.get('sessionId')
+        if channel is None or not child_session:
+            return
+        target_info = params.get('targetInfo', {})
+        self.logger.debug(
+            f"{self.name} 已附加子 target [{target_info.get('type')}]: {target_info.get('url', '')[:120]}"
+        )
+        channel.send_nowait("Network.enable", session_id=child_session)
+        channel.send_nowait("Target.setAutoAttach", Constants.NETWORK_AUTO_ATTACH_PARAMS, session_id=child_session)
+
+    def _on_target_detached(self, params: Dict[str, Any], session_id: Optional[str]) -> None:
+        """子 target 卸離：移除該 target 的 WebSocket 記錄。"""
+        child_session = params.get('sessionId')
+        for key in [key for key in self._socket_urls if key[0] == child_session]:
+            self._socket_urls.pop(key, None)
+            self._game_sockets.discard(key)
+
+    def _on_socket_created(self, params: Dict[str, Any], session_id: Optional[str]) -> None:
+        """記錄 WebSocket 網址（關閉事件只帶 requestId），並判斷是否為遊戲連線。"""
+        key = (session_id, params.get('requestId', ''))
+        url = params.get('url', '')
+        self._socket_urls[key] = url
+        if self._game_socket_pattern is not None:
+            is_game = self._game_socket_pattern.search(url) is not None
+        else:
+            is_game = session_id is not None
+        if is_game:
+            self._game_sockets.add(key)
+
+    def _on_socket_frame(self, params: Dict[str, Any], session_id: Optional[str]) -> None:
+        """WebSocket 訊息：文字訊息交給分類器，二進位訊息只計入流量；遊戲連線的訊息更新健康時間。"""
+        if (session_id, params.get('requestId', '')) in self._game_sockets:
+            self.last_game_traffic_at = time.monotonic()
+            self.game_frames_received += 1
+        response = params.get('response', {})
+        text = response.get('payloadData', '') if response.get('opcode', 1) == 1 else None
+        self._observe("ws", text)
+
+    def _on_socket_closed(self, params: Dict[str, Any], session_id: Optional[str]) -> None:
+        """WebSocket 關閉：以網址比對。"""
+        key = (session_id, params.get('requestId', ''))
+        self._game_sockets.discard(key)
+        self._observe("close", self._socket_urls.pop(key, ''))
+
+    def _on_response(self, params: Dict[str, Any]) -> None:
+        """HTTP 回應：以「狀態碼 網址」比對。"""
+        response = params.get('response', {})
+        self._observe("http", f"{response.get('status', 0)} {response.get('url', '')}")
+
+    def _observe(self, source: str, text: Optional[str]) -> None:
+        """計數、記錄訊息並判斷狀態。"""
+        self.messages_received += 1
+        if text is None:
+            return
+        text = text[:Constants.NETWORK_PAYLOAD_MAX_CHARS]
+        now = time.time()
+
+        with self._record_lock:
+            if self._record_file is not None:
+                with suppress(Exception):
+                    self._record_file.write(
+                        json.dumps({'t': round(now, 3), 'source': source, 'data': text}, ensure_ascii=False) + "\n"
+                    )
+
+        state = self.classifier.classify(source, text)
+        if state is None or not NetworkStateClassifier.passes_cooldown(self._last_emitted, state, now):
+            return
+        self.events_emitted += 1
+        event = NetworkStateEvent(state, source, text[:NetworkStateClassifier.EXCERPT_LENGTH], now)
+        try:
+            self.on_state(event)
+        except Exception as e:
+            self.logger.error(f"{self.name} 網路狀態處理失敗 [{state}]: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """取得感測統計（收到的訊息數、其中遊戲 WebSocket 訊息數、觸發的狀態事件數）。"""
+        return {
+            'messages': self.messages_received,
+            'game_frames': self.game_frames_received,
+            'events': self.events_emitted,
+        }
+
+    def stop(self) -> None:
+        """停用 Network 事件並關閉 CDP 通道與記錄檔。"""
+        channel = self._channel
+        self._channel = None
+        if channel is not None:
+            if channel.is_connected:
+                with suppress(Exception):
+                    channel.send("Network.disable", timeout=1.0)
+            channel.close()
+        with self._record_lock:
+            if self._record_file is not None:
+                with suppress(Exception):
+                    self._record_file.close()
+                self._record_file = None
+        self._socket_urls.clear()
+        self._game_sockets.clear()
+
+
+# =============================================================================
+# 圖片檢測器
+# =============================================================================
+
+@dataclass
+class TemplateCacheEntry:
+    """模板快取項目。
+
+    保存已解碼的模板圖片與檔案狀態，用於判斷快取是否失效。
+
+    屬性:
+        mtime_ns: 讀取時的檔案修改時間（奈秒）。
+        size: 讀取時的檔案大小（位元組）。
+        bgr: BGR 彩色模板陣列。
+        gray: 灰階模板陣列。
+        pyramid: 縮小倍率 → 縮小後的 BGR 模板（金字塔比對用，載入時預先計算）。
+        canvas_size: 截取模板時的 Canvas 尺寸 (width, height)（截圖像素，無描述檔時為 None）。
+    """
+    mtime_ns: int
+    size: int
+    bgr: np.ndarray
+    gray: np.ndarray
+    pyramid: Dict[int, np.ndarray] = field(default_factory=dict)
+    canvas_size: Optional[Tuple[int, int]] = None
+
+
+@dataclass
+class FrameGateEntry:
+    """畫面變化閘門項目。
+
+    保存上次完整比對時的畫面指紋與檢測結果。
+
+    屬性:
+        fingerprint: 畫面灰階縮圖。
+        signature: 比對條件（畫面偏移、尺寸、模板列表、閾值），不同時不沿用結果。
+        results: 上次的檢測結果。
+        matched_at: 上次完整比對的時間（monotonic）。
+    """
+    fingerprint: np.ndarray
+    signature: Tuple[Any, ...]
+    results: Dict[str, Optional[Tuple[int, int, float]]]
+    matched_at: float
+
+
+@dataclass(frozen=True)
+class CaptureFormat:
+    """截圖編碼格式。
+
+    屬性:
+        format: 編碼格式（png / jpeg / webp）。
+        quality: 有損格式品質（1-100），PNG 忽略此值。
+    """
+    format: str = "png"
+    quality: int = 100
+
+    @property
+    def is_lossless(self) -> bool:
+        """是否為無損格式。"""
+        return self.format == "png"
+
+    @classmethod
+    def parse(cls, spec: Optional[str]) -> 'CaptureFormat':
+        """解析格式字串。
+
+        參數:
+            spec: "png"、"jpeg:80"、"webp:75" 等格式字串（None 表示 PNG）
+
+        回傳:
+            CaptureFormat 實例
+
+        異常:
+            ValueError: 格式或品質無效
+        """
+        if not spec:
+            return cls()
+
+        name, _, quality_str = spec.strip().lower().partition(':')
+        if name == "jpg":
+            name = "jpeg"
+        if name not in Constants.CAPTURE_FORMATS:
+            raise ValueError(f"不支援的截圖格式: {spec}")
+        if name == "png":
+            return cls()
+
+        quality = int(quality_str) if quality_str else Constants.DEFAULT_LOSSY_QUALITY
+        if not 1 <= quality <= 100:
+            raise ValueError(f"截圖品質必須介於 1-100: {spec}")
+        return cls(format=name, quality=quality)
+
+    def __str__(self) -> str:
+        return self.format if self.is_lossless else f"{self.format}:{self.quality}"
+
+
+class FrameProvider:
+    """單一瀏覽器的共用畫面來源。
+
+    快取最近一次擷取並解碼的整窗畫面與擷取時間，讓錯誤監控、金額識別、
+    恢復檢測等獨立循環在容許的畫面年齡內共用同一張截圖。
+    同時發出的請求合併為一次擷取，其餘請求等待該次結果。
+
+    畫面年齡以擷取開始時間計算，因此請求前已開始的擷取不會被視為較新的畫面。
+    快取的畫面為唯讀陣列，使用端不可就地修改。
+
+    屬性:
+        name: 顯示名稱（日誌用）。
+        captures: 實際擷取次數。
+        hits: 直接使用快取畫面的次數。
+        coalesced: 等待其他執行緒擷取後共用結果的次數。
+        screencast: 該瀏覽器的畫面串流（啟用時由 BrowserThread 設定）。
+        screencast_hits: 使用串流畫面的次數。
+    """
+
+    def __init__(self, name: str = "") -> None:
+        """初始化共用畫面來源。
+
+        參數:
+            name: 顯示名稱（日誌用）
+        """
+        self.name = name
+        self._condition = threading.Condition()
+        self._frame: Optional[np.ndarray] = None
+        self._frame_time: float = 0.0          # 擷取開始時間（monotonic）
+        self._frame_source: Optional[str] = None
+        self._frame_lossless: bool = False
+        self._capturing: bool = False
+        self.captures: int = 0
+        self.hits: int = 0
+        self.coalesced: int = 0
+        self.screencast: Optional['ScreencastSession'] = None
+        self.screencast_hits: int = 0
+
+    def _is_fresh(self, source: str, not_before: float, lossless: bool) -> bool:
+        """快取畫面是否符合請求條件（需在持有鎖時呼叫）。"""
+        return (
+            self._frame is not None
+            and self._frame_source == source
+            and self._frame_time >= not_before
+            and (self._frame_lossless or not lossless)
+        )
+
+    def peek(self, source: str, max_age: float, lossless: bool = True) -> Optional[np.ndarray]:
+        """取得符合條件的快取畫面，不觸發擷取。
+
+        參數:
+            source: 畫面來源識別（WebDriver session_id）
+            max_age: 可接受的畫面年齡（秒）
+            lossless: 是否要求無損畫面
+
+        回傳:
+            快取畫面，不符合條件時回傳 None
+        """
+        with self._condition:
+            if self._is_fresh(source, time.monotonic() - max_age, lossless):
+                self.hits += 1
+                return self._frame
+        return None
+
+    def peek_screencast(self) -> Optional[np.ndarray]:
+        """取得畫面串流的最新畫面（未啟用、串流中斷或畫面過舊時回傳 None）。
+
+        串流畫面為有損且可能小於整窗截圖，只提供給模板檢測使用
+        （見 ImageDetector._capture_for_templates）。
+        """
+        screencast = self.screencast
+        if screencast is None:
+            return None
+        frame = screencast.latest_frame()
+        if frame is not None:
+            with self._condition:
+                self.screencast_hits += 1
+        return frame
+
+    def get_frame(
+        self,
+        source: str,
+        capture: Callable[[], np.ndarray],
+        max_age: float,
+        lossless: bool = True
+    ) -> np.ndarray:
+        """取得不超過指定年齡的畫面。
+
+        快取畫面符合條件時直接回傳；已有其他執行緒在擷取時等待其結果；
+        否則由目前執行緒呼叫 capture 擷取並更新快取。
+
+        參數:
+            source: 畫面來源識別（WebDriver session_id），不同來源的畫面不共用
+            capture: 擷取並解碼整窗畫面的函數
+            max_age: 可接受的畫面年齡（秒），0 表示只接受請求之後開始的擷取
+            lossless: 是否要求無損畫面（有損畫面不提供給要求無損的請求）
+
+        回傳:
+            唯讀的 BGR 畫面陣列
+
+        異常:
+            capture 拋出的例外
+        """
+        not_before = time.monotonic() - max_age
+        wait_deadline = time.monotonic() + Constants.FRAME_CAPTURE_WAIT_TIMEOUT
+        waited = False
+        is_owner = False
+        
+        with self._condition:
+            while True:
+                if self._is_fresh(source, not_before, lossless):
+                    if waited:
+                        self.coalesced += 1
+                    else:
+                        self.hits += 1
+                    return self._frame
+                if not self._capturing:
+                    self._capturing = True
+                    is_owner = True
+                    break
+                remaining = wait_deadline - time.monotonic()
+                if remaining <= 0:
+                    # 其他執行緒的擷取卡住時自行擷取，不取得擷取權
+                    break
+                waited = True
+                self._condition.wait(timeout=remaining)
+        
+        capture_time = time.monotonic()
+        try:
+            frame = capture()
+            frame.setflags(write=False)
+        except Exception:
+            if is_owner:
+                with self._condition:
+                    self._capturing = False
+                    self._condition.notify_all()
+            raise
+        
+        with self._condition:
+            if capture_time >= self._frame_time or self._frame_source != source:
+                self._frame = frame
+                self._frame_time = capture_time
+                self._frame_source = source
+                self._frame_lossless = lossless
+            self.captures += 1
+            if is_owner:
+                self._capturing = False
+            self._condition.notify_all()
+        return frame
+
+    def invalidate(self) -> None:
+        """清除快取畫面（例如瀏覽器重建後）。"""
+        with self._condition:
+            self._frame = None
+            self._frame_source = None
+
+    def get_stats(self) -> Dict[str, int]:
+        """取得共用畫面統計。
+
+        回傳:
+            {"captures": 實際擷取次數, "hits": 快取命中次數, "coalesced": 合併等待次數,
+             "screencast_hits": 使用串流畫面次數}
+        """
+        with self._condition:
+            return {
+                "captures": self.captures,
+                "hits": self.hits,
+                "coalesced": self.coalesced,
+                "screencast_hits": self.screencast_hits,
+            }
+
+
+class ScreencastBuffer:
+    """單一瀏覽器的畫面串流環狀緩衝區。
+
+    保存最近 capacity 張串流畫面（編碼後的位元組與到達時間），
+    最新一張在第一次被讀取時才解碼，之後的讀取共用同一個解碼結果。
+    """
+
+    def __init__(self, capacity: int = Constants.SCREENCAST_BUFFER_SIZE) -> None:
+        """初始化環狀緩衝區。
+
+        參數:
+            capacity: 保留的畫面數量
+        """
+        self._frames: Deque[Tuple[float, int, bytes, Dict[str, Any]]] = deque(maxlen=max(1, capacity))
+        self._lock = threading.Lock()
+        self._sequence: int = 0
+        self._decoded: Optional[Tuple[int, np.ndarray]] = None  # (畫面序號, 解碼結果)
+        self.received: int = 0
+        self.decoded: int = 0
+        self.evicted: int = 0
+
+    def push(self, data: bytes, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """加入一張串流畫面（緩衝區已滿時捨棄最舊的一張）。
+
+        參數:
+            data: JPEG / PNG 位元組
+            metadata: Page.screencastFrame 的 metadata（可選）
+        """
+        with self._lock:
+            if len(self._frames) == self._frames.maxlen:
+                self.evicted += 1
+            self._sequence += 1
+            self._frames.append((time.monotonic(), self._sequence, data, metadata or {}))
+            self.received += 1
+
+    def latest(self, max_age: float) -> Optional[np.ndarray]:
+        """取得最新且不超過 max_age 秒的畫面。
+
+        參數:
+            max_age: 可接受的畫面年齡（秒，以到達時間計算）
+
+        回傳:
+            唯讀的 BGR 畫面陣列，沒有符合條件的畫面或解碼失敗時回傳 None
+        """
+        with self._lock:
+            if not self._frames:
+                return None
+            received_at, sequence, data, _ = self._frames[-1]
+            if time.monotonic() - received_at > max_age:
+                return None
+            if self._decoded is not None and self._decoded[0] == sequence:
+                return self._decoded[1]
+
+        with ComputeBudget.get_shared().slot():
+            frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            return None
+        frame.setflags(write=False)
+        with self._lock:
+            if self._decoded is None or self._decoded[0] < sequence:
+                self._decoded = (sequence, frame)
+            self.decoded += 1
+        return frame
+
+    def snapshot(self) -> List[Tuple[float, bytes, Dict[str, Any]]]:
+        """取得緩衝區內所有畫面（由舊到新的 (到達時間, 位元組, metadata)）。"""
+        with self._lock:
+            return [(received_at, data, metadata) for received_at, _, data, metadata in self._frames]
+
+    def clear(self) -> None:
+        """清除所有畫面。"""
+        with self._lock:
+            self._frames.clear()
+            self._decoded = None
+
+    def get_stats(self) -> Dict[str, int]:
+        """取得串流統計。
+
+        回傳:
+            {"received": 收到畫面數, "decoded": 解碼次數, "evicted": 緩衝區滿而捨棄的畫面數}
+        """
+        with self._lock:
+            return {
+                "received": self.received,
+                "decoded": self.decoded,
+                "evicted": self.evicted,
+            }
+
+
+class ScreencastSession:
+    """單一瀏覽器的 CDP 畫面串流（Page.startScreencast）。
+
+    Chrome 在畫面變化時主動推送縮小後的畫面，不需輪詢截圖，
+    畫面存入 ScreencastBuffer 供檢測端讀取。每張畫面到達後立即確認，
+    Chrome 才會繼續推送下一張。
+    """
+
+    def __init__(
+        self,
+        driver: WebDriver,
+        name: str = "",
+        logger: Optional[logging.Logger] = None
+    ) -> None:
+        """初始化畫面串流（需呼叫 start 才會開始）。
+
+        參數:
+            driver: WebDriver 實例
+            name: 顯示名稱（日誌用）
+            logger: 日誌記錄器（可選）
+        """
+        self.driver = driver
+        self.name = name
+        self.logger = logger or LoggerFactory.get_logger()
+        self.buffer = ScreencastBuffer(Constants.SCREENCAST_BUFFER_SIZE)
+        self._channel: Optional[CdpEventChannel] = None
+
+    @property
+    def is_active(self) -> bool:
+        """串流是否仍在進行（CDP 通道連線中）。"""
+        return self._channel is not None and self._channel.is_connected
+
+    def start(self) -> None:
+        """連線 CDP 事件通道並開始串流。
+
+        異常:
+            CdpChannelError: 連線或啟動串流失敗
+        """
+        if self.is_active:
+            return
+        self.stop()
+        channel = CdpEventChannel(self.driver, self.name, self.logger)
+        channel.connect()
+        channel.subscribe("Page.screencastFrame", self._on_frame)
+        # 第一張畫面可能在指令回應前到達，需先設定通道才能確認
+        self._channel = channel
+        try:
+            channel.send("Page.startScreencast", {
+                "format": Constants.SCREENCAST_FORMAT,
+                "quality": Constants.SCREENCAST_QUALITY,
+                "maxWidth": Constants.SCREENCAST_MAX_WIDTH,
+                "maxHeight": Constants.SCREENCAST_MAX_HEIGHT,
+                "everyNthFrame": Constants.SCREENCAST_EVERY_NTH_FRAME,
+            })
+        except Exception:
+            self._channel = None
+            channel.close()
+            raise
+        self.logger.debug(f"{self.name} 畫面串流已啟動")
+
+    def _on_frame(self, params: Dict[str, Any]) -> None:
+        """收到串流畫面：先確認（讓 Chrome 繼續推送），再存入緩衝區。"""
+        channel = self._channel
+        if channel is not None and 'sessionId' in params:
+            channel.send_nowait("Page.screencastFrameAck", {"sessionId": params['sessionId']})
+        data = params.get('data')
+        if data:
+            self.buffer.push(base64.b64decode(data), params.get('metadata'))
+
+    def latest_frame(self) -> Optional[np.ndarray]:
+        """取得最新的串流畫面（串流中斷或超過 SCREENCAST_MAX_FRAME_AGE 秒時回傳 None）。"""
+        if not self.is_active:
+            return None
+        return self.buffer.latest(Constants.SCREENCAST_MAX_FRAME_AGE)
+
+    def stop(self) -> None:
+        """停止串流並關閉 CDP 通道。"""
+        channel = self._channel
+        self._channel = None
+        if channel is None:
+            return
+        if channel.is_connected:
+            with suppress(Exception):
+                channel.send("Page.stopScreencast", timeout=1.0)
+        channel.close()
+        self.buffer.clear()
+
+
+class ComputeBudget:
+    """影像運算資源預算（整個程序共用一個）。
+
+    每個瀏覽器各有一個執行緒進行解碼與比對，OpenCV 又可能在每次呼叫內
+    再開多個執行緒，瀏覽器數量多時會嚴重超額使用 CPU 核心。
+    以號誌限制同時進行的影像運算數量，並依此設定 OpenCV 內部執行緒數，
+    同時統計等待號誌的時間與實際運算時間，作為調整依據。
+    同一執行緒內巢狀取得（例如 match_template 內再載入模板）不會重複佔用名額。
+    """
+
+    _shared: Optional['ComputeBudget'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        slots: int = 0,
+        opencv_threads: int = 0,
+        logger: Optional[logging.Logger] = None
+    ) -> None:
+        """初始化運算資源預算。
+
+        參數:
+            slots: 同時進行影像運算的上限（0 表示 CPU 核心數）
+            opencv_threads: 每次運算的 OpenCV 內部執行緒數（0 表示 CPU 核心數 ÷ slots）
+            logger: 日誌記錄器（可選）
+        """
+        self.logger = logger or LoggerFactory.get_logger()
+        cores = os.cpu_count() or 1
+        self.slots = slots if slots > 0 else cores
+        self.opencv_threads = opencv_threads if opencv_threads > 0 else max(1, cores // self.slots)
+        self._semaphore = threading.BoundedSemaphore(self.slots)
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._acquisitions: int = 0
+        self._wait_time: float = 0.0
+        self._max_wait: float = 0.0
+        self._compute_time: float = 0.0
+        self._active: int = 0
+        self._peak_active: int = 0
+
+    @classmethod
+    def get_shared(cls) -> 'ComputeBudget':
+        """取得整個程序共用的運算資源預算（首次呼叫時依 Constants 建立並設定 OpenCV）。"""
+        if cls._shared is not None:
+            return cls._shared
+        with cls._shared_lock:
+            if cls._shared is None:
+                budget = cls(Constants.VISION_COMPUTE_SLOTS, Constants.VISION_OPENCV_THREADS)
+                budget.apply_opencv_threads()
+                cls._shared = budget
+            return cls._shared
+
+    def apply_opencv_threads(self) -> None:
+        """將 OpenCV 內部執行緒數設為 opencv_threads（影響整個程序）。"""
+        cv2.setNumThreads(self.opencv_threads)
+        self.logger.debug(
+            f"影像運算資源: 同時運算上限 {self.slots}，OpenCV 執行緒 {cv2.getNumThreads()}"
+        )
+
+    @contextmanager
+    def slot(self):
+        """佔用一個運算名額直到離開 with 區塊（名額用完時等待）。"""
+        depth = getattr(self._local, 'depth', 0)
+        if depth > 0:
+            # 同一執行緒已持有名額
+            self._local.depth = depth + 1
+            try:
+                yield
+            finally:
+                self._local.depth = depth
+            return
+
+        wait_start = time.perf_counter()
+        self._semaphore.acquire()
+        compute_start = time.perf_counter()
+        self._local.depth = 1
+        with self._stats_lock:
+            self._active += 1
+            self._peak_active = max(self._peak_active, self._active)
+        try:
+            yield
+        finally:
+            self._local.depth = 0
+            self._semaphore.release()
+            wait = compute_start - wait_start
+            compute = time.perf_counter() - compute_start
+            with self._stats_lock:
+                self._active -= 1
+                self._acquisitions += 1
+                self._wait_time += wait
+                self._max_wait = max(self._max_wait, wait)
+                self._compute_time += compute
+
+    def get_stats(self) -> Dict[str, float]:
+        """取得運算資源統計。
+
+        回傳:
+            包含 slots（同時運算上限）、opencv_threads、acquisitions（運算次數）、
+            avg_wait_ms / max_wait_ms（等待名額時間）、avg_compute_ms（運算時間）、
+            wait_ratio（等待佔總時間比例）與 peak_active（最高同時運算數）的字典
+        """
+        with self._stats_lock:
+            count = self._acquisitions
+            total = self._wait_time + self._compute_time
+            return {
+                'slots': self.slots,
+                'opencv_threads': self.opencv_threads,
+                'acquisitions': count,
+                'avg_wait_ms': self._wait_time / count * 1000 if count else 0.0,
+                'max_wait_ms': self._max_wait * 1000,
+                'avg_compute_ms': self._compute_time / count * 1000 if count else 0.0,
+                'wait_ratio': self._wait_time / total if total else 0.0,
+                'peak_active': self._peak_active,
+            }
+
+    def reset_stats(self) -> None:
+        """清除統計。"""
+        with self._stats_lock:
+            self._acquisitions = 0
+            self._wait_time = 0.0
+            self._max_wait = 0.0
+            self._compute_time = 0.0
+            self._peak_active = self._active
+
+
+class AdaptiveWaitPolicy:
+    """檢測等待循環的輪詢間隔策略。
+
+    預期畫面即將出現時以最短間隔輪詢；畫面持續沒有變化時，間隔每次乘以倍數
+    並加上隨機抖動（避免多個瀏覽器同時截圖），最長不超過上限；
+    observe 觀察到狀態變化（例如畫面版本改變）時回到最短間隔。
+
+    範例:
+        >>> policy = AdaptiveWaitPolicy.for_site("recovery")
+        >>> while detector.detect_in_browser(driver, name) is not None:
+        ...     policy.observe(detector.get_frame_version(driver))
+        ...     policy.wait()
+        >>> policy.get_stats()['captures_saved']
+    """
+
+    def __init__(
+        self,
+        initial: float,
+        maximum: float,
+        factor: float,
+        jitter: float = Constants.WAIT_POLL_JITTER
+    ) -> None:
+        """初始化輪詢策略。
+
+        參數:
+            initial: 最短間隔（秒）
+            maximum: 最長間隔（秒）
+            factor: 每次未變化時的間隔倍數
+            jitter: 隨機抖動比例（0.2 表示 ±20%）
+        """
+        self.initial = max(0.0, initial)
+        self.maximum = max(self.initial, maximum)
+        self.factor = max(1.0, factor)
+        self.jitter = max(0.0, jitter)
+        self._interval = self.initial
+        self._last_state: Any = None
+        self._started_at = time.monotonic()
+        self._waited: float = 0.0
+        self._waits: int = 0
+        self.resets: int = 0
+
+    @classmethod
+    def for_site(cls, site: str) -> 'AdaptiveWaitPolicy':
+        """依 Constants.WAIT_POLL_PROFILES 的呼叫位置設定建立策略（未設定時使用固定 DETECTION_INTERVAL）。"""
+        initial, maximum, factor = Constants.WAIT_POLL_PROFILES.get(
+            site, (Constants.DETECTION_INTERVAL, Constants.DETECTION_INTERVAL, 1.0)
+        )
+        return cls(initial, maximum, factor)
+
+    def observe(self, state: Any) -> bool:
+        """記錄本次檢測觀察到的狀態，與上次不同時回到最短間隔。
+
+        參數:
+            state: 可比較的狀態（例如畫面版本，或多個瀏覽器畫面版本的 tuple）
+
+        回傳:
+            狀態是否變化
+        """
+        changed = self._last_state is not None and state != self._last_state
+        self._last_state = state
+        if changed:
+            self.reset()
+        return changed
+
+    def reset(self) -> None:
+        """回到最短間隔。"""
+        self._interval = self.initial
+        self.resets += 1
+
+    def next_interval(self) -> float:
+        """取得下一次等待的秒數，並將之後的間隔乘以倍數（不超過上限）。"""
+        interval = self._interval
+        self._interval = min(self.maximum, self._interval * self.factor)
+        if self.jitter > 0:
+            interval *= 1.0 + random.uniform(-self.jitter, self.jitter)
+        return min(self.maximum, max(0.0, interval))
+
+    def wait(self, stop_event: Optional[threading.Event] = None) -> bool:
+        """等待下一次檢測。
+
+        參數:
+            stop_event: 停止事件（可選，設定時提前結束等待）
+
+        回傳:
+            False 表示等待期間收到停止事件
+        """
+        self._waits += 1
+        interval = self.next_interval()
+        self._waited += interval
+        if stop_event is not None:
+            return not stop_event.wait(timeout=interval)
+        time.sleep(interval)
+        return True
+
+    @property
+    def polls(self) -> int:
+        """檢測次數（每次等待之前與最後一次各檢測一次）。"""
+        return self._waits + 1
+
+    @property
+    def elapsed(self) -> float:
+        """自建立以來經過的時間（秒）。"""
+        return time.monotonic() - self._started_at
+
+    @property
+    def captures_saved(self) -> int:
+        """與固定 DETECTION_INTERVAL 輪詢相比少擷取的次數（負數表示多擷取）。
+
+        以同樣的總時間、相同的單次檢測耗時估算固定間隔會檢測的次數。
+        """
+        elapsed = self.elapsed
+        detect_time = max(0.0, elapsed - self._waited) / self.polls
+        # 固定間隔下 k 次檢測需 k × 檢測耗時 + (k - 1) × 間隔
+        fixed_polls = (elapsed + Constants.DETECTION_INTERVAL) / (Constants.DETECTION_INTERVAL + detect_time)
+        return int(round(fixed_polls - self.polls))
+
+    def get_stats(self) -> Dict[str, float]:
+        """取得等待統計。
+
+        回傳:
+            包含 polls（檢測次數）、elapsed（經過秒數）、resets（回到最短間隔次數）
+            與 captures_saved（少擷取次數）的字典
+        """
+        return {
+            'polls': self.polls,
+            'elapsed': self.elapsed,
+            'resets': self.resets,
+            'captures_saved': self.captures_saved,
+        }
+
+    def summary(self) -> str:
+        """等待統計摘要（日誌用）。"""
+        return (
+            f"檢測 {self.polls} 次（{self.elapsed:.1f} 秒），"
+            f"較固定間隔少擷取 {self.captures_saved} 次"
+        )
+
+
+class BetSizeTemplateBank:
+    """下注金額模板庫。
+
+    將 bet_size 資料夾中的所有金額模板一次載入為連續的灰階陣列，
+    並解析檔名取得對應金額（僅保留 Constants.GAME_BETSIZE 中的金額）。
+    資料夾內容變更時才重新掃描載入，比對時完全使用記憶體中的模板。
+
+    變更判斷方式:
+        - 每次比對檢查資料夾修改時間（新增、刪除檔案時立即重新載入）
+        - 每隔 BETSIZE_BANK_RESCAN_INTERVAL 秒比對各檔案的修改時間與大小
+          （偵測覆寫既有模板）
+        - 呼叫 invalidate() 強制下次比對前重新載入
+
+    屬性:
+        bet_size_dir: 金額模板資料夾路徑。
+        logger: 日誌記錄器。
+        reload_count: 實際重新載入次數。
+    """
+
+    def __init__(self, bet_size_dir: Path, logger: Optional[logging.Logger] = None) -> None:
+        """初始化金額模板庫。
+
+        參數:
+            bet_size_dir: 金額模板資料夾路徑
+            logger: 日誌記錄器（可選）
+        """
+        self.bet_size_dir = bet_size_dir
+        self.logger = logger or LoggerFactory.get_logger()
+        self.reload_count: int = 0
+
+        self._lock = threading.Lock()
+        self._dir_mtime_ns: Optional[int] = None
+        self._signature: Optional[Tuple[Tuple[str, int, int], ...]] = None
+        self._last_scan_time: float = 0.0
+
+        # 模板快照（整組替換，讀取端不需加鎖）
+        self._labels: Tuple[str, ...] = ()
+        self._amounts: Tuple[float, ...] = ()
+        self._templates: Tuple[np.ndarray, ...] = ()
+
+    @property
+    def amounts(self) -> Tuple[float, ...]:
+        """已載入的金額列表（由小到大）。"""
+        return self._amounts
+
+    def entries(self) -> Tuple[Tuple[str, np.ndarray], ...]:
+        """檢查資料夾變更後，取得目前所有 (金額標籤, 灰階模板)。"""
+        self.refresh()
+        return tuple(zip(self._labels, self._templates))
+
+    def invalidate(self) -> None:
+        """標記模板庫失效，下次比對前重新掃描資料夾。"""
+        with self._lock:
+            self._signature = None
+
+    def _scan_signature(self) -> Tuple[Tuple[str, int, int], ...]:
+        """掃描資料夾，取得所有 PNG 檔案的 (檔名, 修改時間, 大小)。"""
+        entries = []
+        with os.scandir(self.bet_size_dir) as iterator:
+            for entry in iterator:
+                if entry.is_file() and entry.name.lower().endswith('.png'):
+                    stat = entry.stat()
+                    entries.append((entry.name, stat.st_mtime_ns, stat.st_size))
+        entries.sort()
+        return tuple(entries)
+
+    def _load(self, signature: Tuple[Tuple[str, int, int], ...]) -> None:
+        """依掃描結果載入所有金額模板（需在鎖內呼叫）。"""
+        loaded: List[Tuple[float, str, np.ndarray]] = []
+
+        for filename, _, _ in signature:
+            label = Path(filename).stem
+            try:
+                amount = float(label)
+            except ValueError:
+                self.logger.warning(f"金額模板檔名無法解析，已略過: {filename}")
+                continue
+
+            if amount not in Constants.GAME_BETSIZE:
+                self.logger.warning(f"金額模板 {filename} 不在 GAME_BETSIZE 中，已略過")
+                continue
+
+            template = cv2_imread_unicode(self.bet_size_dir / filename, cv2.IMREAD_GRAYSCALE)
+            if template is None:
+                self.logger.warning(f"無法讀取金額模板: {filename}")
+                continue
+
+            loaded.append((amount, label, np.ascontiguousarray(template)))
+
+        loaded.sort(key=lambda item: item[0])
+
+        # 尺寸一致時疊成單一連續陣列，各模板為其切片
+        templates = [item[2] for item in loaded]
+        if templates and all(t.shape == templates[0].shape for t in templates):
+            stacked = np.stack(templates)
+            stacked.flags.writeable = False
+            templates = [stacked[i] for i in range(len(templates))]
+        else:
+            for template in templates:
+                template.flags.writeable = False
+
+        self._amounts = tuple(item[0] for item in loaded)
+        self._labels = tuple(item[1] for item in loaded)
+        self._templates = tuple(templates)
+        self._signature = signature
+        self.reload_count += 1
+
+        if loaded:
+            self.logger.debug(f"已載入 {len(loaded)} 個金額模板")
+        else:
+            self.logger.warning("bet_size 資料夾中沒有可用的金額模板")
+
+    def refresh(self) -> None:
+        """檢查資料夾是否變更，有變更時重新載入模板。"""
+        with self._lock:
+            try:
+                dir_mtime_ns = os.stat(self.bet_size_dir).st_mtime_ns
+            except FileNotFoundError:
+                self.logger.warning(f"bet_size 資料夾不存在: {self.bet_size_dir}")
+                try:
+                    self.bet_size_dir.mkdir(parents=True, exist_ok=True)
+                    self.logger.info(f"已建立 bet_size 資料夾: {self.bet_size_dir}")
+                except Exception as e:
+                    self.logger.error(f"無法建立 bet_size 資料夾: {e}")
+                self._dir_mtime_ns = None
+                self._signature = None
+                self._amounts, self._labels, self._templates = (), (), ()
+                return
+
+            now = time.monotonic()
+            if (self._signature is not None
+                    and dir_mtime_ns == self._dir_mtime_ns
+                    and now - self._last_scan_time < Constants.BETSIZE_BANK_RESCAN_INTERVAL):
+                return
+
+            signature = self._scan_signature()
+            self._dir_mtime_ns = dir_mtime_ns
+            self._last_scan_time = now
+            if signature != self._signature:
+                self._load(signature)
+
+    def match(self, screenshot_gray: np.ndarray) -> Tuple[Optional[str], float]:
+        """將灰階截圖與所有金額模板比對。
+
+        參數:
+            screenshot_gray: 金額區域截圖（灰階）
+
+        回傳:
+            (匹配的金額標籤, 信心度)，最佳分數未達
+            BETSIZE_MATCH_THRESHOLD 時金額標籤為 None
+        """
+        self.refresh()
+
+        # 取得快照，避免比對途中模板被替換
+        labels, templates = self._labels, self._templates
+        if not templates:
+            return None, 0.0
+
+        search_h, search_w = screenshot_gray.shape[:2]
+        best_label: Optional[str] = None
+        best_score = -1.0
+
+        for label, template in zip(labels, templates):
+            # 檢查尺寸
+            if search_h < template.shape[0] or search_w < template.shape[1]:
+                continue
+
+            result = cv2.matchTemplate(screenshot_gray, template, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, _ = cv2.minMaxLoc(result)
+            if max_val > best_score:
+                best_label, best_score = label, max_val
+
+        if best_label is None:
+            return None, 0.0
+
+        if best_score >= Constants.BETSIZE_MATCH_THRESHOLD:
+            return best_label, best_score
+        return None, best_score
+
+
+class BetSizeGlyphReader:
+    """逐字元金額辨識器。
+
+    將金額區域二值化後切割為單一字元，再與數字字元庫比對，
+    辨識成本與 GAME_BETSIZE 的金額數量無關。
+
+    字元庫由金額模板庫自動建立：每個金額模板切割後的字元數與檔名
+    （例如 "24"）字數相同時，依序作為各數字的樣本；小數點以相對高度判斷，
+    不需樣本。只要已截取的金額涵蓋所有數字，新增金額就不需要再截取模板。
+
+    屬性:
+        bank: 金額模板庫（字元樣本來源）。
+        logger: 日誌記錄器。
+    """
+
+    DOT: str = "."
+
+    def __init__(self, bank: BetSizeTemplateBank, logger: Optional[logging.Logger] = None) -> None:
+        """初始化逐字元金額辨識器。
+
+        參數:
+            bank: 金額模板庫
+            logger: 日誌記錄器（可選）
+        """
+        self.bank = bank
+        self.logger = logger or LoggerFactory.get_logger()
+
+        self._lock = threading.Lock()
+        self._bank_reload_count: int = -1
+        # 字元快照（整組替換，讀取端不需加鎖）
+        self._glyph_chars: Tuple[str, ...] = ()
+        self._glyph_stack: Optional[np.ndarray] = None
+        # 數字平均寬高比（由字元樣本計算，用於估計相連字元的字數）
+        self._glyph_aspect: float = 0.6
+
+    @property
+    def known_chars(self) -> Tuple[str, ...]:
+        """字元庫中已有樣本的字元。"""
+        return self._glyph_chars
+
+    @staticmethod
+    def _binarize(gray: np.ndarray) -> np.ndarray:
+        """以 Otsu 二值化，並以邊框像素判斷背景，使文字為前景（255）。"""
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        border = np.concatenate((binary[0, :], binary[-1, :], binary[:, 0], binary[:, -1]))
+        if np.count_nonzero(border) * 2 > border.size:
+            binary = cv2.bitwise_not(binary)
+        return binary
+
+    def segment(self, gray: np.ndarray) -> List[Tuple[np.ndarray, bool]]:
+        """將金額區域切割為字元。
+
+        以連通元件取得候選字元，保留與最高字元同一列的元件，
+        水平重疊的元件合併為同一字元，再依字元間距分組，
+        取最接近區域中心的一組作為金額。
+
+        參數:
+            gray: 金額區域（灰階）
+
+        回傳:
+            由左到右的 (二值化字元圖, 是否為小數點) 列表，無法切割時為空列表
+        """
+        if gray.ndim != 2 or min(gray.shape) < 3:
+            return []
+
+        binary = self._binarize(gray)
+        height, width = binary.shape
+        count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+
+        boxes: List[List[int]] = []
+        for i in range(1, count):
+            x, y, w, h, area = (int(v) for v in stats[i])
+            if area < Constants.BETSIZE_GLYPH_MIN_AREA:
+                continue
+            # 貼齊邊框的元件多半是被裁切的其他介面元素
+            if x == 0 or y == 0 or x + w == width or y + h == height:
+                continue
+            boxes.append([x, y, x + w, y + h])
+        if not boxes:
+            return []
+
+        # 以最高的元件決定字元列範圍
+        line = max(boxes, key=lambda b: b[3] - b[1])
+        line_top, line_bottom = line[1], line[3]
+        line_height = line_bottom - line_top
+        boxes = [b for b in boxes if line_top <= (b[1] + b[3]) / 2 <= line_bottom]
+
+        # 合併水平重疊的元件（例如斷開的筆畫）
+        boxes.sort(key=lambda b: b[0])
+        merged: List[List[int]] = []
+        for box in boxes:
+            if merged and box[0] < merged[-1][2]:
+                last = merged[-1]
+                merged[-1] = [last[0], min(last[1], box[1]), max(last[2], box[2]), max(last[3], box[3])]
+            else:
+                merged.append(list(box))
+
+        # 過寬的元件視為相連字元，依一般字元寬度估計字數，於垂直投影最少的欄位切開
+        max_width = Constants.BETSIZE_GLYPH_MAX_ASPECT * line_height
+        dot_height = Constants.BETSIZE_GLYPH_DOT_MAX_HEIGHT * line_height
+        normal_widths = [
+            b[2] - b[0] for b in merged
+            if b[2] - b[0] <= max_width and b[3] - b[1] > dot_height
+        ]
+        typical_width = (
+            float(np.median(normal_widths)) if normal_widths
+            else self._glyph_aspect * line_height
+        )
+        split: List[List[int]] = []
+        for left, top, right, bottom in merged:
+            box_width = right - left
+            pieces = int(round(box_width / typical_width)) if box_width > max_width else 1
+            if pieces < 2:
+                split.append([left, top, right, bottom])
+                continue
+            window = max(1, int(box_width / pieces * 0.3))
+            start = left
+            for k in range(1, pieces):
+                ideal = left + box_width * k // pieces
+                lo, hi = max(start + 1, ideal - window), min(right - 1, ideal + window)
+                if hi <= lo:
+                    continue
+                profile = np.count_nonzero(binary[top:bottom, lo:hi], axis=0)
+                cut = lo + int(np.argmin(profile))
+                split.append(self._trim_box(binary, [start, top, cut, bottom]))
+                start = cut
+            split.append(self._trim_box(binary, [start, top, right, bottom]))
+        merged = split
+
+        # 非小數點的矮小元件視為筆畫碎片，併入間距較近的相鄰字元
+        min_height = Constants.BETSIZE_GLYPH_MIN_HEIGHT * line_height
+        index = 0
+        while len(merged) > 1 and index < len(merged):
+            box = merged[index]
+            box_height = box[3] - box[1]
+            if box_height <= dot_height or box_height >= min_height:
+                index += 1
+                continue
+            # 優先併入合併後仍不超過字元寬度上限的一側，其次取間距較近的一側
+            candidates = []
+            for neighbor in (index - 1, index + 1):
+                if 0 <= neighbor < len(merged):
+                    other = merged[neighbor]
+                    gap = max(box[0] - other[2], other[0] - box[2])
+                    too_wide = max(other[2], box[2]) - min(other[0], box[0]) > max_width
+                    candidates.append((too_wide, gap, neighbor))
+            target = min(candidates)[2]
+            other = merged[target]
+            merged[target] = [
+                min(other[0], box[0]), min(other[1], box[1]),
+                max(other[2], box[2]), max(other[3], box[3])
+            ]
+            del merged[index]
+            index = 0
+
+        # 依字元間距分組，取最接近中心的一組
+        max_gap = Constants.BETSIZE_GLYPH_MAX_GAP * line_height
+        groups: List[List[List[int]]] = [[merged[0]]]
+        for box in merged[1:]:
+            if box[0] - groups[-1][-1][2] > max_gap:
+                groups.append([box])
+            else:
+                groups[-1].append(box)
+        center_x = width / 2
+        group = min(groups, key=lambda g: abs((g[0][0] + g[-1][2]) / 2 - center_x))
+
+        glyphs: List[Tuple[np.ndarray, bool]] = []
+        for left, top, right, bottom in group:
+            is_dot = (bottom - top) <= Constants.BETSIZE_GLYPH_DOT_MAX_HEIGHT * line_height
+            glyphs.append((binary[top:bottom, left:right], is_dot))
+        return glyphs
+
+    @staticmethod
+    def _trim_box(binary: np.ndarray, box: List[int]) -> List[int]:
+        """將字元範圍縮到實際有前景像素的上下邊界（切開相連字元後使用）。"""
+        left, top, right, bottom = box
+        rows = np.flatnonzero(np.count_nonzero(binary[top:bottom, left:right], axis=1))
+        if rows.size == 0:
+            return box
+        return [left, top + int(rows[0]), right, top + int(rows[-1]) + 1]
+
+    @staticmethod
+    def _normalize(glyph: np.ndarray) -> np.ndarray:
+        """將字元縮放為固定尺寸的浮點陣列。"""
+        return cv2.resize(
+            glyph, Constants.BETSIZE_GLYPH_SIZE, interpolation=cv2.INTER_AREA
+        ).astype(np.float32)
+
+    def _rebuild(self) -> None:
+        """金額模板庫重新載入後，重建數字字元庫。"""
+        entries = self.bank.entries()
+        with self._lock:
+            if self._bank_reload_count == self.bank.reload_count:
+                return
+
+            samples: Dict[str, List[np.ndarray]] = {}
+            aspects: List[float] = []
+            for label, template in entries:
+                glyphs = self.segment(template)
+                if len(glyphs) != len(label):
+                    self.logger.debug(f"金額模板 {label} 切割出 {len(glyphs)} 個字元，不列入字元庫")
+                    continue
+                if any((char == self.DOT) != is_dot for char, (_, is_dot) in zip(label, glyphs)):
+                    continue
+                for char, (glyph, is_dot) in zip(label, glyphs):
+                    if not is_dot:
+                        samples.setdefault(char, []).append(self._normalize(glyph))
+                        aspects.append(glyph.shape[1] / glyph.shape[0])
+
+            chars = tuple(sorted(samples))
+            self._glyph_chars = chars
+            self._glyph_stack = (
+                np.stack([np.mean(samples[char], axis=0) for char in chars]).astype(np.float32)
+                if chars else None
+            )
+            if aspects:
+                self._glyph_aspect = float(np.mean(aspects))
+            self._bank_reload_count = self.bank.reload_count
+
+            if chars:
+                self.logger.debug(f"金額字元庫: {''.join(chars)}")
+
+    def read(self, gray: np.ndarray) -> Tuple[Optional[str], float]:
+        """辨識金額區域中的金額文字。
+
+        參數:
+            gray: 金額區域（灰階）
+
+        回傳:
+            (金額文字, 信心度)，任一字元未達 BETSIZE_GLYPH_MATCH_THRESHOLD 時
+            金額文字為 None；信心度為所有數字字元中最低的分數
+        """
+        if self._bank_reload_count != self.bank.reload_count or self._glyph_stack is None:
+            self._rebuild()
+
+        chars, stack = self._glyph_chars, self._glyph_stack
+        if stack is None:
+            return None, 0.0
+
+        glyphs = self.segment(gray)
+        if not glyphs:
+            return None, 0.0
+
+        text: List[str] = []
+        confidence = 1.0
+        for glyph, is_dot in glyphs:
+            if is_dot:
+                text.append(self.DOT)
+                continue
+            sample = self._normalize(glyph)
+            best_char, best_score = None, -1.0
+            for char, reference in zip(chars, stack):
+                score = float(cv2.matchTemplate(sample, reference, cv2.TM_CCOEFF_NORMED)[0][0])
+                if score > best_score:
+                    best_char, best_score = char, score
+            confidence = min(confidence, best_score)
+            if best_char is None or best_score < Constants.BETSIZE_GLYPH_MATCH_THRESHOLD:
+                return None, confidence
+            text.append(best_char)
+
+        return "".join(text), confidence
+
+
+class BetSizeTracker:
+    """各瀏覽器最後確認的下注金額。
+
+    金額調整完成並經畫面確認後記錄，之後的規則若目標金額相同可略過驗證，
+    目標不同時以記錄的金額推算點擊次數，不必先截圖識別。
+    恢復流程或調整失敗時清除該瀏覽器的記錄。
+    """
+
+    def __init__(self) -> None:
+        """初始化金額追蹤器。"""
+        self._lock = threading.Lock()
+        self._confirmed: Dict[str, float] = {}
+
+    def get(self, key: str) -> Optional[float]:
+        """取得最後確認的金額（無記錄時回傳 None）。"""
+        with self._lock:
+            return self._confirmed.get(key)
+
+    def confirm(self, key: str, amount: float) -> None:
+        """記錄經畫面確認的金額。"""
+        with self._lock:
+            self._confirmed[key] = amount
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """清除指定瀏覽器（None 表示全部）的金額記錄。"""
+        with self._lock:
+            if key is None:
+                self._confirmed.clear()
+            else:
+                self._confirmed.pop(key, None)
+
+
+class ImageDetector:
+    """圖片檢測器。
+
+    提供螢幕截圖、圖片比對和座標定位功能。
+    使用 OpenCV 的 TM_CCOEFF_NORMED 方法進行模板匹配。
+
+    此類別是圖片識別功能的核心，支援:
+        - 瀏覽器截圖
+        - 模板匹配
+        - 各種模板的截取和儲存
+
+    屬性:
+        logger: 日誌記錄器。
+        project_root: 專案根目錄路徑。
+        image_dir: 圖片目錄路徑。
+
+    模板快取:
+        模板解碼後保存在記憶體中（BGR 與灰階各一份），以檔案的
+        修改時間與大小判斷是否失效，重新截取模板後會自動載入新檔。
+
+    範例:
+        >>> detector = ImageDetector()
+        >>> result = detector.detect_in_browser(driver, "遊戲登入.png")
+        >>> if result:
+        ...     x, y, confidence = result
+        ...     print(f"找到圖片於 ({x}, {y}), 信心度: {confidence:.2f}")
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None) -> None:
+        """初始化圖片檢測器。
+
+        參數:
+            logger: 日誌記錄器（可選）。
+        """
+        self.logger = logger or LoggerFactory.get_logger()
+
+        # 使用輔助函式取得專案根目錄和圖片目錄
+        self.project_root: Path = get_resource_path()
+        self.image_dir: Path = get_resource_path(Constants.IMAGE_DIR)
+
+        # 確保圖片目錄存在
+        self.image_dir.mkdir(parents=True, exist_ok=True)
+
+        # 模板快取（路徑 → 已解碼模板），多個監控執行緒共用，需加鎖
+        self._template_cache: Dict[str, TemplateCacheEntry] = {}
+        self._template_cache_lock = threading.Lock()
+        self._template_cache_hits: int = 0
+        self._template_cache_misses: int = 0
+
+        # 依畫面尺寸縮放的模板（(路徑, 縮放後尺寸) → 縮放後模板），與模板快取共用鎖
+        self._scaled_templates: Dict[Tuple[str, Tuple[int, int]], TemplateCacheEntry] = {}
+
+        # 已解析的截圖格式（格式字串 → CaptureFormat）
+        self._capture_formats: Dict[str, CaptureFormat] = {}
+
+        # 可重複使用的灰階轉換緩衝區（每個執行緒各自一組，依 buffer_key 區分）
+        self._decode_buffers = threading.local()
+
+        # 畫面變化閘門（(閘門名稱, session_id) → 上次比對的指紋與結果）
+        self._frame_gate: Dict[Tuple[str, str], FrameGateEntry] = {}
+        self._frame_gate_lock = threading.Lock()
+        self._frame_gate_checks: int = 0
+        self._frame_gate_skips: int = 0
+
+        # 畫面版本（session_id → 觀察到畫面變化的次數），供等待循環判斷畫面是否變化
+        self._frame_versions: Dict[str, int] = {}
+        self._frame_version_prints: Dict[Tuple[str, int, int, Tuple[int, ...]], np.ndarray] = {}
+
+        # Canvas 幾何資訊快取（session_id → (取得時間, 幾何資訊)）
+        self._canvas_geometry_cache: Dict[str, Tuple[float, Dict[str, float]]] = {}
+        self._canvas_geometry_lock = threading.Lock()
+
+        if Constants.BLACKSCREEN_DETECTION_MODE not in Constants.BLACKSCREEN_DETECTION_MODES:
+            self.logger.warning(
+                f"不支援的黑屏檢測方式: {Constants.BLACKSCREEN_DETECTION_MODE}，改用模板比對"
+            )
+
+        if Constants.BETSIZE_READ_MODE not in Constants.BETSIZE_READ_MODES:
+            self.logger.warning(
+                f"不支援的金額識別方式: {Constants.BETSIZE_READ_MODE}，改用金額模板比對"
+            )
+
+        # 影像運算資源預算（所有檢測器共用，限制同時運算數量）
+        self.compute_budget = ComputeBudget.get_shared()
+
+        # 下注金額模板庫（預先載入，資料夾變更時才重新讀取）
+        self.betsize_bank = BetSizeTemplateBank(
+            self.image_dir / Constants.BETSIZE_TEMPLATE_DIR, self.logger
+        )
+        # 逐字元金額辨識器（字元庫由金額模板庫建立）
+        self.betsize_reader = BetSizeGlyphReader(self.betsize_bank, self.logger)
+        # 各瀏覽器最後確認的金額（依 session_id 區分）
+        self.betsize_tracker = BetSizeTracker()
+
+    def get_template_path(self, template_name: str) -> Path:
+        """取得模板圖片路徑。
+
+        參數:
+            template_name: 模板圖片檔名。
+
+        回傳:
+            模板圖片完整路徑。
+        """
+        return self.image_dir / template_name
+
+    def template_exists(self, template_name: str) -> bool:
+        """檢查模板圖片是否存在。
+
+        參數:
+            template_name: 模板圖片檔名。
+
+        回傳:
+            是否存在。
+        """
+        return self.get_template_path(template_name).exists()
+
+    def uses_luminance_detection(self, template_name: str) -> bool:
+        """該模板是否以亮度統計取代模板比對（目前僅黑屏）。"""
+        return (
+            template_name == Constants.BLACK_SCREEN
+            and Constants.BLACKSCREEN_DETECTION_MODE == "luminance"
+        )
+
+    def can_detect(self, template_name: str) -> bool:
+        """檢查是否能檢測該模板（模板存在，或以亮度統計檢測）。
+
+        參數:
+            template_name: 模板圖片檔名。
+
+        回傳:
+            是否能檢測。
+        """
+        return self.uses_luminance_detection(template_name) or self.template_exists(template_name)
+
+    def load_template(
+        self,
+        template_path: Path,
+        grayscale: bool = False,
+        canvas_size: Optional[Tuple[int, int]] = None
+    ) -> np.ndarray:
+        """從快取取得模板圖片，必要時從磁碟讀取。
+
+        以檔案的修改時間與大小判斷快取是否有效，
+        模板被重新截取（d/e/l 指令）後會自動重新載入。
+        指定 canvas_size 且與模板截取時的 Canvas 尺寸不同時，
+        回傳依比例預先縮放的模板（見 _get_template_entry）。
+        回傳的陣列為唯讀，呼叫端不可修改。
+
+        參數:
+            template_path: 模板圖片路徑
+            grayscale: 是否回傳灰階模板（預設回傳 BGR）
+            canvas_size: 目前的 Canvas 尺寸 (width, height)（截圖像素，可選）
+
+        回傳:
+            模板圖片陣列
+
+        異常:
+            FileNotFoundError: 模板圖片不存在
+            ImageDetectionError: 模板圖片無法解碼
+        """
+        entry = self._get_template_entry(template_path, canvas_size)
+        return entry.gray if grayscale else entry.bgr
+
+    def _load_template_entry(self, template_path: Path) -> TemplateCacheEntry:
+        """取得原始尺寸的模板快取項目，檔案變更時重新讀取。"""
+        key = str(template_path)
+        try:
+            stat = os.stat(key)
+        except FileNotFoundError:
+            with self._template_cache_lock:
+                self._template_cache.pop(key, None)
+            raise FileNotFoundError(f"模板圖片不存在: {template_path}")
+
+        with self._template_cache_lock:
+            entry = self._template_cache.get(key)
+            if (entry is not None and entry.mtime_ns == stat.st_mtime_ns
+                    and entry.size == stat.st_size):
+                self._template_cache_hits += 1
+                return entry
+
+        # 快取未命中：在鎖外解碼，避免阻塞其他執行緒
+        bgr = cv2_imread_unicode(template_path, cv2.IMREAD_COLOR)
+        if bgr is None:
+            raise ImageDetectionError(f"無法讀取模板圖片: {template_path}")
+        gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+        pyramid = self._build_template_pyramid(bgr)
+        bgr.flags.writeable = False
+        gray.flags.writeable = False
+
+        entry = TemplateCacheEntry(
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            bgr=bgr,
+            gray=gray,
+            pyramid=pyramid,
+            canvas_size=self.read_template_canvas_size(template_path)
+        )
+        with self._template_cache_lock:
+            self._template_cache[key] = entry
+            self._template_cache_misses += 1
+
+        return entry
+
+    def _get_template_entry(
+        self,
+        template_path: Path,
+        canvas_size: Optional[Tuple[int, int]] = None,
+        frame_scale: float = 1.0
+    ) -> TemplateCacheEntry:
+        """取得適用於目前 Canvas 尺寸的模板快取項目。
+
+        模板有截取時的 Canvas 尺寸且指定 canvas_size 時，依兩者的寬高比例縮放；
+        否則（模板截取於 Canvas 尺寸描述檔之前，或當時無法取得 Canvas）模板視為
+        整窗截圖原解析度，畫面經過縮小（frame_scale 不為 1.0，例如串流畫面）時
+        依 1 / frame_scale 縮放。比例差異在 TEMPLATE_RESCALE_TOLERANCE 內時回傳原模板。
+        縮放結果以 (路徑, 縮放後尺寸) 快取，每組只縮放一次，原模板檔案變更時自動重新縮放。
+
+        參數:
+            template_path: 模板圖片路徑
+            canvas_size: 目前的 Canvas 尺寸 (width, height)（畫面像素，可選）
+            frame_scale: 整窗截圖寬度 / 畫面寬度（見 _get_frame_scale）
+
+        回傳:
+            模板快取項目
+        """
+        base = self._load_template_entry(template_path)
+        if canvas_size is not None and base.canvas_size is not None:
+            if canvas_size == base.canvas_size:
+                return base
+            scale_x = canvas_size[0] / base.canvas_size[0]
+            scale_y = canvas_size[1] / base.canvas_size[1]
+        elif frame_scale != 1.0:
+            scale_x = scale_y = 1.0 / frame_scale
+        else:
+            return base
+
+        tolerance = Constants.TEMPLATE_RESCALE_TOLERANCE
+        if abs(scale_x - 1.0) <= tolerance and abs(scale_y - 1.0) <= tolerance:
+            return base
+
+        template_h, template_w = base.bgr.shape[:2]
+        scaled_size = (max(1, round(template_w * scale_x)), max(1, round(template_h * scale_y)))
+        key = (str(template_path), scaled_size)
+        with self._template_cache_lock:
+            scaled = self._scaled_templates.get(key)
+        if scaled is not None and scaled.mtime_ns == base.mtime_ns and scaled.size == base.size:
+            return scaled
+
+        # 縮小用 INTER_AREA 避免鋸齒，放大用 INTER_LINEAR
+        interpolation = cv2.INTER_AREA if scale_x * scale_y < 1.0 else cv2.INTER_LINEAR
+        bgr = cv2.resize(base.bgr, scaled_size, interpolation=interpolation)
+        gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+        pyramid = self._build_template_pyramid(bgr)
+        bgr.flags.writeable = False
+        gray.flags.writeable = False
+
+        scaled = TemplateCacheEntry(
+            mtime_ns=base.mtime_ns,
+            size=base.size,
+            bgr=bgr,
+            gray=gray,
+            pyramid=pyramid,
+            canvas_size=canvas_size
+        )
+        with self._template_cache_lock:
+            self._scaled_templates[key] = scaled
+        self.logger.debug(
+            f"模板已依畫面尺寸縮放: {template_path.name} "
+            f"{template_w}x{template_h} → {scaled_size[0]}x{scaled_size[1]}"
+        )
+        return scaled
+
+    @staticmethod
+    def get_template_canvas_path(template_path: Path) -> Path:
+        """取得模板 Canvas 尺寸描述檔的路徑（與模板同目錄同檔名）。"""
+        return template_path.with_suffix(Constants.TEMPLATE_CANVAS_SUFFIX)
+
+    def read_template_canvas_size(self, template_path: Path) -> Optional[Tuple[int, int]]:
+        """讀取模板截取時的 Canvas 尺寸。
+
+        參數:
+            template_path: 模板圖片路徑
+
+        回傳:
+            (width, height)（截圖像素），沒有描述檔或內容無效時回傳 None
+        """
+        canvas_path = self.get_template_canvas_path(template_path)
+        try:
+            with open(canvas_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            width, height = int(data['canvas_width']), int(data['canvas_height'])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.logger.warning(f"模板 Canvas 尺寸描述檔無效 [{canvas_path.name}]: {e}")
+            return None
+        if width <= 0 or height <= 0:
+            return None
+        return (width, height)
+
+    def write_template_canvas_size(
+        self,
+        template_path: Path,
+        canvas_size: Optional[Tuple[int, int]]
+    ) -> None:
+        """記錄模板截取時的 Canvas 尺寸（無法取得尺寸時刪除舊的描述檔）。
+
+        參數:
+            template_path: 模板圖片路徑
+            canvas_size: Canvas 尺寸 (width, height)（截圖像素），None 表示未知
+        """
+        canvas_path = self.get_template_canvas_path(template_path)
+        try:
+            if canvas_size is None:
+                with suppress(FileNotFoundError):
+                    canvas_path.unlink()
+                return
+            with open(canvas_path, 'w', encoding='utf-8') as f:
+                json.dump({'canvas_width': int(canvas_size[0]), 'canvas_height': int(canvas_size[1])}, f)
+        except OSError as e:
+            self.logger.warning(f"無法寫入模板 Canvas 尺寸描述檔 [{canvas_path.name}]: {e}")
+
+    @staticmethod
+    def _canvas_pixel_size(
+        geometry: Optional[Dict[str, float]],
+        image_size: Tuple[int, int]
+    ) -> Optional[Tuple[int, int]]:
+        """將 Canvas 幾何資訊換算為整窗截圖上的 Canvas 尺寸 (width, height)。"""
+        if geometry is None or geometry.get('w', 0) <= 0 or geometry.get('h', 0) <= 0:
+            return None
+        scale_x = image_size[0] / geometry['vw']
+        scale_y = image_size[1] / geometry['vh']
+        return (int(round(geometry['w'] * scale_x)), int(round(geometry['h'] * scale_y)))
+
+    def get_canvas_pixel_size(self, driver: WebDriver) -> Optional[Tuple[int, int]]:
+        """取得目前 Canvas 在整窗截圖上的尺寸（依快取的幾何資訊與 DPR 計算）。
+
+        參數:
+            driver: WebDriver 實例
+
+        回傳:
+            (width, height)（截圖像素），無法取得時回傳 None
+        """
+        geometry = self._get_canvas_geometry(driver)
+        if geometry is None:
+            return None
+        dpr = float(geometry.get('dpr') or 1.0)
+        return self._canvas_pixel_size(geometry, (geometry['vw'] * dpr, geometry['vh'] * dpr))
+
+    def _record_template_canvas_size(
+        self,
+        driver: WebDriver,
+        template_path: Path,
+        image_size: Tuple[int, int]
+    ) -> None:
+        """記錄剛截取的整窗模板所對應的 Canvas 尺寸（重新查詢幾何資訊，不使用快取）。
+
+        參數:
+            driver: WebDriver 實例
+            template_path: 模板圖片路徑
+            image_size: 截取模板時的整窗截圖尺寸 (width, height)
+        """
+        try:
+            geometry = BrowserHelper.get_canvas_geometry(driver)
+        except Exception as e:
+            self.logger.debug(f"取得 Canvas 幾何資訊失敗: {e}")
+            geometry = None
+        canvas_size = None
+        if geometry and geometry.get('vw', 0) > 0 and geometry.get('vh', 0) > 0:
+            canvas_size = self._canvas_pixel_size(geometry, image_size)
+        self.write_template_canvas_size(template_path, canvas_size)
+
+    @staticmethod
+    def _build_template_pyramid(template: np.ndarray) -> Dict[int, np.ndarray]:
+        """預先計算模板的各縮小倍率版本（縮小後過小的倍率略過）。"""
+        pyramid: Dict[int, np.ndarray] = {}
+        template_h, template_w = template.shape[:2]
+        for factor in Constants.PYRAMID_FACTORS:
+            if min(template_h, template_w) // factor < Constants.PYRAMID_MIN_TEMPLATE_SIDE:
+                continue
+            scaled = cv2.resize(
+                template, (template_w // factor, template_h // factor), interpolation=cv2.INTER_AREA
+            )
+            scaled.flags.writeable = False
+            pyramid[factor] = scaled
+        return pyramid
+
+    def get_template_pyramid(
+        self,
+        template_path: Path,
+        canvas_size: Optional[Tuple[int, int]] = None
+    ) -> Dict[int, np.ndarray]:
+        """取得模板的預先縮小版本（縮小倍率 → BGR 模板）。
+
+        參數:
+            template_path: 模板圖片路徑
+            canvas_size: 目前的 Canvas 尺寸（可選，見 load_template）
+
+        回傳:
+            縮小倍率 → 縮小後的模板，模板過小時為空字典
+        """
+        return self._get_template_entry(template_path, canvas_size).pyramid
+
+    def clear_template_cache(self) -> None:
+        """清除所有模板快取（含依 Canvas 尺寸縮放的模板）與命中統計。"""
+        with self._template_cache_lock:
+            self._template_cache.clear()
+            self._scaled_templates.clear()
+            self._template_cache_hits = 0
+            self._template_cache_misses = 0
+
+    def get_template_cache_stats(self) -> Dict[str, int]:
+        """取得模板快取統計。
+
+        回傳:
+            包含 hits（命中次數）、misses（未命中次數，即實際解碼次數）、
+            entries（快取模板數量）與 scaled（依 Canvas 尺寸縮放的模板數量）的字典
+        """
+        with self._template_cache_lock:
+            return {
+                'hits': self._template_cache_hits,
+                'misses': self._template_cache_misses,
+                'entries': len(self._template_cache),
+                'scaled': len(self._scaled_templates),
+            }
+
+    def get_frame_gate_stats(self) -> Dict[str, float]:
+        """取得畫面變化閘門統計。
+
+        回傳:
+            包含 checks（檢查次數）、skipped（沿用結果次數）
+            與 skip_ratio（沿用比例）的字典
+        """
+        with self._frame_gate_lock:
+            checks = self._frame_gate_checks
+            skipped = self._frame_gate_skips
+        return {
+            'checks': checks,
+            'skipped': skipped,
+            'skip_ratio': skipped / checks if checks else 0.0,
+        }
+
+    def clear_frame_gate(self) -> None:
+        """清除所有畫面變化閘門的指紋與沿用結果（例如重新截取模板後）。"""
+        with self._frame_gate_lock:
+            self._frame_gate.clear()
+
+    def _frame_fingerprint(self, image: np.ndarray) -> np.ndarray:
+        """計算畫面指紋（灰階縮圖）。"""
+        thumbnail = cv2.resize(image, Constants.FRAME_GATE_THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+        return self.to_grayscale(thumbnail)
+
+    def get_frame_version(self, driver: WebDriver) -> int:
+        """取得該瀏覽器的畫面版本（檢測時每觀察到一次畫面變化就加一）。
+
+        供等待循環判斷兩次檢測之間畫面是否有變化（見 AdaptiveWaitPolicy）。
+
+        參數:
+            driver: WebDriver 實例
+
+        回傳:
+            畫面版本（尚未檢測過時為 0）
+        """
+        with self._frame_gate_lock:
+            return self._frame_versions.get(self._frame_source(driver), 0)
+
+    def _track_frame_version(
+        self,
+        source: str,
+        view: Tuple[int, int, Tuple[int, ...]],
+        fingerprint: np.ndarray
+    ) -> None:
+        """與同一擷取範圍的上一張畫面比較指紋，有變化時增加畫面版本。"""
+        key = (source,) + view
+        with self._frame_gate_lock:
+            previous = self._frame_version_prints.get(key)
+            self._frame_version_prints[key] = fingerprint
+            if previous is None or float(cv2.absdiff(previous, fingerprint).mean()) >= Constants.FRAME_GATE_DIFF_THRESHOLD:
+                self._frame_versions[source] = self._frame_versions.get(source, 0) + 1
+
+    def _frame_gate_lookup(
+        self,
+        gate_key: Tuple[str, str],
+        fingerprint: np.ndarray,
+        signature: Tuple[Any, ...]
+    ) -> Optional[Dict[str, Optional[Tuple[int, int, float]]]]:
+        """畫面與上次完整比對時幾乎相同且未超過最長沿用時間時，回傳上次結果。"""
+        with self._frame_gate_lock:
+            self._frame_gate_checks += 1
+            entry = self._frame_gate.get(gate_key)
+            if entry is None or entry.signature != signature:
+                return None
+            if time.monotonic() - entry.matched_at >= Constants.FRAME_GATE_MAX_STALENESS:
+                return None
+            if float(cv2.absdiff(entry.fingerprint, fingerprint).mean()) >= Constants.FRAME_GATE_DIFF_THRESHOLD:
+                return None
+            self._frame_gate_skips += 1
+            return dict(entry.results)
+
+    def _resolve_capture_format(self, spec: Optional[str]) -> CaptureFormat:
+        """解析截圖格式字串，無效時記錄警告並改用 PNG。"""
+        if not spec:
+            return CaptureFormat()
+
+        capture_format = self._capture_formats.get(spec)
+        if capture_format is None:
+            try:
+                capture_format = CaptureFormat.parse(spec)
+            except ValueError as e:
+                self.logger.warning(f"{e}，改用 PNG")
+                capture_format = CaptureFormat()
+            self._capture_formats[spec] = capture_format
+        return capture_format
+
+    def decode_image(self, data: Union[bytes, str], grayscale: bool = False) -> np.ndarray:
+        """將截圖資料解碼為 OpenCV 陣列。
+
+        所有截圖路徑共用的解碼工具：直接以 cv2.imdecode 從位元組解碼為
+        BGR 或灰階，不經過 PIL → numpy → cvtColor 的多次整張複製。
+        只需要灰階時直接解碼為灰階，省去彩色解碼與轉換。
+
+        參數:
+            data: 圖片位元組，或 base64 字串（WebDriver / CDP 回傳格式）
+            grayscale: 是否直接解碼為灰階
+
+        回傳:
+            BGR 或灰階圖片陣列
+
+        異常:
+            ImageDetectionError: 資料無法解碼
+        """
+        if isinstance(data, str):
+            data = base64.b64decode(data)
+        flags = cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR
+        with self.compute_budget.slot():
+            image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flags)
+        if image is None:
+            raise ImageDetectionError("圖片解碼失敗")
+        return image
+
+    def to_grayscale(self, image: np.ndarray, buffer_key: Optional[str] = None) -> np.ndarray:
+        """將 BGR 圖片轉為灰階，可寫入重複使用的緩衝區。
+
+        指定 buffer_key（例如瀏覽器 session_id）時，結果寫入該 key 專屬的
+        緩衝區，尺寸不變時不重新配置記憶體。緩衝區依執行緒區分，
+        回傳的陣列在同一執行緒下次以相同 key 呼叫時會被覆寫。
+
+        參數:
+            image: BGR 圖片陣列（已是灰階時直接回傳）
+            buffer_key: 緩衝區識別鍵（None 表示每次配置新陣列）
+
+        回傳:
+            灰階圖片陣列
+        """
+        if image.ndim == 2:
+            return image
+        if buffer_key is None:
+            return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        buffers: Dict[str, np.ndarray] = getattr(self._decode_buffers, 'gray', None)
+        if buffers is None:
+            buffers = {}
+            self._decode_buffers.gray = buffers
+
+        buffer = buffers.get(buffer_key)
+        if buffer is None or buffer.shape != image.shape[:2]:
+            buffer = np.empty(image.shape[:2], dtype=np.uint8)
+            buffers[buffer_key] = buffer
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=buffer)
+
+    def _write_png(self, output_path: Path, image: np.ndarray) -> bool:
+        """以支援 Unicode 路徑的方式將圖片儲存為 PNG。
+
+        參數:
+            output_path: 輸出路徑
+            image: 圖片陣列（BGR 或灰階）
+
+        回傳:
+            儲存成功返回 True
+        """
+        is_success, buffer = cv2.imencode('.png', image)
+        if not is_success:
+            self.logger.error("圖片編碼失敗")
+            return False
+        with open(output_path, 'wb') as f:
+            f.write(buffer.tobytes())
+        return True
+
+    def capture_canvas_screenshot(
+        self, 
+        driver: WebDriver, 
+        save_path: Optional[Path] = None
+    ) -> Optional[np.ndarray]:
+        """只截取 Canvas 區域的畫面。
+
+        透過 CDP Page.captureScreenshot 的 clip 參數由 Chrome 直接裁切，
+        不需先擷取整個視窗再裁切。
+
+        參數:
+            driver: WebDriver 實例。
+            save_path: 儲存路徑（可選）
+            
+        回傳:
+            OpenCV 格式的圖片陣列 (BGR)，失敗時回傳 None
+        """
+        try:
+            # 取得 Canvas 區域
+            rect = BrowserHelper.get_canvas_rect(driver)
+            if not rect:
+                self.logger.warning("無法取得 Canvas 區域")
+                return None
+            
+            canvas_screenshot = self.capture_clip(driver, rect)
+            
+            # 如果指定了儲存路徑，則儲存圖片
+            if save_path:
+                save_path.parent.mkdir(parents=True, exist_ok=True)
+                
+                # 使用支援 Unicode 路徑的方式儲存圖片
+                is_success, buffer = cv2.imencode('.png', canvas_screenshot)
+                if is_success:
+                    with open(save_path, 'wb') as f:
+                        f.write(buffer.tobytes())
+                    # 截取範圍即為整個 Canvas
+                    self.write_template_canvas_size(
+                        save_path, (canvas_screenshot.shape[1], canvas_screenshot.shape[0])
+                    )
+                    self.logger.info(f"截圖已儲存 {save_path}")
+                else:
+                    self.logger.error("圖片編碼失敗")
+                    return None
+            
+            return canvas_screenshot
+            
+        except Exception as e:
+            self.logger.error(f"Canvas 截圖失敗: {e}")
+            return None
+
+    def capture_clip(
+        self,
+        driver: WebDriver,
+        clip: Dict[str, float],
+        scale: float = 1.0,
+        capture_format: Optional[str] = None
+    ) -> np.ndarray:
+        """透過 CDP Page.captureScreenshot 只擷取指定區域。
+
+        Chrome 只編碼裁切區域的像素，減少 PNG 編碼時間、
+        chromedriver 傳輸量與 Python 端的解碼時間。
+        輸出影像尺寸為 clip 寬高 × scale × devicePixelRatio。
+
+        參數:
+            driver: WebDriver 實例
+            clip: 擷取區域 {"x", "y", "w", "h"}（CSS 像素）
+            scale: 縮放比例（1.0 為原始解析度）
+            capture_format: 截圖格式字串（見 CaptureFormat.parse，預設 PNG）
+
+        回傳:
+            OpenCV 格式的圖片陣列 (BGR)
+
+        異常:
+            ImageDetectionError: 截圖失敗
+        """
+        try:
+            return self.decode_image(self.capture_raw(driver, clip, scale, capture_format))
+        except Exception as e:
+            raise ImageDetectionError(f"區域截圖失敗: {e}") from e
+
+    def capture_raw(
+        self,
+        driver: WebDriver,
+        clip: Optional[Dict[str, float]] = None,
+        scale: float = 1.0,
+        capture_format: Optional[str] = None
+    ) -> bytes:
+        """擷取瀏覽器畫面的編碼位元組（不解碼）。
+
+        供需要在其他程序解碼的呼叫端使用（見 VisionWorkerPool）。
+        未指定 clip 且為 PNG 時使用 WebDriver 截圖，其餘透過 CDP Page.captureScreenshot。
+
+        參數:
+            driver: WebDriver 實例
+            clip: 擷取區域 {"x", "y", "w", "h"}（CSS 像素），None 表示整個視窗
+            scale: 縮放比例（僅 clip 有效）
+            capture_format: 截圖格式字串（見 CaptureFormat.parse，預設 PNG）
+
+        回傳:
+            PNG / JPEG / WebP 位元組
+        """
+        resolved_format = self._resolve_capture_format(capture_format)
+        if clip is None and resolved_format.is_lossless:
+            return driver.get_screenshot_as_png()
+        params = self._cdp_capture_params(resolved_format)
+        if clip is not None:
+            params["clip"] = {
+                "x": float(clip["x"]),
+                "y": float(clip["y"]),
+                "width": float(clip["w"]),
+                "height": float(clip["h"]),
+                "scale": float(scale)
+            }
+        result = driver.execute_cdp_cmd("Page.captureScreenshot", params)
+        return base64.b64decode(result["data"])
+
+    @staticmethod
+    def _cdp_capture_params(capture_format: CaptureFormat) -> Dict[str, Any]:
+        """建立 Page.captureScreenshot 的格式參數。"""
+        params: Dict[str, Any] = {"format": capture_format.format}
+        if not capture_format.is_lossless:
+            params["quality"] = capture_format.quality
+        return params
+
+    def capture_screenshot(
+        self,
+        driver: WebDriver,
+        save_path: Optional[Path] = None,
+        capture_format: Optional[str] = None
+    ) -> np.ndarray:
+        """截取瀏覽器畫面。
+
+        PNG 使用 WebDriver 截圖；有損格式（JPEG / WebP）透過
+        CDP Page.captureScreenshot 由 Chrome 直接以指定品質編碼。
+
+        參數:
+            driver: WebDriver 實例。
+            save_path: 儲存路徑（可選）
+            capture_format: 截圖格式字串（見 CaptureFormat.parse，預設 PNG）
+            
+        回傳:
+            OpenCV 格式的圖片陣列 (BGR)
+            
+        異常:
+            ImageDetectionError: 截圖失敗
+        """
+        try:
+            # 取得截圖並直接解碼為 OpenCV 格式
+            image_cv = self.decode_image(self.capture_raw(driver, capture_format=capture_format))
+            
+            # 如果指定了儲存路徑，則儲存圖片
+            if save_path:
+                save_path.parent.mkdir(parents=True, exist_ok=True)
+                
+                # 使用支援 Unicode 路徑的方式儲存圖片
+                is_success, buffer = cv2.imencode('.png', image_cv)
+                if is_success:
+                    with open(save_path, 'wb') as f:
+                        f.write(buffer.tobytes())
+                    self.logger.info(f"截圖已儲存 {save_path}")
+                else:
+                    raise ImageDetectionError(f"圖片編碼失敗")
+            
+            return image_cv
+            
+        except Exception as e:
+            raise ImageDetectionError(f"截圖失敗: {e}") from e
+    
+    def match_template(
+        self, 
+        screenshot: np.ndarray, 
+        template_path: Path, 
+        threshold: float = Constants.MATCH_THRESHOLD,
+        region: Optional[Tuple[int, int, int, int]] = None,
+        canvas_size: Optional[Tuple[int, int]] = None,
+        frame_scale: float = 1.0
+    ) -> Optional[Tuple[int, int, float]]:
+        """在截圖中尋找模板圖片。
+        
+        搜尋範圍達 PYRAMID_MIN_SEARCH_PIXELS 時使用粗到細金字塔比對（見 _match_pyramid）。
+        指定 canvas_size 或 frame_scale 時使用依畫面尺寸縮放的模板（見 _get_template_entry）。
+        
+        參數:
+            screenshot: 截圖（OpenCV 格式）
+            template_path: 模板圖片路徑
+            threshold: 匹配閾值（0-1）
+            region: 搜尋區域 (left, top, right, bottom)，None 表示整張截圖；
+                區域小於模板時自動改為整張截圖搜尋
+            canvas_size: 截圖中 Canvas 的尺寸 (width, height)（可選）
+            frame_scale: 整窗截圖寬度 / 截圖寬度（縮小的串流畫面大於 1.0）
+            
+        回傳:
+            如果找到: (x, y, confidence) - 中心座標（相對整張截圖）和信心度
+            如果未找到: None
+            
+        異常:
+            ImageDetectionError: 檢測失敗
+        """
+        with self.compute_budget.slot():
+            try:
+                # 從快取取得模板圖片（檔案變更時自動重新讀取，Canvas 尺寸不同時取縮放版本）
+                entry = self._get_template_entry(template_path, canvas_size, frame_scale)
+                template = entry.bgr
+            
+                # 取得模板尺寸
+                template_h, template_w = template.shape[:2]
+            
+                # 裁切搜尋區域（切片不複製資料）
+                offset_x, offset_y = 0, 0
+                search_image = screenshot
+                if region is not None:
+                    left, top, right, bottom = region
+                    if right - left >= template_w and bottom - top >= template_h:
+                        search_image = screenshot[top:bottom, left:right]
+                        offset_x, offset_y = left, top
+            
+                # 大範圍搜尋使用粗到細金字塔比對
+                search_h, search_w = search_image.shape[:2]
+                if (Constants.PYRAMID_MATCH_ENABLED
+                        and search_h * search_w >= Constants.PYRAMID_MIN_SEARCH_PIXELS):
+                    pyramid = entry.pyramid
+                    factor = next((f for f in Constants.PYRAMID_FACTORS if f in pyramid), None)
+                    if factor is not None:
+                        found = self._match_pyramid(search_image, template, pyramid[factor], factor, threshold)
+                        if found is None:
+                            return None
+                        max_loc, max_val = found
+                        return (
+                            offset_x + max_loc[0] + template_w // 2,
+                            offset_y + max_loc[1] + template_h // 2,
+                            max_val
+                        )
+            
+                # 執行模板匹配
+                result = cv2.matchTemplate(search_image, template, cv2.TM_CCOEFF_NORMED)
+                min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+            
+                # 檢查是否超過閾值
+                if max_val >= threshold:
+                    # 計算中心座標
+                    center_x = offset_x + max_loc[0] + template_w // 2
+                    center_y = offset_y + max_loc[1] + template_h // 2
+                    return (center_x, center_y, max_val)
+            
+                return None
+            
+            except FileNotFoundError:
+                raise
+            except Exception as e:
+                raise ImageDetectionError(f"圖片匹配失敗: {e}") from e
+    
+    def _match_pyramid(
+        self,
+        search_image: np.ndarray,
+        template: np.ndarray,
+        coarse_template: np.ndarray,
+        factor: int,
+        threshold: float
+    ) -> Optional[Tuple[Tuple[int, int], float]]:
+        """粗到細金字塔比對。
+        
+        先以縮小 factor 倍的畫面與模板比對，取分數最高的 PYRAMID_CANDIDATES 個
+        位置（分數需達 threshold - PYRAMID_SCORE_TOLERANCE），再於各候選附近以
+        原解析度比對，回傳的分數即為原解析度的 TM_CCOEFF_NORMED 分數。
+        
+        參數:
+            search_image: 搜尋畫面（原解析度）
+            template: 原解析度模板
+            coarse_template: 縮小後的模板
+            factor: 縮小倍率
+            threshold: 匹配閾值
+            
+        回傳:
+            ((左上角 x, 左上角 y), 分數)，未達閾值時回傳 None
+        """
+        search_h, search_w = search_image.shape[:2]
+        template_h, template_w = template.shape[:2]
+        coarse_h, coarse_w = coarse_template.shape[:2]
+        coarse_image = cv2.resize(
+            search_image, (search_w // factor, search_h // factor), interpolation=cv2.INTER_AREA
+        )
+        if coarse_image.shape[0] < coarse_h or coarse_image.shape[1] < coarse_w:
+            return None
+        
+        coarse_result = cv2.matchTemplate(coarse_image, coarse_template, cv2.TM_CCOEFF_NORMED)
+        coarse_threshold = threshold - Constants.PYRAMID_SCORE_TOLERANCE
+        margin = factor + Constants.PYRAMID_REFINE_MARGIN
+        
+        best: Optional[Tuple[Tuple[int, int], float]] = None
+        for _ in range(Constants.PYRAMID_CANDIDATES):
+            _, coarse_val, _, coarse_loc = cv2.minMaxLoc(coarse_result)
+            if coarse_val < coarse_threshold:
+                break
+            
+            # 抑制此候選附近的分數，下一輪取其他位置
+            cx, cy = coarse_loc
+            coarse_result[
+                max(0, cy - coarse_h // 2):cy + coarse_h // 2 + 1,
+                max(0, cx - coarse_w // 2):cx + coarse_w // 2 + 1
+            ] = -1.0
+            
+            # 候選位置附近以原解析度精修
+            left = max(0, cx * factor - margin)
+            top = max(0, cy * factor - margin)
+            right = min(search_w, cx * factor + margin + template_w)
+            bottom = min(search_h, cy * factor + margin + template_h)
+            window = search_image[top:bottom, left:right]
+            if window.shape[0] < template_h or window.shape[1] < template_w:
+                continue
+            
+            refine_result = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+            _, refine_val, _, refine_loc = cv2.minMaxLoc(refine_result)
+            if best is None or refine_val > best[1]:
+                best = ((left + refine_loc[0], top + refine_loc[1]), float(refine_val))
+        
+        if best is not None and best[1] >= threshold:
+            return best
+        return None
+    
+    def _get_canvas_geometry(self, driver: WebDriver) -> Optional[Dict[str, float]]:
+        """取得 Canvas 位置與視窗尺寸（依 session 快取）。
+        
+        Canvas 位置只在視窗調整時改變，快取 CANVAS_GEOMETRY_CACHE_TTL 秒，
+        避免每次檢測都多一次 WebDriver 往返。
+        
+        參數:
+            driver: WebDriver 實例
+            
+        回傳:
+            {"x", "y", "w", "h", "vw", "vh", "dpr"}，無法取得時回傳 None
+        """
+        key = getattr(driver, 'session_id', None) or str(id(driver))
+        now = time.monotonic()
+        
+        with self._canvas_geometry_lock:
+            cached = self._canvas_geometry_cache.get(key)
+            if cached is not None and now - cached[0] < Constants.CANVAS_GEOMETRY_CACHE_TTL:
+                return cached[1]
+        
+        try:
+            geometry = BrowserHelper.get_canvas_geometry(driver)
+        except Exception as e:
+            self.logger.debug(f"取得 Canvas 幾何資訊失敗: {e}")
+            geometry = None
+        
+        if not geometry or geometry.get('vw', 0) <= 0 or geometry.get('vh', 0) <= 0:
+            return None
+        
+        with self._canvas_geometry_lock:
+            self._canvas_geometry_cache[key] = (now, geometry)
+        return geometry
+    
+    def _get_blackscreen_region(
+        self,
+        image_size: Tuple[int, int],
+        geometry: Optional[Dict[str, float]]
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """計算亮度統計黑屏檢測的區域（與黑屏模板的截取範圍相同）。
+        
+        與 capture_blackscreen_template 相同，以整窗截圖比例計算中心、邊距為整窗截圖像素；
+        畫面小於整窗截圖（縮小的串流畫面）時，依 Canvas 幾何資訊將邊距等比縮小。
+        
+        參數:
+            image_size: 畫面尺寸 (width, height)
+            geometry: Canvas 幾何資訊（可選，無時視為整窗截圖）
+            
+        回傳:
+            (left, top, right, bottom)，區域無效時回傳 None
+        """
+        image_width, image_height = image_size
+        margin_x = Constants.BLACKSCREEN_CROP_MARGIN_X
+        margin_y = Constants.BLACKSCREEN_CROP_MARGIN_Y
+        
+        if geometry is not None:
+            # 畫面像素 / 整窗截圖像素（整窗截圖為 1，串流畫面小於 1）
+            dpr = float(geometry.get('dpr') or 1.0)
+            margin_x = int(margin_x * image_width / (geometry['vw'] * dpr))
+            margin_y = int(margin_y * image_height / (geometry['vh'] * dpr))
+        center_x = int(image_width * Constants.BLACKSCREEN_CENTER_X)
+        center_y = int(image_height * Constants.BLACKSCREEN_CENTER_Y)
+        
+        left = max(0, center_x - margin_x)
+        top = max(0, center_y - margin_y)
+        right = min(image_width, center_x + margin_x)
+        bottom = min(image_height, center_y + margin_y)
+        
+        if right - left < 2 or bottom - top < 2:
+            return None
+        return (left, top, right, bottom)
+    
+    def get_luminance_stats(self, image: np.ndarray) -> Tuple[float, float, float]:
+        """計算區域的亮度統計。
+        
+        先縮小為 BLACKSCREEN_LUMA_SAMPLE_SIZE 再統計，成本與區域大小無關。
+        
+        參數:
+            image: 區域圖片（BGR 或灰階）
+            
+        回傳:
+            (平均亮度, 亮度標準差, 暗像素比例)
+        """
+        sample = cv2.resize(
+            image, Constants.BLACKSCREEN_LUMA_SAMPLE_SIZE, interpolation=cv2.INTER_AREA
+        )
+        sample_gray = self.to_grayscale(sample)
+        mean, stddev = cv2.meanStdDev(sample_gray)
+        hist = cv2.calcHist([sample_gray], [0], None, [256], [0, 256])
+        dark_ratio = float(hist[:Constants.BLACKSCREEN_LUMA_DARK_LEVEL].sum()) / sample_gray.size
+        return float(mean[0][0]), float(stddev[0][0]), dark_ratio
+    
+    def is_black_region(self, image: np.ndarray) -> bool:
+        """以亮度統計判斷區域是否為黑屏。
+        
+        參數:
+            image: 區域圖片（BGR 或灰階）
+            
+        回傳:
+            平均亮度、標準差與暗像素比例都符合黑屏條件時回傳 True
+        """
+        if image.size == 0:
+            return False
+        mean, stddev, dark_ratio = self.get_luminance_stats(image)
+        return (
+            mean <= Constants.BLACKSCREEN_LUMA_MAX_MEAN
+            and stddev <= Constants.BLACKSCREEN_LUMA_MAX_STDDEV
+            and dark_ratio >= Constants.BLACKSCREEN_LUMA_MIN_DARK_RATIO
+        )
+    
+    def get_canvas_rect(self, driver: WebDriver) -> Optional[Dict[str, float]]:
+        """取得 Canvas 區域（使用幾何資訊快取，快取無效時改用重試查詢）。
+        
+        參數:
+            driver: WebDriver 實例
+            
+        回傳:
+            Canvas 區域資訊 {"x", "y", "w", "h"}，失敗時回傳 None
+        """
+        geometry = self._get_canvas_geometry(driver)
+        if geometry is not None:
+            return {key: geometry[key] for key in ("x", "y", "w", "h")}
+        return BrowserHelper.get_canvas_rect(driver)
+    
+    @staticmethod
+    def _frame_source(driver: WebDriver) -> str:
+        """取得共用畫面的來源識別（WebDriver session_id）。"""
+        return getattr(driver, 'session_id', None) or str(id(driver))
+    
+    def get_shared_frame(
+        self,
+        driver: WebDriver,
+        frame_provider: FrameProvider,
+        max_age: float,
+        capture_format: Optional[str] = None
+    ) -> np.ndarray:
+        """透過共用畫面來源取得整窗畫面。
+        
+        參數:
+            driver: WebDriver 實例
+            frame_provider: 該瀏覽器的共用畫面來源
+            max_age: 可接受的畫面年齡（秒）
+            capture_format: 需要擷取時使用的截圖格式
+            
+        回傳:
+            唯讀的 BGR 畫面陣列
+            
+        異常:
+            ImageDetectionError: 截圖失敗
+        """
+        resolved_format = self._resolve_capture_format(capture_format)
+        return frame_provider.get_frame(
+            self._frame_source(driver),
+            lambda: self.capture_screenshot(driver, capture_format=capture_format),
+            max_age,
+            lossless=resolved_format.is_lossless
+        )
+    
+    def _capture_full_frame(
+        self,
+        driver: WebDriver,
+        capture_format: Optional[str],
+        frame_provider: Optional[FrameProvider],
+        max_frame_age: float
+    ) -> np.ndarray:
+        """擷取整窗畫面；有共用畫面來源時透過它取得。"""
+        if frame_provider is None:
+            return self.capture_screenshot(driver, capture_format=capture_format)
+        return self.get_shared_frame(driver, frame_provider, max_frame_age, capture_format)
+    
+    def _get_template_search_region(
+        self,
+        template_name: str,
+        image_size: Tuple[int, int],
+        geometry: Optional[Dict[str, float]]
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """依模板 ROI 設定計算整窗截圖上的搜尋區域。
+        
+        中心以整窗截圖比例計算（與 _capture_cropped_template 截取模板時相同），
+        搜尋範圍為模板尺寸加上 ROI 設定的搜尋邊距（CSS 像素，以 DPR 換算為截圖像素）。
+        
+        參數:
+            template_name: 模板圖片檔名
+            image_size: 整窗截圖尺寸 (width, height)
+            geometry: Canvas 幾何資訊（_get_canvas_geometry 的結果）
+            
+        回傳:
+            (left, top, right, bottom)，模板無 ROI 設定或無法計算時回傳 None
+        """
+        if self.uses_luminance_detection(template_name):
+            return self._get_blackscreen_region(image_size, geometry) if geometry else None
+        
+        roi = Constants.TEMPLATE_ROI.get(template_name)
+        if roi is None or geometry is None:
+            return None
+        
+        try:
+            template = self.load_template(
+                self.get_template_path(template_name),
+                canvas_size=self._canvas_pixel_size(geometry, image_size)
+            )
+        except Exception:
+            return None
+        
+        center_x_ratio, center_y_ratio, margin_x, margin_y = roi
+        image_width, image_height = image_size
+        template_h, template_w = template.shape[:2]
+        
+        # 計算設備像素比（截圖像素 / 視窗 CSS 像素）
+        dpr_x = image_width / geometry['vw']
+        dpr_y = image_height / geometry['vh']
+        
+        center_x = int(image_width * center_x_ratio)
+        center_y = int(image_height * center_y_ratio)
+        half_w = template_w // 2 + int(margin_x * dpr_x)
+        half_h = template_h // 2 + int(margin_y * dpr_y)
+        
+        left = max(0, center_x - half_w)
+        top = max(0, center_y - half_h)
+        right = min(image_width, center_x + half_w + 1)
+        bottom = min(image_height, center_y + half_h + 1)
+        
+        if right - left < template_w or bottom - top < template_h:
+            return None
+        return (left, top, right, bottom)
+    
     def detect_in_browser(
         self, 
         driver: WebDriver, 
         template_name: str, 
-        threshold: float = Constants.MATCH_THRESHOLD
+        threshold: float = Constants.MATCH_THRESHOLD,
+        use_roi: bool = True,
+        full_frame_fallback: bool = False,
+        capture_format: Optional[str] = None,
+        frame_provider: Optional[FrameProvider] = None,
+        max_frame_age: float = Constants.FRAME_SHARE_MAX_AGE
     ) -> Optional[Tuple[int, int, float]]:
         """在瀏覽器中檢測模板圖片。
         
+        有 ROI 設定（Constants.TEMPLATE_ROI）的模板只在該區域內比對，
+        並只擷取該區域的畫面（見 detect_many_in_browser）。
+        
+        參數:
+            driver: WebDriver 實例
+            template_name: 模板圖片檔名
+            threshold: 匹配閾值
+            use_roi: 是否使用模板的 ROI 設定
+            full_frame_fallback: ROI 內未找到時是否再搜尋整張截圖
+            capture_format: 截圖格式字串（見 CaptureFormat.parse，預設 PNG）
+            frame_provider: 共用畫面來源（可選，見 detect_many_in_browser）
+            max_frame_age: 可接受的共用畫面年齡（秒）
+            
+        回傳:
+            如果找到: (x, y, confidence)
+            如果未找到: None
+        """
+        if not self.template_exists(template_name):
+            self.logger.error(
+                f"瀏覽器圖片檢測失敗: 模板圖片不存在: {self.get_template_path(template_name)}"
+            )
+            return None
+        
+        return self.detect_many_in_browser(
+            driver, [template_name], threshold, use_roi, full_frame_fallback, capture_format,
+            frame_provider, max_frame_age
+        )[template_name]
+    
+    def _capture_for_templates(
+        self,
+        driver: WebDriver,
+        template_names: List[str],
+        use_roi: bool,
+        capture_format: Optional[str] = None,
+        frame_provider: Optional[FrameProvider] = None,
+        max_frame_age: float = Constants.FRAME_SHARE_MAX_AGE
+    ) -> Tuple[np.ndarray, Tuple[int, int], Dict[str, Optional[Tuple[int, int, int, int]]], bool]:
+        """擷取比對所需的畫面，並計算各模板在該畫面上的搜尋區域。
+        
+        共用畫面來源有串流畫面（可能小於整窗截圖；截圖格式為無損或無法取得視窗尺寸時不使用）
+        或夠新的整窗畫面時直接使用；
+        否則所有模板都有 ROI 時，以 CDP clip 只擷取各 ROI 的聯集範圍；
+        其餘情況擷取整個視窗（有共用畫面來源時透過它擷取，供其他循環共用）。
+        
+        參數:
+            driver: WebDriver 實例
+            template_names: 模板圖片檔名列表
+            use_roi: 是否使用模板的 ROI 設定
+            capture_format: 截圖格式字串
+            frame_provider: 共用畫面來源（可選）
+            max_frame_age: 可接受的共用畫面年齡（秒）
+            
+        回傳:
+            (畫面, 畫面左上角在整窗截圖中的像素偏移, 模板 → 搜尋區域, 是否為區域截圖)
+        """
+        regions: Dict[str, Optional[Tuple[int, int, int, int]]] = {
+            name: None for name in template_names
+        }
+        wants_roi = use_roi and any(name in Constants.TEMPLATE_ROI for name in template_names)
+        
+        # 畫面串流的最新畫面，或其他循環剛擷取的整窗畫面夠新時直接共用
+        if frame_provider is not None:
+            require_lossless = self._resolve_capture_format(capture_format).is_lossless
+            # 串流畫面為縮小的 JPEG，只在截圖格式允許有損畫面時使用
+            shared = None if require_lossless else frame_provider.peek_screencast()
+            if shared is not None and self._get_canvas_geometry(driver) is None:
+                # 無法取得視窗尺寸時無法換算串流畫面的縮放比例，改用截圖
+                shared = None
+            if shared is None:
+                shared = frame_provider.peek(self._frame_source(driver), max_frame_age, require_lossless)
+            if shared is not None:
+                geometry = self._get_canvas_geometry(driver) if wants_roi else None
+                shared_size = (shared.shape[1], shared.shape[0])
+                for name in template_names:
+                    regions[name] = self._get_template_search_region(name, shared_size, geometry)
+                return shared, (0, 0), regions, False
+        
+        if not wants_roi:
+            screenshot = self._capture_full_frame(driver, capture_format, frame_provider, max_frame_age)
+            return screenshot, (0, 0), regions, False
+        
+        geometry = self._get_canvas_geometry(driver)
+        if geometry is None:
+            screenshot = self._capture_full_frame(driver, capture_format, frame_provider, max_frame_age)
+            return screenshot, (0, 0), regions, False
+        
+        dpr = float(geometry.get('dpr') or 1.0)
+        image_size = (int(round(geometry['vw'] * dpr)), int(round(geometry['vh'] * dpr)))
+        for name in template_names:
+            regions[name] = self._get_template_search_region(name, image_size, geometry)
+        
+        if not Constants.SCREENSHOT_CLIP_ENABLED or any(r is None for r in regions.values()):
+            # 有模板需要整窗搜尋：擷取整窗，依實際截圖尺寸重新計算區域
+            screenshot = self._capture_full_frame(driver, capture_format, frame_provider, max_frame_age)
+            actual_size = (screenshot.shape[1], screenshot.shape[0])
+            if actual_size != image_size:
+                for name in template_names:
+                    regions[name] = self._get_template_search_region(name, actual_size, geometry)
+            return screenshot, (0, 0), regions, False
+        
+        # 以所有 ROI 的聯集作為擷取範圍
+        left, top, right, bottom = self._union_region(regions)
+        
+        try:
+            screenshot = self.capture_clip(driver, {
+                "x": left / dpr,
+                "y": top / dpr,
+                "w": (right - left) / dpr,
+                "h": (bottom - top) / dpr
+            }, capture_format=capture_format)
+        except ImageDetectionError as e:
+            self.logger.debug(f"區域截圖失敗，改用整窗截圖: {e}")
+            screenshot = self._capture_full_frame(driver, capture_format, frame_provider, max_frame_age)
+            return screenshot, (0, 0), {name: None for name in template_names}, False
+        
+        # 將搜尋區域轉換為擷取畫面上的座標
+        clip_h, clip_w = screenshot.shape[:2]
+        return screenshot, (left, top), self._relative_regions(regions, (left, top), (clip_w, clip_h)), True
+    
+    @staticmethod
+    def _union_region(
+        regions: Dict[str, Optional[Tuple[int, int, int, int]]]
+    ) -> Tuple[int, int, int, int]:
+        """計算所有搜尋區域的聯集 (left, top, right, bottom)（區域皆不可為 None）。"""
+        return (
+            min(r[0] for r in regions.values()),
+            min(r[1] for r in regions.values()),
+            max(r[2] for r in regions.values()),
+            max(r[3] for r in regions.values())
+        )
+    
+    @staticmethod
+    def _relative_regions(
+        regions: Dict[str, Optional[Tuple[int, int, int, int]]],
+        origin: Tuple[int, int],
+        size: Tuple[int, int]
+    ) -> Dict[str, Optional[Tuple[int, int, int, int]]]:
+        """將整窗截圖上的搜尋區域轉換為區域截圖（左上角 origin、尺寸 size）上的座標。"""
+        left, top = origin
+        width, height = size
+        return {
+            name: (
+                max(0, region[0] - left),
+                max(0, region[1] - top),
+                min(width, region[2] - left),
+                min(height, region[3] - top)
+            )
+            for name, region in regions.items()
+        }
+    
+    def detect_many_in_browser(
+        self,
+        driver: WebDriver,
+        template_names: List[str],
+        threshold: float = Constants.MATCH_THRESHOLD,
+        use_roi: bool = True,
+        full_frame_fallback: bool = False,
+        capture_format: Optional[str] = None,
+        frame_provider: Optional[FrameProvider] = None,
+        max_frame_age: float = Constants.FRAME_SHARE_MAX_AGE,
+        gate_key: Optional[str] = None,
+        vision_pool: Optional['VisionWorkerPool'] = None
+    ) -> Dict[str, Optional[Tuple[int, int, float]]]:
+        """在瀏覽器中以單次截圖檢測多個模板圖片。
+        
+        只截圖一次，再將所有模板與同一張截圖比對，
+        取代多次呼叫 detect_in_browser 所造成的重複截圖與解碼。
+        模板檔案不存在時該模板結果為 None。
+        回傳座標一律為整窗截圖上的像素座標。
+        指定 frame_provider 時，與同一瀏覽器的其他循環共用不超過
+        max_frame_age 秒的整窗畫面，同時發出的整窗擷取會合併為一次。
+        指定 gate_key 時啟用畫面變化閘門：畫面縮圖與上次完整比對時幾乎相同，
+        且未超過 FRAME_GATE_MAX_STALENESS 秒時，直接沿用上次的檢測結果。
+        
+        參數:
+            driver: WebDriver 實例
+            template_names: 模板圖片檔名列表
+            threshold: 匹配閾值
+            use_roi: 是否使用模板的 ROI 設定
+            full_frame_fallback: ROI 內未找到時是否再搜尋整張截圖
+            capture_format: 截圖格式字串（見 CaptureFormat.parse，預設 PNG）
+            frame_provider: 該瀏覽器的共用畫面來源（可選）
+            max_frame_age: 可接受的共用畫面年齡（秒）
+            gate_key: 畫面變化閘門名稱（可選，每個呼叫端各自一個，例如 "monitor"）
+            vision_pool: 視覺處理程序池（可選，運行中時解碼與比對改在工作程序執行，
+                此時不使用 frame_provider 與 gate_key）
+            
+        回傳:
+            模板檔名 → 檢測結果的字典，找到為 (x, y, confidence)，未找到為 None
+        """
+        results: Dict[str, Optional[Tuple[int, int, float]]] = {
+            name: None for name in template_names
+        }
+        
+        # 只比對存在的模板（亮度統計檢測不需模板），全部不存在時不截圖
+        existing_names = [name for name in template_names if self.can_detect(name)]
+        if not existing_names:
+            return results
+        
+        try:
+            # 檢查瀏覽器是否仍然有效
+            try:
+                _ = driver.current_url
+            except Exception:
+                self.logger.warning("瀏覽器已關閉，無法進行圖片檢測")
+                return results
+            
+            if vision_pool is not None and vision_pool.is_running:
+                results.update(self._detect_many_pooled(
+                    driver, existing_names, threshold, use_roi, full_frame_fallback,
+                    capture_format, vision_pool
+                ))
+                return results
+            
+            screenshot, (offset_x, offset_y), regions, is_clipped = self._capture_for_templates(
+                driver, existing_names, use_roi, capture_format, frame_provider, max_frame_age
+            )
+        except Exception as e:
+            self.logger.error(f"瀏覽器圖片檢測失敗: {e}")
+            return results
+        
+        # 記錄畫面是否變化（同一擷取範圍比較指紋）
+        fingerprint = self._frame_fingerprint(screenshot)
+        self._track_frame_version(self._frame_source(driver), (offset_x, offset_y, screenshot.shape), fingerprint)
+        
+        # 畫面未變化時沿用上次結果
+        gate_entry_key: Optional[Tuple[str, str]] = None
+        if gate_key is not None and Constants.FRAME_GATE_MAX_STALENESS > 0:
+            gate_entry_key = (gate_key, self._frame_source(driver))
+            signature = (
+                offset_x, offset_y, screenshot.shape,
+                tuple(existing_names), threshold, use_roi, full_frame_fallback
+            )
+            cached_results = self._frame_gate_lookup(gate_entry_key, fingerprint, signature)
+            if cached_results is not None:
+                results.update(cached_results)
+                return results
+        
+        # Canvas 尺寸與模板截取時不同，或畫面為縮小的串流畫面時改用縮放後的模板
+        frame_scale, canvas_size = self._get_frame_scale(driver, screenshot, is_clipped)
+        results.update(self._match_templates_in_frame(
+            screenshot, existing_names, regions, (offset_x, offset_y), is_clipped, threshold,
+            canvas_size, frame_scale
+        ))
+        
+        # ROI 內未找到且要求整窗搜尋時，改以整窗截圖搜尋（區域截圖時需補擷取）
+        fallback_names = [
+            name for name in existing_names
+            if full_frame_fallback and results[name] is None and regions[name] is not None
+            and not self.uses_luminance_detection(name)
+        ]
+        if fallback_names:
+            try:
+                full_screenshot = (
+                    self._capture_full_frame(driver, capture_format, frame_provider, max_frame_age)
+                    if is_clipped else screenshot
+                )
+                for name in fallback_names:
+                    results[name] = self.match_template(
+                        full_screenshot, self.get_template_path(name), threshold,
+                        canvas_size=canvas_size, frame_scale=frame_scale
+                    )
+            except Exception as e:
+                self.logger.error(f"瀏覽器圖片檢測失敗: {e}")
+        
+        # 縮小的串流畫面：座標換算回整窗截圖像素
+        if frame_scale != 1.0:
+            for name, result in results.items():
+                if result is not None:
+                    results[name] = (
+                        int(round(result[0] * frame_scale)),
+                        int(round(result[1] * frame_scale)),
+                        result[2]
+                    )
+        
+        if gate_entry_key is not None:
+            with self._frame_gate_lock:
+                self._frame_gate[gate_entry_key] = FrameGateEntry(
+                    fingerprint, signature, dict(results), time.monotonic()
+                )
+        
+        return results
+    
+    def _get_frame_scale(
+        self,
+        driver: WebDriver,
+        screenshot: np.ndarray,
+        is_clipped: bool
+    ) -> Tuple[float, Optional[Tuple[int, int]]]:
+        """計算畫面與整窗截圖的像素比例，以及畫面中的 Canvas 尺寸。
+        
+        畫面串流的畫面可能經過縮小，檢測結果需乘上此比例換算回整窗截圖座標；
+        區域截圖固定為原解析度。
+        
         參數:
             driver: WebDriver 實例
-            template_name: 模板圖片檔名
+            screenshot: 比對用的畫面
+            is_clipped: 是否為區域截圖
+            
+        回傳:
+            (整窗截圖寬度 / 畫面寬度（相差 1% 以內視為 1.0）, Canvas 尺寸（無法取得時為 None）)
+        """
+        geometry = self._get_canvas_geometry(driver)
+        if geometry is None:
+            return 1.0, None
+        dpr = float(geometry.get('dpr') or 1.0)
+        full_size = (geometry['vw'] * dpr, geometry['vh'] * dpr)
+        if is_clipped:
+            return 1.0, self._canvas_pixel_size(geometry, full_size)
+        frame_size = (screenshot.shape[1], screenshot.shape[0])
+        scale = full_size[0] / frame_size[0]
+        if abs(scale - 1.0) <= 0.01:
+            scale = 1.0
+        return scale, self._canvas_pixel_size(geometry, frame_size)
+    
+    def _match_templates_in_frame(
+        self,
+        screenshot: np.ndarray,
+        template_names: List[str],
+        regions: Dict[str, Optional[Tuple[int, int, int, int]]],
+        offset: Tuple[int, int],
+        is_clipped: bool,
+        threshold: float,
+        canvas_size: Optional[Tuple[int, int]],
+        frame_scale: float = 1.0
+    ) -> Dict[str, Optional[Tuple[int, int, float]]]:
+        """在單張畫面中比對多個模板（亮度統計檢測的模板以亮度判斷）。
+        
+        參數:
+            screenshot: 畫面（整窗或區域截圖）
+            template_names: 模板圖片檔名列表（皆可檢測）
+            regions: 模板 → 畫面上的搜尋區域（None 表示整張畫面）
+            offset: 畫面左上角在整窗截圖中的像素偏移
+            is_clipped: 是否為區域截圖
             threshold: 匹配閾值
+            canvas_size: 畫面中 Canvas 的尺寸（可選，見 match_template）
+            frame_scale: 整窗截圖寬度 / 畫面寬度（見 match_template）
             
         回傳:
-            如果找到: (x, y, confidence)
-            如果未找到: None
+            模板檔名 → 整窗截圖座標上的檢測結果
+        """
+        offset_x, offset_y = offset
+        screenshot_size = (screenshot.shape[1], screenshot.shape[0])
+        results: Dict[str, Optional[Tuple[int, int, float]]] = {}
+        with self.compute_budget.slot():
+            for name in template_names:
+                results[name] = None
+                region = regions.get(name)
+                try:
+                    if self.uses_luminance_detection(name):
+                        if region is None and not is_clipped:
+                            region = self._get_blackscreen_region(screenshot_size, None)
+                        if region is not None:
+                            left, top, right, bottom = region
+                            if self.is_black_region(screenshot[top:bottom, left:right]):
+                                results[name] = (
+                                    (left + right) // 2 + offset_x,
+                                    (top + bottom) // 2 + offset_y,
+                                    1.0
+                                )
+                            continue
+                        # 無法計算區域：改用模板比對（模板存在時）
+                        if not self.template_exists(name):
+                            continue
+                        region = None
+                
+                    result = self.match_template(
+                        screenshot, self.get_template_path(name), threshold, region, canvas_size, frame_scale
+                    )
+                    if result is not None:
+                        results[name] = (result[0] + offset_x, result[1] + offset_y, result[2])
+                except Exception as e:
+                    self.logger.error(f"瀏覽器圖片檢測失敗 [{name}]: {e}")
+        return results
+    
+    def _detect_many_pooled(
+        self,
+        driver: WebDriver,
+        template_names: List[str],
+        threshold: float,
+        use_roi: bool,
+        full_frame_fallback: bool,
+        capture_format: Optional[str],
+        vision_pool: 'VisionWorkerPool'
+    ) -> Dict[str, Optional[Tuple[int, int, float]]]:
+        """擷取畫面位元組，交由視覺處理程序池解碼並比對（見 detect_many_in_browser）。
+        
+        本執行緒只負責擷取與計算搜尋區域；解碼、亮度統計與模板比對都在工作程序中執行。
+        工作程序只收到畫面位元組，因此不使用共用畫面來源與畫面變化閘門。
         """
+        results: Dict[str, Optional[Tuple[int, int, float]]] = {
+            name: None for name in template_names
+        }
+        geometry = self._get_canvas_geometry(driver)
+        canvas_size = self.get_canvas_pixel_size(driver)
+        wants_roi = use_roi and any(name in Constants.TEMPLATE_ROI for name in template_names)
+        request: Dict[str, Any] = {
+            'image_dir': str(self.image_dir),
+            'names': template_names,
+            'regions': {name: None for name in template_names},
+            'geometry': geometry if wants_roi else None,
+            'offset': (0, 0),
+            'is_clipped': False,
+            'threshold': threshold,
+            'canvas_size': canvas_size,
+            'full_frame_fallback': full_frame_fallback,
+        }
+        
+        clip_region: Optional[Tuple[int, int, int, int]] = None
+        if wants_roi and geometry is not None and Constants.SCREENSHOT_CLIP_ENABLED:
+            dpr = float(geometry.get('dpr') or 1.0)
+            image_size = (int(round(geometry['vw'] * dpr)), int(round(geometry['vh'] * dpr)))
+            regions = {
+                name: self._get_template_search_region(name, image_size, geometry)
+                for name in template_names
+            }
+            if all(region is not None for region in regions.values()):
+                clip_region = self._union_region(regions)
+                left, top, right, bottom = clip_region
+                request.update({
+                    'regions': self._relative_regions(regions, (left, top), (right - left, bottom - top)),
+                    'geometry': None,
+                    'offset': (left, top),
+                    'is_clipped': True,
+                })
+        
         try:
-            # 檢查瀏覽器是否仍然有效
-            try:
-                _ = driver.current_url
-            except Exception:
-                self.logger.warning("瀏覽器已關閉，無法進行圖片檢測")
-                return None
-            
-            screenshot = self.capture_screenshot(driver)
-            template_path = self.get_template_path(template_name)
-            return self.match_template(screenshot, template_path, threshold)
+            if clip_region is not None:
+                left, top, right, bottom = clip_region
+                data = self.capture_raw(driver, {
+                    "x": left / dpr,
+                    "y": top / dpr,
+                    "w": (right - left) / dpr,
+                    "h": (bottom - top) / dpr
+                }, capture_format=capture_format)
+            else:
+                data = self.capture_raw(driver, capture_format=capture_format)
+            results.update(vision_pool.match(data, request))
         except Exception as e:
             self.logger.error(f"瀏覽器圖片檢測失敗: {e}")
-            return None
+            return results
+        
+        # 區域截圖的 ROI 內未找到且要求整窗搜尋時，補擷取整窗畫面（整窗畫面由工作程序直接重搜）
+        fallback_names = [
+            name for name in template_names
+            if full_frame_fallback and clip_region is not None and results[name] is None
+            and not self.uses_luminance_detection(name)
+        ]
+        if fallback_names:
+            try:
+                data = self.capture_raw(driver, capture_format=capture_format)
+                results.update(vision_pool.match(data, {
+                    **request,
+                    'names': fallback_names,
+                    'regions': {name: None for name in fallback_names},
+                    'geometry': None,
+                    'offset': (0, 0),
+                    'is_clipped': False,
+                    'full_frame_fallback': False,
+                }))
+            except Exception as e:
+                self.logger.error(f"瀏覽器圖片檢測失敗: {e}")
+        
+        return results
     
     def _capture_cropped_template(
         self,
@@ -2596,11 +6738,10 @@ class ImageDetector:
         """
         try:
             # 截取整個瀏覽器畫面
-            screenshot = driver.get_screenshot_as_png()
-            screenshot_img = Image.open(io.BytesIO(screenshot))
+            screenshot = self.decode_image(driver.get_screenshot_as_png())
             
             # 獲取實際截圖尺寸
-            image_width, image_height = screenshot_img.size
+            image_height, image_width = screenshot.shape[:2]
             
             # 使用比例計算實際中心座標
             center_x = int(image_width * center_x_ratio)
@@ -2613,7 +6754,7 @@ class ImageDetector:
             crop_bottom = min(image_height, center_y + margin_y)
             
             # 裁切圖片
-            cropped_img = screenshot_img.crop((crop_left, crop_top, crop_right, crop_bottom))
+            cropped_img = screenshot[crop_top:crop_bottom, crop_left:crop_right]
             
             # 決定輸出目錄
             if output_dir is None:
@@ -2622,7 +6763,9 @@ class ImageDetector:
             
             # 儲存圖片
             output_path = output_dir / filename
-            cropped_img.save(output_path)
+            if not self._write_png(output_path, cropped_img):
+                return False
+            self._record_template_canvas_size(driver, output_path, (image_width, image_height))
             
             # 取得顯示名稱
             display_name = Constants.TEMPLATE_DISPLAY_NAMES.get(filename, filename)
@@ -2637,7 +6780,7 @@ class ImageDetector:
     def _get_betsize_crop_region(
         self,
         driver: WebDriver,
-        screenshot_img: Image.Image,
+        image_size: Tuple[int, int],
         margin_multiplier: float = 1.0
     ) -> Optional[Tuple[int, int, int, int]]:
         """計算金額顯示區域在截圖上的裁切範圍。
@@ -2648,14 +6791,14 @@ class ImageDetector:
         
         參數:
             driver: WebDriver 實例
-            screenshot_img: PIL 截圖物件
+            image_size: 截圖尺寸 (width, height)
             margin_multiplier: 邊距倍數（識別時使用較大範圍以容納搜尋空間）
         
         回傳:
             (left, top, right, bottom) 裁切範圍，失敗返回 None
         """
         try:
-            image_width, image_height = screenshot_img.size
+            image_width, image_height = image_size
             
             # 取得 Canvas 區域
             canvas_rect = BrowserHelper.get_canvas_rect(driver)
@@ -2714,22 +6857,26 @@ class ImageDetector:
         
         try:
             # 截取整個瀏覽器畫面
-            screenshot = driver.get_screenshot_as_png()
-            screenshot_img = Image.open(io.BytesIO(screenshot))
+            screenshot = self.decode_image(driver.get_screenshot_as_png())
             
             # 計算金額區域裁切範圍
-            crop_region = self._get_betsize_crop_region(driver, screenshot_img)
+            crop_region = self._get_betsize_crop_region(
+                driver, (screenshot.shape[1], screenshot.shape[0])
+            )
             if crop_region is None:
                 return False
             
             # 裁切圖片
-            cropped_img = screenshot_img.crop(crop_region)
+            left, top, right, bottom = crop_region
+            cropped_img = screenshot[top:bottom, left:right]
             
             # 儲存
-            output_dir = get_resource_path("img") / "bet_size"
+            output_dir = self.betsize_bank.bet_size_dir
             output_dir.mkdir(parents=True, exist_ok=True)
             output_path = output_dir / filename
-            cropped_img.save(output_path)
+            if not self._write_png(output_path, cropped_img):
+                return False
+            self.betsize_bank.invalidate()
             
             self.logger.info(f"模板已儲存: {filename}")
             return True
@@ -2801,10 +6948,14 @@ class ImageDetector:
             
             # 截取整個瀏覽器畫面（與 lobby_login 相同方式）
             screenshot = driver.get_screenshot_as_png()
-            screenshot_img = Image.open(io.BytesIO(screenshot))
             
-            # 直接儲存完整截圖（不裁切）
-            screenshot_img.save(output_path)
+            # 直接儲存完整截圖（不裁切，PNG 位元組無需解碼）
+            with open(output_path, 'wb') as f:
+                f.write(screenshot)
+            
+            # 只讀取 PNG 標頭的寬高，不解碼整張圖
+            with Image.open(output_path) as image:
+                self._record_template_canvas_size(driver, output_path, image.size)
             
             self.logger.info(f"模板已儲存: {display_name}")
             
@@ -2818,11 +6969,16 @@ class ImageDetector:
     # 金額識別相關方法
     # -------------------------------------------------------------------------
 
+    def forget_betsize(self, driver: WebDriver) -> None:
+        """清除該瀏覽器記錄的確認金額（下次調整時重新識別）。"""
+        self.betsize_tracker.invalidate(self._frame_source(driver))
+
     def get_current_betsize(
         self,
         driver: WebDriver,
         retry_count: Optional[int] = None,
-        silent: bool = False
+        silent: bool = False,
+        frame_provider: Optional[FrameProvider] = None
     ) -> Optional[float]:
         """取得當前下注金額。
         
@@ -2834,6 +6990,7 @@ class ImageDetector:
             driver: WebDriver 實例
             retry_count: 重試次數（預設使用常數）
             silent: 是否靜默模式（不輸出詳細日誌）
+            frame_provider: 共用畫面來源（可選，接受 BETSIZE_FRAME_MAX_AGE 內的畫面）
             
         回傳:
             當前金額，失敗返回 None
@@ -2846,20 +7003,28 @@ class ImageDetector:
                 if attempt > 0:
                     time.sleep(Constants.BETSIZE_READ_RETRY_WAIT)
                 
-                # 截取整個瀏覽器截圖
-                screenshot = driver.get_screenshot_as_png()
-                screenshot_img = Image.open(io.BytesIO(screenshot))
+                if frame_provider is not None:
+                    # 共用其他循環剛擷取的整窗畫面（金額識別需無損畫面）
+                    frame = self.get_shared_frame(
+                        driver, frame_provider, Constants.BETSIZE_FRAME_MAX_AGE
+                    )
+                    screenshot_gray = self.to_grayscale(frame, buffer_key=self._frame_source(driver))
+                else:
+                    # 截取整個瀏覽器截圖（金額比對只需灰階，直接解碼為灰階）
+                    screenshot_gray = self.decode_image(driver.get_screenshot_as_png(), grayscale=True)
                 
                 # 裁切金額顯示區域（使用 2 倍邊距確保模板能被搜尋到）
-                crop_region = self._get_betsize_crop_region(driver, screenshot_img, margin_multiplier=2.0)
+                crop_region = self._get_betsize_crop_region(
+                    driver,
+                    (screenshot_gray.shape[1], screenshot_gray.shape[0]),
+                    margin_multiplier=2.0
+                )
                 if crop_region is not None:
-                    cropped_img = screenshot_img.crop(crop_region)
-                    search_np = np.array(cropped_img)
+                    left, top, right, bottom = crop_region
+                    search_gray = screenshot_gray[top:bottom, left:right]
                 else:
                     # Fallback: 無法取得 Canvas 則使用全圖
-                    search_np = np.array(screenshot_img)
-                
-                search_gray = cv2.cvtColor(search_np, cv2.COLOR_RGB2GRAY)
+                    search_gray = screenshot_gray
                 
                 # 與資料夾中的圖片進行比對
                 matched_amount, confidence = self._compare_betsize_images(search_gray)
@@ -2885,7 +7050,11 @@ class ImageDetector:
         self,
         screenshot_gray: np.ndarray
     ) -> Tuple[Optional[str], float]:
-        """使用 bet_size 資料夾中的圖片比對。
+        """辨識金額區域中的金額。
+        
+        BETSIZE_READ_MODE 為 "glyph" 時先逐字元辨識，結果在 GAME_BETSIZE 中
+        且信心度達 BETSIZE_MATCH_THRESHOLD（與模板比對相同的標準）時採用；
+        否則改用金額模板庫逐一比對，逐字元辨識的低信心結果不會被採用。
         
         參數:
             screenshot_gray: 截圖（灰階）
@@ -2894,56 +7063,17 @@ class ImageDetector:
             (匹配的金額, 信心度)
         """
         try:
-            bet_size_dir = get_resource_path("img") / "bet_size"
-            
-            if not bet_size_dir.exists():
-                self.logger.warning(f"bet_size 資料夾不存在: {bet_size_dir}")
-                try:
-                    bet_size_dir.mkdir(parents=True, exist_ok=True)
-                    self.logger.info(f"已建立 bet_size 資料夾: {bet_size_dir}")
-                except Exception as e:
-                    self.logger.error(f"無法建立 bet_size 資料夾: {e}")
-                    return None, 0.0
-            
-            # 取得所有 png 圖片
-            image_files = sorted(bet_size_dir.glob("*.png"))
-            if not image_files:
-                self.logger.warning("bet_size 資料夾中沒有圖片")
-                return None, 0.0
-            
-            # 儲存所有匹配結果
-            match_results = []
-            
-            for image_file in image_files:
-                # 讀取模板圖片（使用支援 Unicode 路徑的函式）
-                template = cv2_imread_unicode(image_file, cv2.IMREAD_GRAYSCALE)
-                if template is None:
-                    continue
-                
-                # 檢查尺寸
-                if (screenshot_gray.shape[0] < template.shape[0] or 
-                    screenshot_gray.shape[1] < template.shape[1]):
-                    continue
-                
-                # 執行模板匹配
-                result = cv2.matchTemplate(screenshot_gray, template, cv2.TM_CCOEFF_NORMED)
-                _, max_val, _, _ = cv2.minMaxLoc(result)
-                
-                match_results.append((image_file.stem, max_val))
-            
-            if not match_results:
-                return None, 0.0
-            
-            # 按信心度排序
-            match_results.sort(key=lambda x: x[1], reverse=True)
-            best_match_amount, best_match_score = match_results[0]
-            
-            # 使用常數定義的閾值
-            if best_match_score >= Constants.BETSIZE_MATCH_THRESHOLD:
-                return best_match_amount, best_match_score
-            else:
-                return None, best_match_score
-                
+            with self.compute_budget.slot():
+                if Constants.BETSIZE_READ_MODE == "glyph":
+                    text, confidence = self.betsize_reader.read(screenshot_gray)
+                    if text is not None:
+                        try:
+                            if (float(text) in Constants.GAME_BETSIZE
+                                    and confidence >= Constants.BETSIZE_MATCH_THRESHOLD):
+                                return text, confidence
+                        except ValueError:
+                            pass
+                return self.betsize_bank.match(screenshot_gray)
         except Exception as e:
             self.logger.error(f"比對圖片時發生錯誤: {e}")
             return None, 0.0
@@ -2955,13 +7085,13 @@ class ImageDetector:
         金額按鈕位於 Canvas 下方（y_ratio > 1.0），
         不能直接用截圖尺寸乘以比例，需透過 Canvas 位置計算。
         """
-        canvas_rect = BrowserHelper.get_canvas_rect(driver)
+        canvas_rect = self.get_canvas_rect(driver)
         if canvas_rect:
             BrowserHelper.click_canvas_position(driver, canvas_rect, x_ratio, y_ratio)
         else:
             # Fallback: 使用截圖尺寸（僅在 Canvas 無法取得時）
-            screenshot = driver.get_screenshot_as_png()
-            w, h = Image.open(io.BytesIO(screenshot)).size
+            screenshot = self.decode_image(driver.get_screenshot_as_png(), grayscale=True)
+            h, w = screenshot.shape[:2]
             x, y = int(w * x_ratio), int(h * y_ratio)
             BrowserHelper.execute_cdp_click(driver, x, y)
 
@@ -2969,23 +7099,57 @@ class ImageDetector:
         self,
         driver: WebDriver,
         target_amount: float,
-        stop_event: Optional[threading.Event] = None
+        stop_event: Optional[threading.Event] = None,
+        frame_provider: Optional[FrameProvider] = None,
+        trust_tracked: bool = False,
+        deadline: Optional[float] = None,
+        cancel_event: Optional[threading.Event] = None
     ) -> bool:
-        """調整下注金額到目標值（無限等待版）。"""
-        # 決定調整方向的按鈕座標
+        """調整下注金額到目標值（未指定期限時無限等待）。
+        
+        讀取一次目前金額後，依 GAME_BETSIZE 中的索引差連續點擊調整按鈕
+        （間隔 BETSIZE_BURST_CLICK_GAP），等待畫面更新後再讀取一次確認，
+        不一致時以新讀到的金額重新計算點擊次數。確認後的金額記錄於 betsize_tracker。
+        
+        參數:
+            driver: WebDriver 實例
+            target_amount: 目標金額
+            stop_event: 停止事件（可選）
+            frame_provider: 共用畫面來源（可選）
+            trust_tracked: 是否信任 betsize_tracker 的記錄；
+                記錄等於目標時直接回傳成功，否則以記錄作為起始金額
+            deadline: 期限（time.monotonic() 時間，可選），超過時放棄調整並回傳 False
+            cancel_event: 只取消此瀏覽器調整的事件（可選，例如並行調整時的落後者）
+            
+        回傳:
+            是否成功調整到目標金額
+        """
+        tracker_key = self._frame_source(driver)
         target_index = Constants.GAME_BETSIZE.index(target_amount)
         increase_btn = (Constants.BETSIZE_INCREASE_BUTTON_X, Constants.BETSIZE_INCREASE_BUTTON_Y)
         decrease_btn = (Constants.BETSIZE_DECREASE_BUTTON_X, Constants.BETSIZE_DECREASE_BUTTON_Y)
         
+        current = self.betsize_tracker.get(tracker_key) if trust_tracked else None
+        if current is not None and current == target_amount:
+            self.logger.debug(f"金額已確認為 {target_amount}，略過驗證")
+            return True
+        
+        # 調整期間畫面金額不再可信，完成確認前清除記錄
+        self.betsize_tracker.invalidate(tracker_key)
+        
         attempt = 0
         while True:
             # 檢查停止事件
-            if stop_event and stop_event.is_set():
+            if (stop_event and stop_event.is_set()) or (cancel_event and cancel_event.is_set()):
                 self.logger.info("金額調整已被停止")
                 return False
+            if deadline is not None and time.monotonic() >= deadline:
+                self.logger.warning(f"金額調整超過期限，放棄調整 (已嘗試 {attempt} 次)")
+                return False
             
             attempt += 1
-            current = self.get_current_betsize(driver, silent=True)
+            if current is None:
+                current = self.get_current_betsize(driver, silent=True, frame_provider=frame_provider)
             
             # 無法識別金額，繼續等待
             if current is None:
@@ -2994,15 +7158,25 @@ class ImageDetector:
                 time.sleep(Constants.BETSIZE_ADJUST_RETRY_WAIT)
                 continue
             
-            # 已達目標
+            # 已達目標（經畫面確認）
             if current == target_amount:
+                self.betsize_tracker.confirm(tracker_key, current)
                 return True
             
-            # 點擊調整按鈕
-            current_index = Constants.GAME_BETSIZE.index(current)
-            btn = increase_btn if target_index > current_index else decrease_btn
-            self.click_betsize_button(driver, btn[0], btn[1])
+            # 依索引差連續點擊調整按鈕
+            step_count = target_index - Constants.GAME_BETSIZE.index(current)
+            btn = increase_btn if step_count > 0 else decrease_btn
+            for step in range(abs(step_count)):
+                if (stop_event and stop_event.is_set()) or (cancel_event and cancel_event.is_set()):
+                    self.logger.info("金額調整已被停止")
+                    return False
+                if step > 0:
+                    time.sleep(Constants.BETSIZE_BURST_CLICK_GAP)
+                self.click_betsize_button(driver, btn[0], btn[1])
+            
+            # 等待畫面更新後重新讀取確認
             time.sleep(Constants.BETSIZE_ADJUST_STEP_WAIT)
+            current = None
 
     def capture_click_area_screenshot(
         self,
@@ -3115,6 +7289,262 @@ class ImageDetector:
             return False
 
 
+# =============================================================================
+# 視覺處理程序池
+# =============================================================================
+
+# 工作程序內的圖片檢測器（由 _vision_worker_init 建立，每個工作程序一個）
+_vision_worker_detector: Optional[ImageDetector] = None
+
+
+def _vision_worker_init(settings: Dict[str, Any]) -> None:
+    """視覺工作程序初始化：套用主程序的用戶設定並建立圖片檢測器。
+
+    參數:
+        settings: Constants 屬性名稱 → 主程序中的設定值
+    """
+    global _vision_worker_detector
+    for attr_name, value in settings.items():
+        setattr(Constants, attr_name, value)
+    _vision_worker_detector = ImageDetector()
+    # 平行度由工作程序數提供，每個程序內的 OpenCV 只用單執行緒
+    cv2.setNumThreads(1)
+
+
+def _vision_worker_ping() -> int:
+    """確認工作程序已啟動（預熱用）。"""
+    return os.getpid()
+
+
+def _vision_worker_match(
+    shm_name: str,
+    length: int,
+    request: Dict[str, Any]
+) -> Tuple[Dict[str, Optional[Tuple[int, int, float]]], float]:
+    """在工作程序中解碼共享記憶體內的畫面並比對模板。
+
+    參數:
+        shm_name: 共享記憶體名稱
+        length: 畫面位元組長度
+        request: 比對參數（見 ImageDetector._detect_many_pooled）
+
+    回傳:
+        (模板檔名 → 整窗截圖座標上的檢測結果, 工作程序內的處理時間（秒）)
+    """
+    start_time = time.perf_counter()
+    detector = _vision_worker_detector
+    if detector is None:
+        raise ImageDetectionError("視覺工作程序尚未初始化")
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        encoded = np.frombuffer(shm.buf, dtype=np.uint8, count=length)
+        screenshot = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+        del encoded
+    finally:
+        shm.close()
+    if screenshot is None:
+        raise ImageDetectionError("畫面解碼失敗")
+
+    image_dir = Path(request['image_dir'])
+    if detector.image_dir != image_dir:
+        detector.image_dir = image_dir
+
+    names: List[str] = request['names']
+    threshold: float = request['threshold']
+    canvas_size: Optional[Tuple[int, int]] = request['canvas_size']
+    regions: Dict[str, Optional[Tuple[int, int, int, int]]] = request['regions']
+    geometry: Optional[Dict[str, float]] = request['geometry']
+    if geometry is not None:
+        # 整窗畫面：依實際畫面尺寸計算搜尋區域
+        screenshot_size = (screenshot.shape[1], screenshot.shape[0])
+        regions = {
+            name: detector._get_template_search_region(name, screenshot_size, geometry)
+            for name in names
+        }
+
+    results = detector._match_templates_in_frame(
+        screenshot, names, regions, request['offset'], request['is_clipped'], threshold, canvas_size
+    )
+    if request['full_frame_fallback'] and not request['is_clipped']:
+        for name in names:
+            if (results[name] is None and regions.get(name) is not None
+                    and not detector.uses_luminance_detection(name)):
+                results[name] = detector.match_template(
+                    screenshot, detector.get_template_path(name), threshold, canvas_size=canvas_size
+                )
+    return results, time.perf_counter() - start_time
+
+
+class VisionWorkerPool:
+    """視覺處理程序池。
+
+    多個瀏覽器的監控執行緒只負責擷取畫面位元組，寫入共享記憶體後
+    交由工作程序解碼並比對模板，只回傳精簡的檢測結果，
+    避免大量瀏覽器同時解碼與比對時在主程序內爭用 GIL。
+    共享記憶體區塊在呼叫之間重複使用，不需每次配置。
+    """
+
+    def __init__(self, max_workers: int = 0, logger: Optional[logging.Logger] = None) -> None:
+        """初始化視覺處理程序池（需呼叫 start 才會啟動工作程序）。
+
+        參數:
+            max_workers: 工作程序數（0 表示 CPU 核心數）
+            logger: 日誌記錄器（可選）
+        """
+        self.logger = logger or LoggerFactory.get_logger()
+        self.max_workers = max_workers if max_workers > 0 else (os.cpu_count() or 1)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._buffers: List[shared_memory.SharedMemory] = []
+        self._lock = threading.Lock()
+        self._tasks: int = 0
+        self._failures: int = 0
+        self._bytes: int = 0
+        self._roundtrip_time: float = 0.0
+        self._compute_time: float = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        """工作程序是否已啟動。"""
+        return self._executor is not None
+
+    def start(self) -> None:
+        """啟動工作程序並預熱（工作程序套用主程序目前的用戶設定）。"""
+        if self._executor is not None:
+            return
+        settings = {
+            attr_name: getattr(Constants, attr_name)
+            for attr_name, _ in Constants.CONFIGURABLE_SETTINGS.values()
+        }
+        if os.name == 'posix':
+            # 先啟動資源追蹤程序，讓工作程序共用同一個，避免共享記憶體被重複清理
+            resource_tracker.ensure_running()
+        executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_vision_worker_init,
+            initargs=(settings,)
+        )
+        try:
+            # 預先啟動工作程序，避免第一輪檢測等待程序啟動
+            for future in [executor.submit(_vision_worker_ping) for _ in range(self.max_workers)]:
+                future.result(timeout=Constants.VISION_POOL_START_TIMEOUT)
+        except Exception:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        self._executor = executor
+        self.logger.info(f"視覺處理程序池已啟動（{self.max_workers} 個工作程序）")
+
+    def shutdown(self) -> None:
+        """停止工作程序並釋放共享記憶體。"""
+        executor = self._executor
+        if executor is None:
+            return
+        self._executor = None
+        executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            buffers = self._buffers
+            self._buffers = []
+        for buffer in buffers:
+            self._destroy_buffer(buffer)
+
+    def match(
+        self,
+        data: bytes,
+        request: Dict[str, Any],
+        timeout: float = Constants.VISION_POOL_TASK_TIMEOUT
+    ) -> Dict[str, Optional[Tuple[int, int, float]]]:
+        """將畫面位元組交由工作程序解碼並比對模板。
+
+        參數:
+            data: PNG / JPEG / WebP 畫面位元組
+            request: 比對參數（見 ImageDetector._detect_many_pooled）
+            timeout: 等待結果的逾時時間（秒）
+
+        回傳:
+            模板檔名 → 整窗截圖座標上的檢測結果
+
+        異常:
+            ImageDetectionError: 程序池未啟動、逾時或工作程序比對失敗
+        """
+        executor = self._executor
+        if executor is None:
+            raise ImageDetectionError("視覺處理程序池未啟動")
+
+        length = len(data)
+        buffer = self._acquire_buffer(length)
+        reusable = True
+        start_time = time.perf_counter()
+        try:
+            buffer.buf[:length] = data
+            future = executor.submit(_vision_worker_match, buffer.name, length, request)
+            try:
+                results, compute_time = future.result(timeout=timeout)
+            except Exception:
+                # 工作程序可能仍在讀取此區塊，不可重複使用
+                reusable = future.done()
+                raise
+        except Exception as e:
+            with self._lock:
+                self._failures += 1
+            raise ImageDetectionError(f"視覺處理程序比對失敗: {e}") from e
+        finally:
+            self._release_buffer(buffer, reusable)
+
+        with self._lock:
+            self._tasks += 1
+            self._bytes += length
+            self._roundtrip_time += time.perf_counter() - start_time
+            self._compute_time += compute_time
+        return results
+
+    def _acquire_buffer(self, size: int) -> shared_memory.SharedMemory:
+        """取得容量足夠的共享記憶體區塊（優先重複使用閒置區塊）。"""
+        with self._lock:
+            for i, buffer in enumerate(self._buffers):
+                if buffer.size >= size:
+                    return self._buffers.pop(i)
+        return shared_memory.SharedMemory(
+            create=True, size=max(size, Constants.VISION_POOL_MIN_BUFFER_SIZE)
+        )
+
+    def _release_buffer(self, buffer: shared_memory.SharedMemory, reusable: bool) -> None:
+        """歸還共享記憶體區塊（閒置區塊超過上限或不可重複使用時直接釋放）。"""
+        if reusable and self._executor is not None:
+            with self._lock:
+                if len(self._buffers) < self.max_workers * 2:
+                    self._buffers.append(buffer)
+                    return
+        self._destroy_buffer(buffer)
+
+    @staticmethod
+    def _destroy_buffer(buffer: shared_memory.SharedMemory) -> None:
+        """關閉並刪除共享記憶體區塊。"""
+        buffer.close()
+        with suppress(FileNotFoundError):
+            buffer.unlink()
+
+    def get_stats(self) -> Dict[str, float]:
+        """取得程序池統計。
+
+        回傳:
+            包含 tasks（完成次數）、failures（失敗次數）、mbytes（傳送的畫面資料量，MB）、
+            avg_roundtrip_ms（平均往返時間）、avg_compute_ms（工作程序內平均處理時間）
+            與 avg_overhead_ms（平均排隊與程序間傳輸時間）的字典
+        """
+        with self._lock:
+            tasks = self._tasks
+            roundtrip = self._roundtrip_time / tasks * 1000 if tasks else 0.0
+            compute = self._compute_time / tasks * 1000 if tasks else 0.0
+            return {
+                'tasks': tasks,
+                'failures': self._failures,
+                'mbytes': self._bytes / (1024 * 1024),
+                'avg_roundtrip_ms': roundtrip,
+                'avg_compute_ms': compute,
+                'avg_overhead_ms': roundtrip - compute,
+            }
+
+
 # =============================================================================
 # 瀏覽器管理器
 # =============================================================================
@@ -3277,12 +7707,325 @@ class BrowserManager:
                 index=index,
                 proxy_port=proxy_port
             )
-            yield context
-        finally:
-            if driver:
-                with suppress(Exception):
-                    driver.quit()
-                self.logger.debug(f"瀏覽器 #{index} 已關閉")
+            yield context
+        finally:
+            if driver:
+                with suppress(Exception):
+                    driver.quit()
+                self.logger.debug(f"瀏覽器 #{index} 已關閉")
+
+
+class StragglerPolicy(Enum):
+    """並行操作超過期限仍未完成的瀏覽器（落後者）的處理方式。
+
+    值:
+        PROCEED: 不再等待落後者，以其餘瀏覽器的結果繼續。
+        QUARANTINE: 不再等待落後者，並交由恢復流程重新載入遊戲。
+        ABORT: 中止整個操作（呼叫端視為失敗）。
+    """
+    PROCEED = "proceed"
+    QUARANTINE = "quarantine"
+    ABORT = "abort"
+
+    @classmethod
+    def parse(cls, value: str, default: 'StragglerPolicy') -> 'StragglerPolicy':
+        """由設定字串取得處理方式，無效時回傳預設值。"""
+        try:
+            return cls(value.strip().lower())
+        except ValueError:
+            return default
+
+
+@dataclass
+class FanoutResult:
+    """對多個瀏覽器並行操作的結果。
+
+    屬性:
+        results: 期限內完成的瀏覽器編號 → 結果（發生例外時為 False）。
+        stragglers: 超過期限仍未完成的瀏覽器編號。
+        aborted: 是否因落後者而中止（StragglerPolicy.ABORT）。
+        elapsed: 等待結果的時間（秒）。
+    """
+    results: Dict[int, Any] = field(default_factory=dict)
+    stragglers: List[int] = field(default_factory=list)
+    aborted: bool = False
+    elapsed: float = 0.0
+
+    @property
+    def success_count(self) -> int:
+        """期限內成功的瀏覽器數。"""
+        return sum(1 for value in self.results.values() if value)
+
+    @property
+    def completed_all_succeeded(self) -> bool:
+        """期限內完成的瀏覽器是否全部成功（不含落後者）。"""
+        return all(self.results.values())
+
+
+class FanoutExecutor:
+    """控制面板並行操作的常駐執行緒池。
+
+    錯誤監控每輪檢測、各指令對所有瀏覽器的操作與調整金額共用同一個執行緒池，
+    不必每次建立並關閉 ThreadPoolExecutor。執行緒數依瀏覽器數量決定
+    （每個瀏覽器 FANOUT_WORKERS_PER_BROWSER 個，需要時才建立），瀏覽器數量
+    變化時以 resize 換成新的執行緒池，舊執行緒池完成已提交的任務後自行結束。
+    依操作名稱統計排隊時間與執行時間，並記錄目前與最高排隊數；
+    以 submit_for_browser 提交的任務另外依瀏覽器統計，用於找出長期偏慢的瀏覽器。
+
+    範例:
+        >>> fanout = FanoutExecutor(len(browser_threads))
+        >>> futures = {fanout.submit("調整金額", adjust, bt): bt for bt in browsers}
+        >>> fanout.get_stats()['operations']['調整金額']['avg_run_ms']
+        >>> fanout.shutdown()
+    """
+
+    def __init__(
+        self,
+        browser_count: int,
+        name: str = "Fanout",
+        logger: Optional[logging.Logger] = None
+    ) -> None:
+        """初始化執行緒池。
+
+        參數:
+            browser_count: 瀏覽器數量
+            name: 執行緒名稱前綴
+            logger: 日誌記錄器（可選）
+        """
+        self.name = name
+        self.logger = logger or LoggerFactory.get_logger()
+        self._lock = threading.Lock()
+        self._workers = self._workers_for(browser_count)
+        self._executor: Optional[ThreadPoolExecutor] = ThreadPoolExecutor(
+            max_workers=self._workers, thread_name_prefix=name
+        )
+        self._generation: int = 0
+        self._queued: int = 0
+        self._peak_queued: int = 0
+        self._operations: Dict[str, Dict[str, float]] = {}
+        self._browser_operations: Dict[Tuple[str, int], Dict[str, float]] = {}
+
+    @staticmethod
+    def _workers_for(browser_count: int) -> int:
+        """依瀏覽器數量計算執行緒數。"""
+        return max(1, browser_count) * Constants.FANOUT_WORKERS_PER_BROWSER
+
+    @property
+    def workers(self) -> int:
+        """目前的最大執行緒數。"""
+        return self._workers
+
+    def resize(self, browser_count: int) -> bool:
+        """依新的瀏覽器數量調整執行緒數。
+
+        參數:
+            browser_count: 瀏覽器數量
+
+        回傳:
+            是否換成新的執行緒池（執行緒數不變或已關閉時為 False）
+        """
+        workers = self._workers_for(browser_count)
+        with self._lock:
+            if self._executor is None or workers == self._workers:
+                return False
+            old_executor = self._executor
+            self._generation += 1
+            self._executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix=f"{self.name}{self._generation}"
+            )
+            self.logger.debug(f"並行操作執行緒池 {self._workers} → {workers} 個執行緒")
+            self._workers = workers
+        old_executor.shutdown(wait=False)
+        return True
+
+    def submit(self, operation: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """提交任務。
+
+        參數:
+            operation: 操作名稱（統計用）
+            fn: 要執行的函數
+            *args: 位置參數
+            **kwargs: 關鍵字參數
+
+        回傳:
+            任務的 Future
+
+        異常:
+            RuntimeError: 執行緒池已關閉時
+        """
+        return self.submit_for_browser(operation, None, fn, *args, **kwargs)
+
+    def submit_for_browser(
+        self,
+        operation: str,
+        browser_index: Optional[int],
+        fn: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any
+    ) -> Future:
+        """提交針對單一瀏覽器的任務（另外依瀏覽器統計執行時間）。
+
+        參數:
+            operation: 操作名稱（統計用）
+            browser_index: 瀏覽器編號（None 表示不依瀏覽器統計）
+            fn: 要執行的函數
+            *args: 位置參數
+            **kwargs: 關鍵字參數
+
+        回傳:
+            任務的 Future
+
+        異常:
+            RuntimeError: 執行緒池已關閉時
+        """
+        submitted_at = time.monotonic()
+
+        def run() -> Any:
+            started_at = time.monotonic()
+            with self._lock:
+                self._queued -= 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._record(operation, browser_index, started_at - submitted_at, time.monotonic() - started_at)
+
+        with self._lock:
+            if self._executor is None:
+                raise RuntimeError("並行操作執行緒池已關閉")
+            self._queued += 1
+            self._peak_queued = max(self._peak_queued, self._queued)
+            try:
+                return self._executor.submit(run)
+            except RuntimeError:
+                self._queued -= 1
+                raise
+
+    def _record(self, operation: str, browser_index: Optional[int], wait: float, run: float) -> None:
+        """累計單一操作的排隊與執行時間。"""
+        with self._lock:
+            stats = self._operations.setdefault(operation, {
+                'count': 0, 'wait_total': 0.0, 'wait_max': 0.0, 'run_total': 0.0, 'run_max': 0.0,
+            })
+            stats['count'] += 1
+            stats['wait_total'] += wait
+            stats['wait_max'] = max(stats['wait_max'], wait)
+            stats['run_total'] += run
+            stats['run_max'] = max(stats['run_max'], run)
+            if browser_index is not None:
+                browser_stats = self._browser_stats(operation, browser_index)
+                browser_stats['count'] += 1
+                browser_stats['run_total'] += run
+                browser_stats['run_max'] = max(browser_stats['run_max'], run)
+
+    def _browser_stats(self, operation: str, browser_index: int) -> Dict[str, float]:
+        """取得（或建立）單一瀏覽器的操作統計（呼叫端需持有鎖）。"""
+        return self._browser_operations.setdefault((operation, browser_index), {
+            'count': 0, 'run_total': 0.0, 'run_max': 0.0, 'stragglers': 0,
+        })
+
+    def record_stragglers(self, operation: str, browser_indices: List[int]) -> None:
+        """記錄超過期限未完成的瀏覽器。
+
+        參數:
+            operation: 操作名稱
+            browser_indices: 落後的瀏覽器編號
+        """
+        with self._lock:
+            for browser_index in browser_indices:
+                self._browser_stats(operation, browser_index)['stragglers'] += 1
+
+    def slow_browsers(self, operation: str) -> List[int]:
+        """找出該操作長期偏慢的瀏覽器。
+
+        平均執行時間超過所有瀏覽器平均值中位數的 FANOUT_SLOW_BROWSER_FACTOR 倍，
+        或曾經超過期限的瀏覽器（需至少 FANOUT_SLOW_BROWSER_MIN_SAMPLES 次紀錄）。
+
+        參數:
+            operation: 操作名稱
+
+        回傳:
+            瀏覽器編號列表
+        """
+        with self._lock:
+            samples = {
+                index: stats for (name, index), stats in self._browser_operations.items()
+                if name == operation and stats['count'] + stats['stragglers'] >= Constants.FANOUT_SLOW_BROWSER_MIN_SAMPLES
+            }
+        averages = {index: stats['run_total'] / stats['count'] for index, stats in samples.items() if stats['count']}
+        median = float(np.median(list(averages.values()))) if averages else 0.0
+        return sorted(
+            index for index, stats in samples.items()
+            if stats['stragglers'] > 0
+            or (len(averages) > 1 and median > 0 and averages.get(index, 0.0) > median * Constants.FANOUT_SLOW_BROWSER_FACTOR)
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得執行緒池統計。
+
+        回傳:
+            包含 workers（最大執行緒數）、queued（目前排隊數）、peak_queued（最高排隊數）、
+            operations（操作名稱 → count、avg_wait_ms、max_wait_ms、avg_run_ms、max_run_ms）
+            與 browsers（操作名稱 → 瀏覽器編號 → count、avg_run_ms、max_run_ms、stragglers）的字典
+        """
+        with self._lock:
+            operations = {
+                name: {
+                    'count': stats['count'],
+                    'avg_wait_ms': stats['wait_total'] / stats['count'] * 1000,
+                    'max_wait_ms': stats['wait_max'] * 1000,
+                    'avg_run_ms': stats['run_total'] / stats['count'] * 1000,
+                    'max_run_ms': stats['run_max'] * 1000,
+                }
+                for name, stats in self._operations.items() if stats['count']
+            }
+            browsers: Dict[str, Dict[int, Dict[str, float]]] = {}
+            for (name, index), stats in sorted(self._browser_operations.items()):
+                browsers.setdefault(name, {})[index] = {
+                    'count': stats['count'],
+                    'avg_run_ms': stats['run_total'] / stats['count'] * 1000 if stats['count'] else 0.0,
+                    'max_run_ms': stats['run_max'] * 1000,
+                    'stragglers': stats['stragglers'],
+                }
+            return {
+                'workers': self._workers,
+                'queued': self._queued,
+                'peak_queued': self._peak_queued,
+                'operations': operations,
+                'browsers': browsers,
+            }
+
+    def log_stats(self) -> None:
+        """以 debug 等級輸出各操作的延遲與排隊統計。"""
+        stats = self.get_stats()
+        self.logger.debug(
+            f"並行操作執行緒池: {stats['workers']} 個執行緒，"
+            f"目前排隊 {stats['queued']}，最高排隊 {stats['peak_queued']}"
+        )
+        for name, op in stats['operations'].items():
+            self.logger.debug(
+                f"  {name}: {op['count']} 次，排隊 平均 {op['avg_wait_ms']:.1f} ms / 最長 {op['max_wait_ms']:.1f} ms，"
+                f"執行 平均 {op['avg_run_ms']:.1f} ms / 最長 {op['max_run_ms']:.1f} ms"
+            )
+        for name, browsers in stats['browsers'].items():
+            slow = self.slow_browsers(name)
+            if slow:
+                details = ", ".join(
+                    f"{index}（平均 {browsers[index]['avg_run_ms']:.0f} ms，逾時 {browsers[index]['stragglers']} 次）"
+                    for index in slow
+                )
+                self.logger.warning(f"{name} 長期偏慢的瀏覽器: {details}")
+
+    def shutdown(self, wait: bool = False) -> None:
+        """關閉執行緒池（已提交的任務仍會執行完畢）。
+
+        參數:
+            wait: 是否等待已提交的任務完成
+        """
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=wait)
 
 
 # =============================================================================
@@ -3318,7 +8061,8 @@ class GameControlCenter:
         browser_threads: List['BrowserThread'],
         bet_rules: List[BetRule],
         canvas_rect: Optional[Dict[str, float]] = None,
-        logger: Optional[logging.Logger] = None
+        logger: Optional[logging.Logger] = None,
+        network_rules: Optional[List[NetworkStateRule]] = None
     ) -> None:
         """初始化控制面板。
 
@@ -3327,6 +8071,7 @@ class GameControlCenter:
             bet_rules: 下注規則列表。
             canvas_rect: Canvas 區域資訊（可選）。
             logger: 日誌記錄器（可選）。
+            network_rules: 網路狀態規則列表（可選，NETWORK_SENSOR_MODE 為 on 時使用）。
         """
         self.logger = logger or LoggerFactory.get_logger()
         self.browser_threads = browser_threads
@@ -3354,6 +8099,14 @@ class GameControlCenter:
 
         # 圖片檢測器
         self._image_detector = ImageDetector(self.logger)
+        # 並行操作執行緒池（錯誤監控、指令與金額調整共用）
+        self._fanout = FanoutExecutor(len(browser_threads), name="Fanout", logger=self.logger)
+        # 金額調整時被略過、金額尚未確認的瀏覽器索引（下次調整確認金額前不參與旋轉）
+        self._betsize_unconfirmed: FrozenSet[int] = frozenset()
+        # 視覺處理程序池（VISION_POOL_MODE 為 process 時隨錯誤監控啟動）
+        self._vision_pool: Optional[VisionWorkerPool] = None
+        # 網路狀態分類器（NETWORK_SENSOR_MODE 為 on 時隨錯誤監控啟動各瀏覽器的感測）
+        self._network_classifier = NetworkStateClassifier(network_rules or [])
 
         # 自動按鍵間隔時間
         self.min_interval: float = 1.0
@@ -3381,16 +8134,101 @@ class GameControlCenter:
     # 通用輔助方法
     # -------------------------------------------------------------------------
 
+    def _fan_out(
+        self,
+        browsers: List['BrowserThread'],
+        task_func: Callable[['BrowserThread'], Any],
+        operation_name: str,
+        deadline: Optional[float],
+        policy: StragglerPolicy,
+        cancel_events: Optional[Dict[int, threading.Event]] = None
+    ) -> FanoutResult:
+        """對指定瀏覽器並行執行任務，並在期限到時處理落後的瀏覽器。
+        
+        以 as_completed 依完成順序收集結果，單一瀏覽器卡住不會拖住其他瀏覽器的結果；
+        期限到時設定落後者的取消事件（任務需自行檢查並結束），再依 policy 處理。
+        QUARANTINE 在落後者的任務結束後才啟動恢復流程，恢復時不會有任務仍在操作同一瀏覽器。
+        各瀏覽器的耗時記錄於 FanoutExecutor。
+        
+        參數:
+            browsers: 目標瀏覽器列表
+            task_func: 任務函數，接收 BrowserThread 作為參數
+            operation_name: 操作名稱（日誌與統計用）
+            deadline: 等待期限（秒），None 表示無限等待
+            policy: 落後者處理方式
+            cancel_events: 瀏覽器索引 → 該瀏覽器任務的取消事件（可選）
+            
+        回傳:
+            FanoutResult（期限內的結果、落後者列表與是否中止）
+        """
+        started_at = time.monotonic()
+        outcome = FanoutResult()
+        futures = {
+            self._fanout.submit_for_browser(operation_name, bt.index, task_func, bt): bt
+            for bt in browsers
+        }
+        
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                bt = futures[future]
+                try:
+                    outcome.results[bt.index] = future.result()
+                except Exception as e:
+                    bt.report_command_error(e)
+                    username = bt.context.credential.username if bt.context else "Unknown"
+                    self.logger.error(f"瀏覽器 {bt.index} ({username}) {operation_name}失敗: {e}")
+                    outcome.results[bt.index] = False
+        except FuturesTimeoutError:
+            pass
+        
+        outcome.elapsed = time.monotonic() - started_at
+        stragglers = {future: bt for future, bt in futures.items() if bt.index not in outcome.results}
+        if not stragglers:
+            return outcome
+        
+        # 取消落後者的任務（尚未開始的直接取消，執行中的由任務檢查取消事件後結束）
+        for future, bt in stragglers.items():
+            if cancel_events is not None and bt.index in cancel_events:
+                cancel_events[bt.index].set()
+            future.cancel()
+        
+        outcome.stragglers = sorted(bt.index for bt in stragglers.values())
+        self._fanout.record_stragglers(operation_name, outcome.stragglers)
+        straggler_list = ", ".join(str(index) for index in outcome.stragglers)
+        
+        if policy is StragglerPolicy.ABORT:
+            outcome.aborted = True
+            self.logger.error(
+                f"{operation_name}超過 {deadline:g} 秒仍未完成 (瀏覽器 {straggler_list})，中止操作"
+            )
+        elif policy is StragglerPolicy.QUARANTINE:
+            self.logger.warning(
+                f"{operation_name}超過 {deadline:g} 秒仍未完成 (瀏覽器 {straggler_list})，"
+                f"任務結束後交由恢復流程處理"
+            )
+            for future, bt in stragglers.items():
+                # 任務結束時（或已結束時立即）才啟動恢復，避免與仍在執行的任務同時操作
+                future.add_done_callback(
+                    lambda _, bt=bt: self._start_recovery_thread(bt, "blackscreen")
+                )
+        else:
+            self.logger.warning(
+                f"{operation_name}超過 {deadline:g} 秒仍未完成 (瀏覽器 {straggler_list})，不再等待"
+            )
+        
+        return outcome
+
     def _execute_on_active_browsers(
         self,
         task_func: Callable[['BrowserContext'], Any],
         operation_name: str = "操作",
         show_result: bool = True
-    ) -> Dict[int, Any]:
-        """對所有活躍瀏覽器並行執行任務（DRY 統一方法）。
+    ) -> FanoutResult:
+        """對所有活躍瀏覽器並行執行旋轉相關任務（DRY 統一方法）。
         
-        此方法封裝了重複的 ThreadPoolExecutor 並行執行模式，
-        統一處理瀏覽器過濾、結果收集和日誌輸出。
+        此方法封裝了重複的並行執行模式（使用共用的 FanoutExecutor 與 _fan_out），
+        統一處理瀏覽器過濾、結果收集和日誌輸出（等待所有瀏覽器完成）。
+        金額尚未確認的瀏覽器不參與（見 _get_spin_browsers）。
         
         參數:
             task_func: 任務函數，接收 BrowserContext 作為參數
@@ -3398,37 +8236,25 @@ class GameControlCenter:
             show_result: 是否顯示執行結果統計
             
         回傳:
-            字典，key 為瀏覽器索引，value 為執行結果（True/False 或具體值）
+            FanoutResult，results 的 key 為瀏覽器索引，value 為執行結果（True/False 或具體值）
         """
-        active_browsers = [
-            bt for bt in self._get_active_browsers()
-            if bt.is_browser_alive() and bt.context
-        ]
+        active_browsers = self._get_spin_browsers()
         
         if not active_browsers:
             self.logger.warning(f"沒有可用的瀏覽器執行{operation_name}")
-            return {}
-        
-        results: Dict[int, Any] = {}
-        
-        with ThreadPoolExecutor(max_workers=len(active_browsers)) as executor:
-            futures = {
-                executor.submit(task_func, bt.context): bt
-                for bt in active_browsers
-            }
-            
-            for future in futures:
-                bt = futures[future]
-                try:
-                    results[bt.index] = future.result()
-                except Exception as e:
-                    username = bt.context.credential.username if bt.context else "Unknown"
-                    self.logger.error(f"瀏覽器 {bt.index} ({username}) {operation_name}失敗: {e}")
-                    results[bt.index] = False
+            return FanoutResult()
+        
+        outcome = self._fan_out(
+            active_browsers,
+            lambda bt: task_func(bt.context),
+            operation_name,
+            None,
+            StragglerPolicy.PROCEED
+        )
         
         # 顯示結果統計
         if show_result:
-            success_count = sum(1 for v in results.values() if v)
+            success_count = outcome.success_count
             total = len(active_browsers)
             
             if success_count == total:
@@ -3436,7 +8262,7 @@ class GameControlCenter:
             else:
                 self.logger.warning(f"{operation_name}部分完成: {success_count}/{total} 個瀏覽器成功")
         
-        return results
+        return outcome
 
     def _get_active_browsers(self) -> List['BrowserThread']:
         """取得所有活躍的瀏覽器執行緒。
@@ -3446,6 +8272,24 @@ class GameControlCenter:
         """
         return [bt for bt in self.browser_threads if bt.is_browser_alive()]
 
+    def _get_spin_browsers(self) -> List['BrowserThread']:
+        """取得可執行旋轉操作（自動旋轉、自動按鍵、購買免費遊戲）的瀏覽器。
+
+        金額調整時被略過的瀏覽器（見 _adjust_all_browsers_betsize）金額未知，
+        下次調整確認金額前不參與旋轉；錯誤監控與恢復流程不受影響。
+
+        回傳:
+            活躍且金額已確認的瀏覽器執行緒列表。
+        """
+        unconfirmed = self._betsize_unconfirmed
+        browsers = [bt for bt in self._get_active_browsers() if bt.context]
+        skipped = [bt.index for bt in browsers if bt.index in unconfirmed]
+        if skipped:
+            self.logger.warning(
+                f"瀏覽器 {', '.join(str(index) for index in skipped)} 的金額尚未確認，暫不參與旋轉"
+            )
+        return [bt for bt in browsers if bt.index not in unconfirmed]
+
     def _parse_browser_indices(
         self,
         arguments: str,
@@ -3466,10 +8310,7 @@ class GameControlCenter:
             匹配的瀏覽器列表，解析失敗返回 None。
         """
         if all_browsers is None:
-            all_browsers = [
-                bt for bt in self._get_active_browsers()
-                if bt.is_browser_alive() and bt.context
-            ]
+            all_browsers = [bt for bt in self._get_active_browsers() if bt.context]
 
         target_browsers: List['BrowserThread'] = []
 
@@ -3515,6 +8356,8 @@ class GameControlCenter:
         - 返回大廳（LOBBY_RETURN）: 檢測到 1 次 → 點擊返回大廳 → 重新進入遊戲
         
         檢測流程同步並行，恢復操作在獨立執行緒中非同步執行（不阻塞監控）。
+        NETWORK_SENSOR_MODE 為 on 時，各瀏覽器的網路狀態感測正常期間，
+        已有網路規則的狀態改由 _on_network_state 處理，截圖只比對其餘模板。
         注意：自動跳過點擊已移至獨立執行緒 _auto_skip_click_loop，不受此循環影響。
         """
         self.logger.info("錯誤訊息、黑屏與返回大廳監控已啟動")
@@ -3523,7 +8366,7 @@ class GameControlCenter:
         blackscreen_counts: Dict[int, int] = {}
         
         # 檢查模板是否存在
-        blackscreen_template_exists = self._image_detector.template_exists(Constants.BLACK_SCREEN)
+        blackscreen_template_exists = self._image_detector.can_detect(Constants.BLACK_SCREEN)
         error_template_exists = self._image_detector.template_exists(Constants.ERROR_REMIND)
         lobby_return_template_exists = self._image_detector.template_exists(Constants.LOBBY_RETURN)
         
@@ -3552,8 +8395,24 @@ class GameControlCenter:
                     self._error_monitor_stop_event.wait(timeout=Constants.ERROR_MONITOR_INTERVAL)
                     continue
                 
+                # 畫面串流中斷時重新啟動（失敗的瀏覽器改用截圖）
+                if Constants.SCREENCAST_MODE == "on":
+                    for bt in active_browsers:
+                        bt.start_screencast()
+                
+                # 網路狀態感測中斷時重新啟動（狀態事件由 _on_network_state 處理）
+                network_sensor_enabled = (
+                    Constants.NETWORK_SENSOR_MODE == "on" and bool(self._network_classifier.rules)
+                )
+                if network_sensor_enabled:
+                    for bt in active_browsers:
+                        bt.start_network_sensor(
+                            self._network_classifier,
+                            lambda event, bt=bt: self._on_network_state(bt, event)
+                        )
+                
                 # 每次循環更新模板存在狀態（支援動態建立模板）
-                blackscreen_template_exists = self._image_detector.template_exists(Constants.BLACK_SCREEN)
+                blackscreen_template_exists = self._image_detector.can_detect(Constants.BLACK_SCREEN)
                 error_template_exists = self._image_detector.template_exists(Constants.ERROR_REMIND)
                 lobby_return_template_exists = self._image_detector.template_exists(Constants.LOBBY_RETURN)
                 
@@ -3574,48 +8433,46 @@ class GameControlCenter:
                     """
                     if not bt.is_browser_alive() or not bt.context:
                         return (bt.index, False, False, False)
+                    # 網路狀態感測正常時，已有網路規則的狀態不再截圖比對
+                    template_names = [Constants.BLACK_SCREEN, Constants.ERROR_REMIND, Constants.LOBBY_RETURN]
+                    sensor = bt.network_sensor
+                    if network_sensor_enabled and sensor is not None and sensor.is_healthy:
+                        covered_templates = {
+                            Constants.NETWORK_STATE_TEMPLATES[state]
+                            for state in self._network_classifier.covered_states
+                            if state in Constants.NETWORK_STATE_TEMPLATES
+                        }
+                        template_names = [name for name in template_names if name not in covered_templates]
+                        if not template_names:
+                            return (bt.index, False, False, False)
                     try:
-                        driver = bt.context.driver
-                        is_blackscreen = False
-                        is_error = False
-                        is_lobby_return = False
-                        
-                        # 檢測黑屏
-                        if blackscreen_template_exists:
-                            result = self._image_detector.detect_in_browser(
-                                driver, Constants.BLACK_SCREEN
-                            )
-                            is_blackscreen = result is not None
-                        
-                        # 檢測錯誤訊息
-                        if error_template_exists:
-                            result = self._image_detector.detect_in_browser(
-                                driver, Constants.ERROR_REMIND
-                            )
-                            is_error = result is not None
-                        
-                        # 檢測返回大廳
-                        if lobby_return_template_exists:
-                            result = self._image_detector.detect_in_browser(
-                                driver, Constants.LOBBY_RETURN
-                            )
-                            is_lobby_return = result is not None
+                        # 單次截圖同時比對三個模板（不存在的模板自動略過）
+                        results = self._image_detector.detect_many_in_browser(
+                            bt.context.driver,
+                            template_names,
+                            capture_format=Constants.MONITOR_CAPTURE_FORMAT,
+                            frame_provider=bt.frame_provider,
+                            gate_key="monitor",
+                            vision_pool=self._vision_pool
+                        )
+                        is_blackscreen = results.get(Constants.BLACK_SCREEN) is not None
+                        is_error = results.get(Constants.ERROR_REMIND) is not None
+                        is_lobby_return = results.get(Constants.LOBBY_RETURN) is not None
                         
                         return (bt.index, is_blackscreen, is_error, is_lobby_return)
                     except Exception:
                         return (bt.index, False, False, False)
                 
-                # 並行檢測所有瀏覽器
-                with ThreadPoolExecutor(max_workers=len(active_browsers)) as executor:
-                    futures = [executor.submit(detect_for_browser, bt) for bt in active_browsers]
-                    for future in futures:
-                        try:
-                            browser_index, is_blackscreen, is_error, is_lobby_return = future.result(timeout=10)
-                            blackscreen_detected[browser_index] = is_blackscreen
-                            error_detected[browser_index] = is_error
-                            lobby_return_detected[browser_index] = is_lobby_return
-                        except Exception:
-                            pass
+                # 並行檢測所有瀏覽器（共用執行緒池，不再每輪建立）
+                futures = [self._fanout.submit("錯誤監控", detect_for_browser, bt) for bt in active_browsers]
+                for future in futures:
+                    try:
+                        browser_index, is_blackscreen, is_error, is_lobby_return = future.result(timeout=10)
+                        blackscreen_detected[browser_index] = is_blackscreen
+                        error_detected[browser_index] = is_error
+                        lobby_return_detected[browser_index] = is_lobby_return
+                    except Exception:
+                        pass
                 
                 # ===== 處理檢測結果，啟動非同步恢復執行緒 =====
                 for bt in active_browsers:
@@ -3669,13 +8526,68 @@ class GameControlCenter:
                 self.logger.error(f"監控循環發生錯誤: {e}")
                 self._error_monitor_stop_event.wait(timeout=Constants.ERROR_MONITOR_INTERVAL)
         
+        cache_stats = self._image_detector.get_template_cache_stats()
+        self.logger.debug(
+            f"模板快取統計: 命中 {cache_stats['hits']} 次，"
+            f"讀取 {cache_stats['misses']} 次，"
+            f"依 Canvas 尺寸縮放 {cache_stats['scaled']} 個"
+        )
+        gate_stats = self._image_detector.get_frame_gate_stats()
+        self.logger.debug(
+            f"畫面變化閘門統計: 檢查 {gate_stats['checks']} 次，"
+            f"沿用結果 {gate_stats['skipped']} 次（{gate_stats['skip_ratio']:.0%}）"
+        )
+        budget_stats = self._image_detector.compute_budget.get_stats()
+        self.logger.debug(
+            f"影像運算資源統計: 上限 {budget_stats['slots']}（OpenCV 執行緒 {budget_stats['opencv_threads']}），"
+            f"運算 {budget_stats['acquisitions']} 次，平均等待 {budget_stats['avg_wait_ms']:.1f} ms"
+            f"（最長 {budget_stats['max_wait_ms']:.1f} ms），平均運算 {budget_stats['avg_compute_ms']:.1f} ms，"
+            f"等待佔比 {budget_stats['wait_ratio']:.0%}，最高同時運算 {budget_stats['peak_active']}"
+        )
+        for bt in self.browser_threads:
+            frame_stats = bt.frame_provider.get_stats()
+            self.logger.debug(
+                f"瀏覽器 {bt.index} 共用畫面統計: 擷取 {frame_stats['captures']} 次，"
+                f"共用 {frame_stats['hits'] + frame_stats['coalesced']} 次"
+                f"（合併等待 {frame_stats['coalesced']} 次），"
+                f"使用串流畫面 {frame_stats['screencast_hits']} 次"
+            )
         self.logger.info("錯誤訊息、黑屏與返回大廳監控已停止")
     
+    def _on_network_state(self, bt: 'BrowserThread', event: NetworkStateEvent) -> None:
+        """處理網路狀態感測判定的狀態（在 CDP 事件接收執行緒中呼叫）。
+        
+        錯誤、斷線與返回大廳依 NETWORK_STATE_RECOVERY 啟動對應的恢復執行緒，
+        與截圖檢測結果使用相同的恢復流程；spin_done 只記錄。
+        
+        參數:
+            bt: 發生狀態的 BrowserThread 實例
+            event: 網路狀態事件
+        """
+        username = bt.context.credential.username if bt.context else "Unknown"
+        recovery_type = Constants.NETWORK_STATE_RECOVERY.get(event.state)
+        if recovery_type is None:
+            self.logger.debug(f"瀏覽器 {bt.index} ({username}) 網路狀態: {event.state}")
+            return
+        if self._error_monitor_stop_event.is_set():
+            return
+        with self._recovering_lock:
+            if bt.index in self._recovering_browsers:
+                return
+        
+        self.logger.warning(
+            f"瀏覽器 {bt.index} ({username}) 網路訊息判定為 {event.state}"
+            f"（{event.source}: {event.excerpt}），啟動恢復流程..."
+        )
+        self._start_recovery_thread(bt, recovery_type)
+    
     def _start_recovery_thread(self, bt: 'BrowserThread', recovery_type: str) -> None:
         """啟動非同步恢復執行緒。
         
         每次觸發恢復時累計計數，當某個瀏覽器的恢復次數超過
         MAX_RECOVERY_ATTEMPTS 時，自動關閉該瀏覽器。
+        可能同時由監控循環、網路狀態感測（CDP 事件執行緒）與並行操作的回呼呼叫，
+        恢復中檢查、計數與標記在 _recovering_lock 內一次完成。
         
         參數:
             bt: 需要恢復的 BrowserThread 實例
@@ -3684,9 +8596,14 @@ class GameControlCenter:
         browser_index = bt.index
         username = bt.context.credential.username if bt.context else "Unknown"
         
-        # 累計恢復次數並檢查是否超過上限
-        current_count = self._recovery_counts.get(browser_index, 0) + 1
-        self._recovery_counts[browser_index] = current_count
+        # 已在恢復中時跳過；否則累計恢復次數並標記為恢復中（超過上限時標記為關閉中）
+        with self._recovering_lock:
+            if browser_index in self._recovering_browsers:
+                self.logger.debug(f"瀏覽器 {browser_index} 已在恢復中，跳過")
+                return
+            current_count = self._recovery_counts.get(browser_index, 0) + 1
+            self._recovery_counts[browser_index] = current_count
+            self._recovering_browsers.add(browser_index)
         
         if current_count > Constants.MAX_RECOVERY_ATTEMPTS:
             self.logger.warning(
@@ -3709,12 +8626,9 @@ class GameControlCenter:
             f"第 {current_count}/{Constants.MAX_RECOVERY_ATTEMPTS} 次恢復 ({recovery_type})"
         )
         
-        # 標記為恢復中
-        with self._recovering_lock:
-            if browser_index in self._recovering_browsers:
-                self.logger.debug(f"瀏覽器 {browser_index} 已在恢復中，跳過")
-                return
-            self._recovering_browsers.add(browser_index)
+        # 恢復流程可能重新載入遊戲，金額需重新確認
+        if bt.context:
+            self._image_detector.forget_betsize(bt.context.driver)
         
         def recovery_task() -> None:
             try:
@@ -3737,6 +8651,11 @@ class GameControlCenter:
         )
         thread.start()
 
+    def _reset_recovery_count(self, browser_index: int) -> None:
+        """恢復成功，重置該瀏覽器的恢復計數。"""
+        with self._recovering_lock:
+            self._recovery_counts[browser_index] = 0
+
     def _close_browser_for_recovery(self, bt: 'BrowserThread') -> None:
         """恢復次數超過上限時自動關閉瀏覽器（複用 q 命令邏輯）。
         
@@ -3771,11 +8690,9 @@ class GameControlCenter:
             bt.stop()
             self.logger.info(f"已自動關閉瀏覽器 {browser_index} ({username})（恢復次數超過上限）")
             
-            # 清理恢復計數
-            self._recovery_counts.pop(browser_index, None)
-            
             # 檢查剩餘瀏覽器
             remaining = len(self._get_active_browsers())
+            self._fanout.resize(remaining)
             if remaining == 0:
                 self.logger.info("所有瀏覽器已關閉，退出控制面板")
                 self.running = False
@@ -3784,6 +8701,11 @@ class GameControlCenter:
                 
         except Exception as e:
             self.logger.error(f"自動關閉瀏覽器 {browser_index} ({username}) 失敗: {e}")
+        finally:
+            # 清理恢復計數與關閉中標記
+            with self._recovering_lock:
+                self._recovery_counts.pop(browser_index, None)
+                self._recovering_browsers.discard(browser_index)
     
     def _handle_error_click_confirm(self, bt: 'BrowserThread') -> None:
         """處理錯誤訊息：點擊確認按鈕，並檢查是否回到大廳。
@@ -3848,7 +8770,7 @@ class GameControlCenter:
                             f"瀏覽器 {browser_index} ({username}) Canvas 仍存在，繼續監控"
                         )
                         # 恢復成功，重置該瀏覽器的恢復計數
-                        self._recovery_counts[browser_index] = 0
+                        self._reset_recovery_count(browser_index)
                         return  # 正常結束，繼續監控
                     else:
                         self.logger.warning(
@@ -3939,7 +8861,7 @@ class GameControlCenter:
             
             self.logger.info(f"瀏覽器 {browser_index} ({username}) 重新進入遊戲完成")
             # 恢復成功，重置該瀏覽器的恢復計數
-            self._recovery_counts[browser_index] = 0
+            self._reset_recovery_count(browser_index)
             
         except Exception as e:
             self.logger.error(f"瀏覽器 {browser_index} ({username}) 重新進入遊戲發生異常: {e}")
@@ -3983,7 +8905,7 @@ class GameControlCenter:
             
             self.logger.info(f"瀏覽器 {browser_index} ({username}) 黑屏恢復完成")
             # 恢復成功，重置該瀏覽器的恢復計數
-            self._recovery_counts[browser_index] = 0
+            self._reset_recovery_count(browser_index)
             
         except Exception as e:
             self.logger.error(f"瀏覽器 {browser_index} ({username}) 黑屏恢復發生異常: {e}")
@@ -4036,7 +8958,7 @@ class GameControlCenter:
             
             self.logger.info(f"瀏覽器 {browser_index} ({username}) 返回大廳恢復完成")
             # 恢復成功，重置該瀏覽器的恢復計數
-            self._recovery_counts[browser_index] = 0
+            self._reset_recovery_count(browser_index)
             
         except Exception as e:
             self.logger.error(f"瀏覽器 {browser_index} ({username}) 返回大廳恢復發生異常: {e}")
@@ -4208,25 +9130,21 @@ class GameControlCenter:
             attempt += 1
             
             try:
-                driver = bt.context.driver
-                
-                # 優先檢測 game_confirm（正常流程）
-                if game_confirm_exists:
-                    result = self._image_detector.detect_in_browser(
-                        driver, Constants.GAME_CONFIRM
-                    )
-                    if result is not None:
-                        detected_template = Constants.GAME_CONFIRM
-                        continue
+                # 單次截圖同時比對兩個模板
+                results = self._image_detector.detect_many_in_browser(
+                    bt.context.driver,
+                    [Constants.GAME_CONFIRM, Constants.ERROR_REMIND],
+                    capture_format=Constants.RECOVERY_CAPTURE_FORMAT,
+                    frame_provider=bt.frame_provider
+                )
                 
-                # 再檢測 error_remind
-                if error_remind_exists:
-                    result = self._image_detector.detect_in_browser(
-                        driver, Constants.ERROR_REMIND
-                    )
-                    if result is not None:
-                        detected_template = Constants.ERROR_REMIND
-                        continue
+                # 優先處理 game_confirm（正常流程），其次 error_remind
+                if results[Constants.GAME_CONFIRM] is not None:
+                    detected_template = Constants.GAME_CONFIRM
+                    continue
+                if results[Constants.ERROR_REMIND] is not None:
+                    detected_template = Constants.ERROR_REMIND
+                    continue
                 
             except Exception as e:
                 self.logger.debug(f"瀏覽器 {browser_index} 檢測時發生錯誤: {e}")
@@ -4290,6 +9208,9 @@ class GameControlCenter:
         browser_index = bt.index
         username = bt.context.credential.username if bt.context else "Unknown"
         attempt = 0
+        # 畫面沒有變化時逐步拉長檢測間隔
+        policy = AdaptiveWaitPolicy.for_site("recovery")
+        last_click_at = time.monotonic()
         
         while True:
             attempt += 1
@@ -4298,7 +9219,9 @@ class GameControlCenter:
                 # 直接操作 driver 檢測圖片是否仍存在
                 driver = bt.context.driver
                 result = self._image_detector.detect_in_browser(
-                    driver, template_name
+                    driver, template_name,
+                    capture_format=Constants.RECOVERY_CAPTURE_FORMAT,
+                    frame_provider=bt.frame_provider
                 )
                 still_present = result is not None
                 
@@ -4306,7 +9229,10 @@ class GameControlCenter:
                     self.logger.info(
                         f"瀏覽器 {browser_index} ({username}) {display_name} 已消失"
                     )
+                    self.logger.debug(f"瀏覽器 {browser_index} 等待 {display_name} 消失: {policy.summary()}")
                     return True
+                
+                policy.observe(self._image_detector.get_frame_version(driver))
                     
             except Exception as e:
                 self.logger.debug(
@@ -4320,8 +9246,11 @@ class GameControlCenter:
                     f"(已嘗試 {attempt} 次)"
                 )
             
-            # 每 20 次嘗試重新點擊一次按鈕（防止點擊未生效）
-            if attempt % 20 == 0:
+            # 每 RECOVERY_RECLICK_INTERVAL 秒重新點擊一次按鈕（防止點擊未生效）
+            if time.monotonic() - last_click_at >= Constants.RECOVERY_RECLICK_INTERVAL:
+                last_click_at = time.monotonic()
+                # 點擊後畫面預期會變化，回到最短間隔
+                policy.reset()
                 self.logger.info(
                     f"瀏覽器 {browser_index} {display_name} 仍存在，重新點擊..."
                 )
@@ -4341,7 +9270,7 @@ class GameControlCenter:
                         display_name
                     )
             
-            time.sleep(Constants.DETECTION_INTERVAL)
+            policy.wait()
 
     def _recovery_click_button(
         self,
@@ -4418,7 +9347,9 @@ class GameControlCenter:
                 # 直接操作 driver 檢測圖片
                 driver = bt.context.driver
                 result = self._image_detector.detect_in_browser(
-                    driver, template_name
+                    driver, template_name,
+                    capture_format=Constants.RECOVERY_CAPTURE_FORMAT,
+                    frame_provider=bt.frame_provider
                 )
                 
                 if result is not None:
@@ -4475,7 +9406,7 @@ class GameControlCenter:
         """自動跳過點擊循環（獨立執行緒）。
         
         持續運行直到收到停止信號。
-        每隔 AUTO_CLICK_INTERVAL 秒，直接對所有瀏覽器執行跳過/關閉點擊。
+        每隔 AUTO_CLICK_INTERVAL 秒，直接對所有瀏覽器同時執行跳過/關閉點擊。
         不經過 BrowserThread 任務佇列，不受監控循環或恢復操作影響。
         """
         self.logger.info(f"自動跳過點擊已啟動（每 {Constants.AUTO_CLICK_INTERVAL} 秒執行一次）")
@@ -4490,36 +9421,18 @@ class GameControlCenter:
                 
                 click_count += 1
                 
-                # 對所有瀏覽器執行點擊（不排除任何瀏覽器）
-                for bt in self.browser_threads:
-                    if self._auto_skip_stop_event.is_set():
-                        break
+                # 對所有瀏覽器同時執行點擊（不排除任何瀏覽器）
+                futures = {
+                    self._fanout.submit("自動跳過", self._auto_skip_click_browser, bt): bt
+                    for bt in self.browser_threads
+                    if bt.is_browser_alive() and bt.context
+                }
+                for future in as_completed(futures):
                     try:
-                        if not bt.is_browser_alive() or not bt.context:
-                            continue
-                        
-                        driver = bt.context.driver
-                        
-                        # 直接操作 driver，不走任務佇列
-                        rect = BrowserHelper.get_canvas_rect(driver)
-                        if not rect:
-                            continue
-                        
-                        # 點擊跳過按鈕座標
-                        BrowserHelper.click_canvas_position(
-                            driver, rect,
-                            Constants.AUTO_SKIP_CLICK_X_RATIO,
-                            Constants.AUTO_SKIP_CLICK_Y_RATIO
-                        )
-                        # 點擊自動關閉座標
-                        BrowserHelper.click_canvas_position(
-                            driver, rect,
-                            Constants.AUTO_CLOSE_CLICK_X_RATIO,
-                            Constants.AUTO_CLOSE_CLICK_Y_RATIO
-                        )
-                    except Exception:
+                        future.result()
+                    except Exception as e:
                         # 靜默處理錯誤，避免日誌過多
-                        pass
+                        futures[future].report_command_error(e)
                 
                 # 每 10 次顯示一次統計
                 if click_count % 10 == 0:
@@ -4531,6 +9444,22 @@ class GameControlCenter:
         
         self.logger.info(f"自動跳過點擊已停止（共執行 {click_count} 次）")
     
+    def _auto_skip_click_browser(self, bt: 'BrowserThread') -> None:
+        """對單一瀏覽器點擊跳過按鈕與自動關閉座標（兩次點擊一次送出）。"""
+        if self._auto_skip_stop_event.is_set():
+            return
+        driver = bt.context.driver
+        
+        # 直接操作 driver，不走任務佇列（Canvas 位置使用快取）
+        rect = self._image_detector.get_canvas_rect(driver)
+        if not rect:
+            return
+        
+        BrowserHelper.click_canvas_positions(driver, rect, [
+            (Constants.AUTO_SKIP_CLICK_X_RATIO, Constants.AUTO_SKIP_CLICK_Y_RATIO),
+            (Constants.AUTO_CLOSE_CLICK_X_RATIO, Constants.AUTO_CLOSE_CLICK_Y_RATIO),
+        ])
+    
     def _start_auto_skip_click(self) -> None:
         """啟動自動跳過點擊功能（獨立執行緒）。"""
         if self._auto_skip_running:
@@ -4570,6 +9499,21 @@ class GameControlCenter:
             return
         
         self._error_monitor_stop_event.clear()
+        self._start_vision_pool()
+        if Constants.SCREENCAST_MODE not in Constants.SCREENCAST_MODES:
+            self.logger.warning(f"不支援的畫面串流設定: {Constants.SCREENCAST_MODE}，改用截圖")
+        elif (Constants.SCREENCAST_MODE == "on" and self._image_detector._resolve_capture_format(
+                Constants.MONITOR_CAPTURE_FORMAT).is_lossless):
+            self.logger.warning(
+                "畫面串流已開啟但 MONITOR_CAPTURE_FORMAT 為無損格式，錯誤監控仍使用截圖"
+                "（串流畫面為有損 JPEG，請將 MONITOR_CAPTURE_FORMAT 設為 jpeg 或 webp）"
+            )
+        if Constants.NETWORK_SENSOR_MODE not in Constants.NETWORK_SENSOR_MODES:
+            self.logger.warning(f"不支援的網路狀態感測設定: {Constants.NETWORK_SENSOR_MODE}，改用截圖")
+        elif Constants.NETWORK_SENSOR_MODE == "on" and not self._network_classifier.rules:
+            self.logger.warning(
+                f"網路狀態感測已開啟但 {Constants.DEFAULT_NETWORK_RULES_FILE} 沒有有效規則，改用截圖"
+            )
         self._error_monitor_thread = threading.Thread(
             target=self._error_monitor_loop,
             daemon=True,
@@ -4593,6 +9537,49 @@ class GameControlCenter:
         
         self._error_monitor_thread = None
         self.error_monitor_running = False
+        self._stop_vision_pool()
+        for bt in self.browser_threads:
+            bt.stop_screencast()
+            sensor = bt.network_sensor
+            if sensor is not None:
+                sensor_stats = sensor.get_stats()
+                self.logger.debug(
+                    f"瀏覽器 {bt.index} 網路狀態感測統計: 訊息 {sensor_stats['messages']} 則"
+                    f"（遊戲 WebSocket {sensor_stats['game_frames']} 則），狀態事件 {sensor_stats['events']} 次"
+                )
+            bt.stop_network_sensor()
+    
+    def _start_vision_pool(self) -> None:
+        """依 VISION_POOL_MODE 啟動視覺處理程序池（啟動失敗時改由監控執行緒自行比對）。"""
+        if Constants.VISION_POOL_MODE not in Constants.VISION_POOL_MODES:
+            self.logger.warning(
+                f"不支援的視覺處理方式: {Constants.VISION_POOL_MODE}，改由監控執行緒自行比對"
+            )
+            return
+        if Constants.VISION_POOL_MODE != "process" or self._vision_pool is not None:
+            return
+        
+        vision_pool = VisionWorkerPool(Constants.VISION_POOL_WORKERS, self.logger)
+        try:
+            vision_pool.start()
+        except Exception as e:
+            self.logger.warning(f"視覺處理程序池啟動失敗，改由監控執行緒自行比對: {e}")
+            return
+        self._vision_pool = vision_pool
+    
+    def _stop_vision_pool(self) -> None:
+        """停止視覺處理程序池並記錄統計。"""
+        vision_pool = self._vision_pool
+        if vision_pool is None:
+            return
+        self._vision_pool = None
+        stats = vision_pool.get_stats()
+        self.logger.debug(
+            f"視覺處理程序池統計: 比對 {stats['tasks']} 次（失敗 {stats['failures']} 次），"
+            f"平均往返 {stats['avg_roundtrip_ms']:.1f} ms，"
+            f"工作程序處理 {stats['avg_compute_ms']:.1f} ms"
+        )
+        vision_pool.shutdown()
     
     def show_help(self) -> None:
         """顯示指令說明。"""
@@ -4686,6 +9673,7 @@ class GameControlCenter:
                     break
                     
             except Exception as e:
+                bt.report_command_error(e)
                 self.logger.error(f"瀏覽器 {browser_index} ({username}) 操作失敗: {e}")
                 self._stop_event.wait(timeout=1.0)
         
@@ -4706,18 +9694,18 @@ class GameControlCenter:
         self._stop_event.clear()
         self.auto_press_threads.clear()
         
-        # 取得活躍的瀏覽器
-        active_browsers = self._get_active_browsers()
+        # 取得活躍且金額已確認的瀏覽器
+        active_browsers = self._get_spin_browsers()
         
         # 為每個瀏覽器啟動獨立執行緒
-        for i, bt in enumerate(active_browsers, 1):
+        for bt in active_browsers:
             thread = threading.Thread(
                 target=self._auto_press_loop_single,
-                args=(bt, i),
+                args=(bt, bt.index),
                 daemon=True,
-                name=f"AutoPressThread-{i}"
+                name=f"AutoPressThread-{bt.index}"
             )
-            self.auto_press_threads[i] = thread
+            self.auto_press_threads[bt.index] = thread
             thread.start()
         
         self.auto_press_running = True
@@ -5168,6 +10156,8 @@ class GameControlCenter:
         """檢查停止信號並調整所有瀏覽器金額。
         
         流程：檢查停止 → 調整金額 → 再次檢查停止。
+        上次確認的金額已等於目標的瀏覽器略過截圖驗證；
+        期限內未完成而被略過的瀏覽器在規則的其餘步驟中不參與旋轉。
         
         參數:
             amount: 目標金額
@@ -5180,7 +10170,7 @@ class GameControlCenter:
             return False
         
         self.logger.info(f"[步驟 1/2] 調整金額到 {amount}...")
-        if not self._adjust_all_browsers_betsize(amount):
+        if not self._adjust_all_browsers_betsize(amount, trust_tracked=True):
             return False
         
         if self._stop_event.is_set() or self._check_time_limit():
@@ -5266,18 +10256,18 @@ class GameControlCenter:
         # 清除停止事件（確保自動按鍵可以運行）
         self._stop_event.clear()
         
-        # 取得活躍的瀏覽器
-        active_browsers = self._get_active_browsers()
+        # 取得活躍且金額已確認的瀏覽器
+        active_browsers = self._get_spin_browsers()
         
         # 為每個瀏覽器啟動自動按鍵執行緒
-        for i, bt in enumerate(active_browsers, 1):
+        for bt in active_browsers:
             thread = threading.Thread(
                 target=self._auto_press_loop_single,
-                args=(bt, i),
+                args=(bt, bt.index),
                 daemon=True,
-                name=f"RuleAutoPress-{i}"
+                name=f"RuleAutoPress-{bt.index}"
             )
-            self.auto_press_threads[i] = thread
+            self.auto_press_threads[bt.index] = thread
             thread.start()
         
         self.auto_press_running = True
@@ -5330,14 +10320,21 @@ class GameControlCenter:
         
         self.logger.info("免費遊戲進行中，自動跳過功能會處理結算畫面")
 
-    def _adjust_all_browsers_betsize(self, target_amount: float) -> bool:
+    def _adjust_all_browsers_betsize(self, target_amount: float, trust_tracked: bool = False) -> bool:
         """調整所有瀏覽器的下注金額。
         
+        等待 BETSIZE_ADJUST_DEADLINE 秒，仍無法完成的瀏覽器依
+        BETSIZE_ADJUST_STRAGGLER_POLICY 處理：abort 視為失敗；proceed / quarantine
+        不等待該瀏覽器（quarantine 另交由恢復流程重新載入），其餘瀏覽器全部成功即可繼續。
+        未確認金額的瀏覽器記錄於 _betsize_unconfirmed，下次調整確認金額前不參與旋轉
+        （見 _get_spin_browsers）；每次調整都包含這些瀏覽器，確認後即恢復參與。
+        
         參數:
             target_amount: 目標金額
+            trust_tracked: 是否信任上次確認的金額（相同時略過驗證，見 ImageDetector.adjust_betsize）
             
         回傳:
-            是否全部成功
+            是否全部成功（落後者依處理方式排除後）
         """
         # 提前驗證金額是否有效
         if target_amount not in Constants.GAME_BETSIZE:
@@ -5350,36 +10347,50 @@ class GameControlCenter:
             self.logger.error("沒有可用的瀏覽器")
             return False
         
-        # 使用 ThreadPoolExecutor 同步並行調整所有瀏覽器
-        results = {}
-        with ThreadPoolExecutor(max_workers=len(active_browsers)) as executor:
-            futures = {
-                executor.submit(
-                    self._image_detector.adjust_betsize,
-                    bt.context.driver,
-                    target_amount,
-                    self._stop_event  # 傳入停止事件
-                ): bt for bt in active_browsers
-            }
-            
-            for future in futures:
-                bt = futures[future]
-                try:
-                    results[bt.index] = future.result()
-                except Exception as e:
-                    self.logger.error(f"瀏覽器 {bt.index} 調整金額失敗: {e}")
-                    results[bt.index] = False
+        # 期限到時各瀏覽器的調整循環自行結束，不會在背景持續點擊
+        deadline = Constants.BETSIZE_ADJUST_DEADLINE if Constants.BETSIZE_ADJUST_DEADLINE > 0 else None
+        adjust_until = time.monotonic() + deadline if deadline is not None else None
+        policy = StragglerPolicy.parse(Constants.BETSIZE_ADJUST_STRAGGLER_POLICY, StragglerPolicy.ABORT)
+        
+        # 落後者的取消事件（期限到時由 _fan_out 設定，該瀏覽器的調整循環隨即結束）
+        cancel_events = {bt.index: threading.Event() for bt in active_browsers}
+        
+        def adjust_task(bt: 'BrowserThread') -> bool:
+            return self._image_detector.adjust_betsize(
+                bt.context.driver,
+                target_amount,
+                self._stop_event,  # 傳入停止事件
+                bt.frame_provider,
+                trust_tracked,
+                adjust_until,
+                cancel_events[bt.index]
+            )
+        
+        # 使用共用執行緒池同步並行調整所有瀏覽器
+        outcome = self._fan_out(
+            active_browsers, adjust_task, "調整金額", deadline, policy, cancel_events
+        )
+        confirmed = {index for index, success in outcome.results.items() if success}
+        self._betsize_unconfirmed = frozenset(
+            (self._betsize_unconfirmed | {bt.index for bt in active_browsers}) - confirmed
+        )
         
         # 統計結果
-        success_count = sum(1 for v in results.values() if v)
+        success_count = outcome.success_count
         total = len(active_browsers)
         
         if success_count == total:
             self.logger.info(f"金額調整完成: 全部 {success_count} 個瀏覽器成功")
             return True
-        else:
-            self.logger.error(f"金額調整失敗: 僅 {success_count}/{total} 個瀏覽器成功，必須全部成功才能繼續")
-            return False
+        if not outcome.aborted and outcome.completed_all_succeeded and success_count > 0:
+            self.logger.warning(
+                f"金額調整完成: {success_count}/{total} 個瀏覽器成功，"
+                f"未完成的瀏覽器 {', '.join(str(index) for index in outcome.stragglers)} "
+                f"在金額確認前不參與旋轉"
+            )
+            return True
+        self.logger.error(f"金額調整失敗: 僅 {success_count}/{total} 個瀏覽器成功，必須全部成功才能繼續")
+        return False
 
     def _execute_auto_spin_for_all(self, spin_count: int) -> None:
         """對所有瀏覽器執行自動旋轉設定。
@@ -5721,6 +10732,7 @@ class GameControlCenter:
         
         # 檢查是否還有瀏覽器在運行
         remaining = len(self._get_active_browsers())
+        self._fanout.resize(remaining)
         if remaining == 0:
             self.logger.info("所有瀏覽器已關閉，退出控制面板")
             return False
@@ -5853,22 +10865,21 @@ class GameControlCenter:
         # 使用統一的任務函數（DRY 原則）
         buy_free_game_task = self._create_buy_free_game_task(free_game_type)
         
-        # 使用 ThreadPoolExecutor 並行執行（直接操作 driver）
+        # 使用共用執行緒池並行執行（直接操作 driver）
         results = {}
-        with ThreadPoolExecutor(max_workers=len(target_browsers)) as executor:
-            futures = {
-                executor.submit(buy_free_game_task, bt.context): bt 
-                for bt in target_browsers
-            }
-            
-            for future in futures:
-                bt = futures[future]
-                try:
-                    results[bt.index] = future.result()
-                except Exception as e:
-                    username = bt.context.credential.username if bt.context else "Unknown"
-                    self.logger.error(f"瀏覽器 {bt.index} ({username}) 購買失敗: {e}")
-                    results[bt.index] = False
+        futures = {
+            self._fanout.submit("購買免費遊戲", buy_free_game_task, bt.context): bt
+            for bt in target_browsers
+        }
+        
+        for future in futures:
+            bt = futures[future]
+            try:
+                results[bt.index] = future.result()
+            except Exception as e:
+                username = bt.context.credential.username if bt.context else "Unknown"
+                self.logger.error(f"瀏覽器 {bt.index} ({username}) 購買失敗: {e}")
+                results[bt.index] = False
         
         # 統計結果
         success_count = sum(1 for v in results.values() if v)
@@ -5928,18 +10939,17 @@ class GameControlCenter:
                 
                 # 對成功購買的瀏覽器執行結算（直接操作 driver）
                 settle_results = {}
-                with ThreadPoolExecutor(max_workers=len(successful_browsers)) as executor:
-                    futures = {
-                        executor.submit(settle_free_game_task, bt.context): bt 
-                        for bt in successful_browsers
-                    }
-                    
-                    for future in futures:
-                        bt = futures[future]
-                        try:
-                            settle_results[bt.index] = future.result()
-                        except Exception:
-                            settle_results[bt.index] = False
+                futures = {
+                    self._fanout.submit("免費遊戲結算", settle_free_game_task, bt.context): bt
+                    for bt in successful_browsers
+                }
+                
+                for future in futures:
+                    bt = futures[future]
+                    try:
+                        settle_results[bt.index] = future.result()
+                    except Exception:
+                        settle_results[bt.index] = False
                 
                 settle_success = sum(1 for v in settle_results.values() if v)
                 self.logger.info(f"結算完成: {settle_success} 個瀏覽器")
@@ -6192,6 +11202,8 @@ class GameControlCenter:
         try:
             capture_method = getattr(self._image_detector, capture_method_name)
             if capture_method(selected_browser.context.driver):
+                # 模板已更新，之前沿用的檢測結果不再有效
+                self._image_detector.clear_frame_gate()
                 self.logger.info("")
             else:
                 self.logger.error("模板截取失敗")
@@ -6390,6 +11402,10 @@ class GameControlCenter:
             # 停止錯誤訊息監控
             self._stop_error_monitor()
             
+            # 關閉並行操作執行緒池
+            self._fanout.log_stats()
+            self._fanout.shutdown()
+            
             self.running = False
             self.logger.info("控制面板已關閉")
     
@@ -6429,6 +11445,7 @@ class AutoSlotGameAppStarter:
         rules: 下注規則列表。
         proxy_manager: 代理伺服器管理器。
         browser_manager: 瀏覽器管理器。
+        heartbeat: 瀏覽器存活心跳（建立瀏覽器後啟動）。
 
     範例:
         >>> starter = AutoSlotGameAppStarter()
@@ -6447,9 +11464,11 @@ class AutoSlotGameAppStarter:
         
         # 瀏覽器執行緒列表（取代原本的 browser_contexts）
         self.browser_threads: List[BrowserThread] = []
+        self.heartbeat: Optional[BrowserHeartbeat] = None
         
         self.credentials: List[UserCredential] = []
         self.rules: List[BetRule] = []
+        self.network_rules: List[NetworkStateRule] = []
     
     def initialize(self) -> bool:
         """執行完整的初始化流程。
@@ -6510,6 +11529,11 @@ class AutoSlotGameAppStarter:
         self.rules = self.config_reader.read_bet_rules()
         self.logger.info(f"讀取到 {len(self.rules)} 條規則")
         
+        # 讀取網路狀態規則（可選）
+        self.network_rules = self.config_reader.read_network_rules()
+        if self.network_rules:
+            self.logger.info(f"讀取到 {len(self.network_rules)} 條網路狀態規則")
+        
         # 讀取用戶設定並套用
         user_settings = self.config_reader.read_user_settings()
         if user_settings:
@@ -6637,6 +11661,15 @@ class AutoSlotGameAppStarter:
                 t for t in self.browser_threads if t.context is not None
             ]
         
+        # 4. 啟動存活心跳（之後各循環讀取快取的存活狀態）
+        self.heartbeat = BrowserHeartbeat(self.browser_threads, logger=self.logger)
+        self.heartbeat.start()
+        
+        if Constants.INPUT_DISPATCH_MODE not in Constants.INPUT_DISPATCH_MODES:
+            self.logger.warning(
+                f"不支援的輸入派送方式: {Constants.INPUT_DISPATCH_MODE}，改用 chromedriver 送出"
+            )
+        
         # 輸出結果
         if success_count == browser_count:
             self.logger.info(f"全部 {browser_count} 個瀏覽器已建立")
@@ -6651,7 +11684,7 @@ class AutoSlotGameAppStarter:
         """清理所有資源。
         
         執行以下清理步驟：
-        1. 停止所有瀏覽器執行緒（會自動關閉瀏覽器）
+        1. 停止存活心跳與所有瀏覽器執行緒（會自動關閉瀏覽器）
         2. 等待所有執行緒結束（最多 5 秒）
         3. 清空執行緒列表
         4. 停止所有代理伺服器
@@ -6664,6 +11697,9 @@ class AutoSlotGameAppStarter:
         
         browser_count = len(self.browser_threads)
         
+        if self.heartbeat:
+            self.heartbeat.stop()
+        
         # 停止所有瀏覽器執行緒（會自動關閉瀏覽器）
         for thread in self.browser_threads:
             thread.stop()
@@ -6716,7 +11752,8 @@ class AutoSlotGameAppStarter:
     def execute_on_all_browsers(
         self, 
         func: Callable[[BrowserContext], Any],
-        timeout: Optional[float] = None
+        timeout: Optional[float] = None,
+        priority: int = Constants.TASK_PRIORITY_NORMAL
     ) -> List[Tuple[int, Any, Optional[Exception]]]:
         """在所有瀏覽器上並行執行任務。
         
@@ -6726,6 +11763,7 @@ class AutoSlotGameAppStarter:
         參數:
             func: 要執行的函數，接收 BrowserContext 作為參數。
             timeout: 每個任務的超時時間（秒），None 表示無限等待。
+            priority: 任務優先權（Constants.TASK_PRIORITY_*）。
             
         回傳:
             結果列表，每個元素為 (index, result, error) 元組：
@@ -6742,37 +11780,22 @@ class AutoSlotGameAppStarter:
             ...         print(f"瀏覽器 {idx}: {url}")
         """
         results: List[Tuple[int, Any, Optional[Exception]]] = []
-        pending_threads: List[BrowserThread] = []
+        pending: List[Tuple[BrowserThread, Future]] = []
         
         # 1. 先將任務分發給所有執行緒
         for thread in self.browser_threads:
             if not thread.is_browser_alive():
                 results.append((thread.index, None, RuntimeError("瀏覽器已關閉")))
                 continue
-            
-            # 重置任務完成事件
-            thread._task_done_event.clear()
-            thread._task_result = None
-            
-            # 加入任務佇列
-            with thread._task_lock:
-                thread._task_queue.append((func, (), {}))
-            
-            # 通知執行緒有新任務
-            thread._task_event.set()
-            pending_threads.append(thread)
+            try:
+                pending.append((thread, thread.submit_task(func, priority=priority)))
+            except RuntimeError as e:
+                results.append((thread.index, None, e))
         
         # 2. 等待所有任務完成
-        for thread in pending_threads:
+        for thread, future in pending:
             try:
-                if thread._task_done_event.wait(timeout=timeout):
-                    result = thread._task_result
-                    if isinstance(result, Exception):
-                        results.append((thread.index, None, result))
-                    else:
-                        results.append((thread.index, result, None))
-                else:
-                    results.append((thread.index, None, TimeoutError(f"瀏覽器 {thread.index} 任務執行超時")))
+                results.append((thread.index, thread.wait_task(future, timeout), None))
             except Exception as e:
                 results.append((thread.index, None, e))
         
@@ -7176,6 +12199,8 @@ class AutoSlotGameAppStarter:
         """
         attempt = 0
         total_browsers = len(self.browser_threads)
+        # 畫面沒有變化時逐步拉長檢測間隔
+        policy = AdaptiveWaitPolicy.for_site("lobby")
         
         self.logger.info(f"開始檢測 {display_name}...")
         
@@ -7186,7 +12211,10 @@ class AutoSlotGameAppStarter:
             detection_results: List[Optional[Tuple[int, int, float]]] = []
             
             def detect_task(context: BrowserContext) -> Optional[Tuple[int, int, float]]:
-                return image_detector.detect_in_browser(context.driver, template_name)
+                return image_detector.detect_in_browser(
+                    context.driver, template_name,
+                    capture_format=Constants.LOBBY_CAPTURE_FORMAT
+                )
             
             results = self.execute_on_all_browsers(detect_task)
             detection_results = [result for _, result, error in results if error is None]
@@ -7196,14 +12224,24 @@ class AutoSlotGameAppStarter:
             # 當所有瀏覽器都找到圖片時返回
             if found_count == total_browsers:
                 self.logger.info(f"所有瀏覽器都已檢測到 {display_name}")
+                self.logger.debug(f"等待 {display_name}: {policy.summary()}")
                 return detection_results
             
+            policy.observe(self._browser_frame_versions(image_detector))
+            
             # 每 10 次檢測顯示一次進度
             if attempt % Constants.DETECTION_PROGRESS_INTERVAL == 0:
                 self.logger.info(f"   檢測進度: {found_count}/{total_browsers} 個瀏覽器已就緒")
                 sys.stdout.flush()  # 確保緩衝區刷新
             
-            time.sleep(Constants.DETECTION_INTERVAL)
+            policy.wait()
+    
+    def _browser_frame_versions(self, image_detector: ImageDetector) -> Tuple[int, ...]:
+        """取得所有瀏覽器的畫面版本（任一瀏覽器畫面變化時結果不同）。"""
+        return tuple(
+            image_detector.get_frame_version(bt.context.driver)
+            for bt in self.browser_threads if bt.context
+        )
     
     def _prompt_capture_template(
         self, 
@@ -7311,6 +12349,8 @@ class AutoSlotGameAppStarter:
         """
         attempt = 0
         total_browsers = len(self.browser_threads)
+        # 畫面沒有變化時逐步拉長檢測間隔
+        policy = AdaptiveWaitPolicy.for_site("lobby")
         
         while True:
             attempt += 1
@@ -7320,7 +12360,10 @@ class AutoSlotGameAppStarter:
             
             def detect_task(context: BrowserContext) -> bool:
                 """返回 True 表示圖片仍存在"""
-                result = image_detector.detect_in_browser(context.driver, template_name)
+                result = image_detector.detect_in_browser(
+                    context.driver, template_name,
+                    capture_format=Constants.LOBBY_CAPTURE_FORMAT
+                )
                 return result is not None
             
             results = self.execute_on_all_browsers(detect_task)
@@ -7331,14 +12374,17 @@ class AutoSlotGameAppStarter:
             # 如果所有瀏覽器都沒有找到圖片，則返回
             if still_present_count == 0:
                 self.logger.info(f"圖片已消失")
+                self.logger.debug(f"等待 {template_name} 消失: {policy.summary()}")
                 return
             
+            policy.observe(self._browser_frame_versions(image_detector))
+            
             # 每 10 次檢測顯示一次進度
             if attempt % 10 == 0:
                 self.logger.info(f"   等待中... ({disappeared_count}/{total_browsers} 已消失)")
                 sys.stdout.flush()  # 確保緩衝區刷新
             
-            time.sleep(Constants.DETECTION_INTERVAL)
+            policy.wait()
     
     def start_control_center(self) -> None:
         """步驟 10: 啟動遊戲控制面板
@@ -7371,7 +12417,8 @@ class AutoSlotGameAppStarter:
             browser_threads=self.browser_threads,
             bet_rules=self.rules,
             canvas_rect=canvas_rect,
-            logger=self.logger
+            logger=self.logger,
+            network_rules=self.network_rules
         )
         
         # 啟動控制面板（阻塞式，直到使用者退出）
@@ -7461,4 +12508,6 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    # 打包後的執行檔啟動視覺工作程序時需要
+    multiprocessing.freeze_support()
     main()
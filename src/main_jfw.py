@@ -65,12 +65,13 @@ import socket
 import select
 import base64
 import time
+import random
 import subprocess
 from typing import Optional, List, Dict, Tuple, Any, Callable, Protocol, Union
 from pathlib import Path
 from dataclasses import dataclass, field
 from contextlib import contextmanager, suppress
-from concurrent.futures import ThreadPoolExecutor, as_completed, Future
+from concurrent.futures import ThreadPoolExecutor, as_completed, Future, TimeoutError as FuturesTimeoutError
 from enum import Enum
 import threading
 
@@ -161,6 +162,7 @@ class Constants:
     DEFAULT_IMPLICIT_WAIT = 60
     
     MAX_THREAD_WORKERS = 10
+    SYNC_OPERATOR_WORKERS_PER_BROWSER = 2  # 同步操作器每個瀏覽器的執行緒數（保留同時下達另一個指令的餘裕）
     PROXY_SERVER_BIND_HOST = "127.0.0.1"
     PROXY_BUFFER_SIZE = 4096
     PROXY_SELECT_TIMEOUT = 1.0
@@ -213,6 +215,14 @@ class Constants:
     DETECTION_INTERVAL = 1.0  # 檢測間隔（秒）
     MAX_DETECTION_ATTEMPTS = 60  # 最大檢測次數
     
+    # 等待循環輪詢間隔（畫面未變化時逐步拉長，畫面變化時回到最短間隔）
+    WAIT_POLL_INITIAL = 0.3  # 最短檢測間隔（秒）
+    WAIT_POLL_MAX = 4.0  # 最長檢測間隔（秒）
+    WAIT_POLL_FACTOR = 1.5  # 畫面未變化時的間隔倍數
+    WAIT_POLL_JITTER = 0.2  # 間隔隨機抖動比例（±20%），避免多個瀏覽器同時截圖
+    FRAME_CHANGE_THUMBNAIL_SIZE = (32, 32)  # 畫面指紋縮圖尺寸 (寬, 高)
+    FRAME_CHANGE_DIFF_THRESHOLD = 2.0  # 縮圖平均絕對差（灰階 0-255）低於此值視為未變化
+    
     # Canvas 動態計算比例（用於點擊座標）
     # lobby_login 按鈕座標比例
     LOBBY_LOGIN_BUTTON_X_RATIO = 0.55  # lobby_login 開始遊戲按鈕 X 座標比例
@@ -315,6 +325,12 @@ class Constants:
     BLACKSCREEN_CROP_MARGIN_X = 125  # 黑屏截圖裁切邊距（左右）
     BLACKSCREEN_CROP_MARGIN_Y = 75   # 黑屏截圖裁切邊距（上下）
     BLACKSCREEN_PERSIST_SECONDS = 10  # 黑屏持續秒數閾值
+    BLACKSCREEN_DETECTION_MODE = "template"  # 黑屏檢測方式: "template"（模板比對）或 "luminance"（亮度統計）
+    BLACKSCREEN_LUMA_SAMPLE_SIZE = (64, 32)  # 亮度統計前的縮圖尺寸 (寬, 高)
+    BLACKSCREEN_LUMA_MAX_MEAN = 16.0         # 平均亮度上限（0-255）
+    BLACKSCREEN_LUMA_MAX_STDDEV = 8.0        # 亮度標準差上限
+    BLACKSCREEN_LUMA_DARK_LEVEL = 32         # 亮度低於此值視為暗像素
+    BLACKSCREEN_LUMA_MIN_DARK_RATIO = 0.98   # 暗像素比例下限
 
     # 返回遊戲提示截圖座標（基於預設視窗大小，使用與黑屏相同的座標）
     GAME_RETURN_CENTER_X = 300  # 返回遊戲提示中心 X 座標
@@ -1732,7 +1748,10 @@ class SyncBrowserOperator:
     """同步瀏覽器操作器。
     
     對多個瀏覽器實例同步執行相同的操作。
-    使用執行緒池提升效能和資源管理。
+    使用常駐執行緒池（第一次操作時建立，cleanup 時以 shutdown 關閉），
+    不必每次操作都建立並關閉執行緒。執行緒數依瀏覽器數量調整
+    （每個瀏覽器 SYNC_OPERATOR_WORKERS_PER_BROWSER 個），無限等待的操作
+    （例如調整金額）佔用全部瀏覽器時，同時下達的其他指令仍有執行緒可用。
     """
     
     def __init__(
@@ -1743,12 +1762,46 @@ class SyncBrowserOperator:
         """初始化操作器。
         
         Args:
-            max_workers: 最大工作執行緒數
+            max_workers: 最少工作執行緒數（實際數量依瀏覽器數量增加）
             logger: 日誌記錄器
         """
         self.max_workers = max_workers or Constants.MAX_THREAD_WORKERS
         self.logger = logger or LoggerFactory.get_logger()
         self.last_canvas_rect: Optional[Dict[str, float]] = None  # Canvas 區域資訊
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_workers = 0
+        self._executor_lock = threading.Lock()
+    
+    def _get_executor(self, browser_count: int) -> ThreadPoolExecutor:
+        """取得常駐執行緒池（尚未建立或執行緒數不足時建立）。
+        
+        Args:
+            browser_count: 本次操作的瀏覽器數量
+            
+        Returns:
+            執行緒數至少為 browser_count * SYNC_OPERATOR_WORKERS_PER_BROWSER 的執行緒池
+        """
+        workers = max(self.max_workers, browser_count * Constants.SYNC_OPERATOR_WORKERS_PER_BROWSER)
+        with self._executor_lock:
+            if self._executor is None or self._executor_workers < workers:
+                previous = self._executor
+                self._executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="SyncOperator"
+                )
+                self._executor_workers = workers
+                if previous is not None:
+                    # 舊執行緒池中進行中的操作仍會執行完畢
+                    previous.shutdown(wait=False)
+            return self._executor
+    
+    def shutdown(self) -> None:
+        """關閉常駐執行緒池（已提交的操作仍會執行完畢）。"""
+        with self._executor_lock:
+            executor = self._executor
+            self._executor = None
+            self._executor_workers = 0
+        if executor is not None:
+            executor.shutdown(wait=False)
     
     def execute_sync(
         self,
@@ -1805,25 +1858,26 @@ class SyncBrowserOperator:
                     message=str(e)
                 )
         
-        # 使用執行緒池執行
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # 提交所有任務
-            futures = [
-                executor.submit(execute_operation, i, context)
-                for i, context in enumerate(browser_contexts)
-            ]
-            
-            # 收集結果
-            try:
-                for future in as_completed(futures, timeout=timeout):
-                    index, result = future.result()
-                    results[index] = result
-            except TimeoutError:
-                self.logger.error(f"{operation_name} 執行超時")
+        # 使用常駐執行緒池執行
+        started_at = time.monotonic()
+        executor = self._get_executor(total)
+        futures = [
+            executor.submit(execute_operation, i, context)
+            for i, context in enumerate(browser_contexts)
+        ]
+        
+        # 收集結果
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                index, result = future.result()
+                results[index] = result
+        except FuturesTimeoutError:
+            self.logger.error(f"{operation_name} 執行超時")
         
         success_count = sum(1 for r in results if r.success)
         if success_count < total:
             self.logger.warning(f"[警告] 部分操作未成功: {success_count}/{total}")
+        self.logger.debug(f"{operation_name} 耗時 {time.monotonic() - started_at:.2f} 秒")
         
         return results
     
@@ -3021,6 +3075,37 @@ class ImageDetector:
         
         # 確保圖片目錄存在
         self.image_dir.mkdir(parents=True, exist_ok=True)
+        
+        # 各瀏覽器的畫面版本（檢測時觀察到畫面變化就加一）
+        self._frame_versions: Dict[str, int] = {}
+        self._frame_prints: Dict[str, np.ndarray] = {}
+        self._frame_lock = threading.Lock()
+    
+    def get_frame_version(self, driver: WebDriver) -> int:
+        """取得該瀏覽器的畫面版本。
+        
+        每次檢測截圖時與上一張畫面比較，有變化就加一，
+        供等待循環判斷兩次檢測之間畫面是否有變化（見 AdaptiveWaitPolicy）。
+        
+        Args:
+            driver: WebDriver 實例
+            
+        Returns:
+            畫面版本（尚未檢測過時為 0）
+        """
+        with self._frame_lock:
+            return self._frame_versions.get(str(driver.session_id), 0)
+    
+    def _track_frame_version(self, driver: WebDriver, screenshot: np.ndarray) -> None:
+        """以灰階縮圖比較本次與上一張畫面，有變化時增加畫面版本。"""
+        thumbnail = cv2.resize(screenshot, Constants.FRAME_CHANGE_THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+        fingerprint = cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY)
+        key = str(driver.session_id)
+        with self._frame_lock:
+            previous = self._frame_prints.get(key)
+            self._frame_prints[key] = fingerprint
+            if previous is None or float(cv2.absdiff(previous, fingerprint).mean()) >= Constants.FRAME_CHANGE_DIFF_THRESHOLD:
+                self._frame_versions[key] = self._frame_versions.get(key, 0) + 1
     
     def get_template_path(self, template_name: str) -> Path:
         """取得模板圖片路徑。
@@ -3144,12 +3229,57 @@ class ImageDetector:
         """
         try:
             screenshot = self.capture_screenshot(driver)
+            self._track_frame_version(driver, screenshot)
             template_path = self.get_template_path(template_name)
             return self.match_template(screenshot, template_path, threshold)
         except Exception as e:
             self.logger.error(f"瀏覽器圖片檢測失敗 {e}")
             return None
     
+    def detect_many_in_browser(
+        self,
+        driver: WebDriver,
+        template_names: List[str],
+        threshold: float = Constants.MATCH_THRESHOLD
+    ) -> Dict[str, Optional[Tuple[int, int, float]]]:
+        """在瀏覽器中以單次截圖檢測多個模板圖片。
+        
+        只截圖一次，再將所有模板與同一張截圖比對。
+        模板檔案不存在時該模板結果為 None。
+        
+        Args:
+            driver: WebDriver 實例
+            template_names: 模板圖片檔名列表
+            threshold: 匹配閾值
+            
+        Returns:
+            模板檔名 → 檢測結果的字典，找到為 (x, y, confidence)，未找到為 None
+        """
+        results: Dict[str, Optional[Tuple[int, int, float]]] = {
+            name: None for name in template_names
+        }
+        
+        existing_names = [name for name in template_names if self.template_exists(name)]
+        if not existing_names:
+            return results
+        
+        try:
+            screenshot = self.capture_screenshot(driver)
+        except Exception as e:
+            self.logger.error(f"瀏覽器圖片檢測失敗 {e}")
+            return results
+        self._track_frame_version(driver, screenshot)
+        
+        for name in existing_names:
+            try:
+                results[name] = self.match_template(
+                    screenshot, self.get_template_path(name), threshold
+                )
+            except Exception as e:
+                self.logger.error(f"瀏覽器圖片檢測失敗 [{name}] {e}")
+        
+        return results
+    
     def detect_error_message_in_region(
         self, 
         driver: WebDriver, 
@@ -3233,6 +3363,29 @@ class ImageDetector:
             if screenshot is None:
                 return False
             
+            return self.match_black_screen(screenshot, threshold)
+            
+        except Exception as e:
+            self.logger.debug(f"黑屏檢測失敗: {e}")
+            return False
+
+    def match_black_screen(
+        self,
+        screenshot: np.ndarray,
+        threshold: float = Constants.MATCH_THRESHOLD
+    ) -> bool:
+        """檢測已擷取的截圖中黑屏區域是否符合黑屏模板。
+        
+        BLACKSCREEN_DETECTION_MODE 為 "luminance" 時改以亮度統計判斷，不需模板。
+        
+        Args:
+            screenshot: 截圖（OpenCV 格式）
+            threshold: 匹配閾值
+            
+        Returns:
+            是否檢測到黑屏
+        """
+        try:
             # 獲取截圖尺寸
             height, width = screenshot.shape[:2]
             
@@ -3251,6 +3404,9 @@ class ImageDetector:
             # 裁切區域
             cropped = screenshot[crop_top:crop_bottom, crop_left:crop_right]
             
+            if Constants.BLACKSCREEN_DETECTION_MODE == "luminance" and cropped.size > 0:
+                return self.is_black_region(cropped)
+            
             # 讀取黑屏模板
             template_path = self.get_template_path(Constants.BLACK_SCREEN)
             if not template_path.exists():
@@ -3276,6 +3432,127 @@ class ImageDetector:
             self.logger.debug(f"黑屏檢測失敗: {e}")
             return False
 
+    def is_black_region(self, image: np.ndarray) -> bool:
+        """以亮度統計判斷區域是否為黑屏。
+        
+        先縮小為 BLACKSCREEN_LUMA_SAMPLE_SIZE，再檢查平均亮度、
+        亮度標準差與暗像素比例（由亮度直方圖計算）。
+        
+        Args:
+            image: 區域圖片（BGR）
+            
+        Returns:
+            是否為黑屏
+        """
+        sample = cv2.resize(image, Constants.BLACKSCREEN_LUMA_SAMPLE_SIZE, interpolation=cv2.INTER_AREA)
+        sample_gray = cv2.cvtColor(sample, cv2.COLOR_BGR2GRAY)
+        mean, stddev = cv2.meanStdDev(sample_gray)
+        hist = cv2.calcHist([sample_gray], [0], None, [256], [0, 256])
+        dark_ratio = float(hist[:Constants.BLACKSCREEN_LUMA_DARK_LEVEL].sum()) / sample_gray.size
+        return (
+            float(mean[0][0]) <= Constants.BLACKSCREEN_LUMA_MAX_MEAN
+            and float(stddev[0][0]) <= Constants.BLACKSCREEN_LUMA_MAX_STDDEV
+            and dark_ratio >= Constants.BLACKSCREEN_LUMA_MIN_DARK_RATIO
+        )
+
+
+class AdaptiveWaitPolicy:
+    """檢測等待循環的輪詢間隔策略。
+    
+    預期畫面即將出現時以最短間隔輪詢；畫面持續沒有變化時，間隔每次乘以倍數
+    並加上隨機抖動，最長不超過上限；observe 觀察到狀態變化時回到最短間隔。
+    
+    Attributes:
+        initial: 最短間隔（秒）
+        maximum: 最長間隔（秒）
+        factor: 每次未變化時的間隔倍數
+        jitter: 隨機抖動比例
+        resets: 回到最短間隔的次數
+    """
+    
+    def __init__(
+        self,
+        initial: float = Constants.WAIT_POLL_INITIAL,
+        maximum: float = Constants.WAIT_POLL_MAX,
+        factor: float = Constants.WAIT_POLL_FACTOR,
+        jitter: float = Constants.WAIT_POLL_JITTER
+    ):
+        """初始化輪詢策略。
+        
+        Args:
+            initial: 最短間隔（秒）
+            maximum: 最長間隔（秒）
+            factor: 每次未變化時的間隔倍數
+            jitter: 隨機抖動比例（0.2 表示 ±20%）
+        """
+        self.initial = max(0.0, initial)
+        self.maximum = max(self.initial, maximum)
+        self.factor = max(1.0, factor)
+        self.jitter = max(0.0, jitter)
+        self.resets = 0
+        self._interval = self.initial
+        self._last_state: Any = None
+        self._started_at = time.monotonic()
+        self._waited = 0.0
+        self._waits = 0
+    
+    def observe(self, state: Any) -> bool:
+        """記錄本次檢測觀察到的狀態，與上次不同時回到最短間隔。
+        
+        Args:
+            state: 可比較的狀態（例如各瀏覽器畫面版本的 tuple）
+            
+        Returns:
+            狀態是否變化
+        """
+        changed = self._last_state is not None and state != self._last_state
+        self._last_state = state
+        if changed:
+            self._interval = self.initial
+            self.resets += 1
+        return changed
+    
+    def next_interval(self) -> float:
+        """取得下一次等待的秒數，並將之後的間隔乘以倍數（不超過上限）。"""
+        interval = self._interval
+        self._interval = min(self.maximum, self._interval * self.factor)
+        if self.jitter > 0:
+            interval *= 1.0 + random.uniform(-self.jitter, self.jitter)
+        return min(self.maximum, max(0.0, interval))
+    
+    def wait(self) -> None:
+        """等待下一次檢測。"""
+        self._waits += 1
+        interval = self.next_interval()
+        self._waited += interval
+        time.sleep(interval)
+    
+    @property
+    def polls(self) -> int:
+        """檢測次數（每次等待之前與最後一次各檢測一次）。"""
+        return self._waits + 1
+    
+    @property
+    def elapsed(self) -> float:
+        """自建立以來經過的時間（秒）。"""
+        return time.monotonic() - self._started_at
+    
+    @property
+    def captures_saved(self) -> int:
+        """與固定 DETECTION_INTERVAL 輪詢相比少擷取的次數（負數表示多擷取）。"""
+        elapsed = self.elapsed
+        detect_time = max(0.0, elapsed - self._waited) / self.polls
+        # 固定間隔下 k 次檢測需 k × 檢測耗時 + (k - 1) × 間隔
+        fixed_polls = (elapsed + Constants.DETECTION_INTERVAL) / (Constants.DETECTION_INTERVAL + detect_time)
+        return int(round(fixed_polls - self.polls))
+    
+    def summary(self) -> str:
+        """等待統計摘要（日誌用）。"""
+        return (
+            f"檢測 {self.polls} 次（{self.elapsed:.1f} 秒），"
+            f"較固定間隔少擷取 {self.captures_saved} 次"
+        )
+
 
 # ============================================================================
 # 瀏覽器恢復管理器
@@ -3320,6 +3597,22 @@ class BrowserRecoveryManager:
             if screenshot is None:
                 return False
             
+            return self._match_error_message(screenshot)
+            
+        except Exception as e:
+            self.logger.debug(f"錯誤訊息檢測失敗: {e}")
+            return False
+    
+    def _match_error_message(self, screenshot: np.ndarray) -> bool:
+        """檢測已擷取的截圖中是否出現錯誤訊息（雙區域檢測）。
+        
+        Args:
+            screenshot: 螢幕截圖
+            
+        Returns:
+            是否檢測到錯誤訊息
+        """
+        try:
             # 讀取左側模板
             left_template_path = self.image_detector.get_template_path(Constants.ERROR_MESSAGE_LEFT)
             if not left_template_path.exists():
@@ -3365,6 +3658,40 @@ class BrowserRecoveryManager:
             self.logger.debug(f"錯誤訊息檢測失敗: {e}")
             return False
     
+    def detect_screen_states(self, driver: WebDriver) -> Dict[str, bool]:
+        """以單次截圖同時檢測黑屏、錯誤訊息與 game_return。
+        
+        供錯誤監控使用，取代分別呼叫 detect_black_screen、
+        detect_error_message 與 detect_game_return 所造成的三次截圖。
+        
+        Args:
+            driver: WebDriver 實例
+            
+        Returns:
+            包含 black_screen、error_message、game_return 三個布林值的字典
+        """
+        states = {'black_screen': False, 'error_message': False, 'game_return': False}
+        
+        try:
+            screenshot = self.image_detector.capture_screenshot(driver)
+        except Exception as e:
+            self.logger.debug(f"畫面狀態檢測截圖失敗: {e}")
+            return states
+        
+        states['black_screen'] = self.image_detector.match_black_screen(screenshot)
+        states['error_message'] = self._match_error_message(screenshot)
+        
+        if self.image_detector.template_exists(Constants.GAME_RETURN):
+            try:
+                states['game_return'] = self.image_detector.match_template(
+                    screenshot,
+                    self.image_detector.get_template_path(Constants.GAME_RETURN)
+                ) is not None
+            except Exception as e:
+                self.logger.debug(f"game_return 檢測失敗: {e}")
+        
+        return states
+    
     def detect_black_screen(self, driver: WebDriver) -> bool:
         """檢測瀏覽器中是否出現黑屏。
         
@@ -3483,14 +3810,15 @@ class BrowserRecoveryManager:
             # 使用 OpenCV 模板匹配檢測瀏覽器截圖中是否包含目標圖片區域
             max_attempts = Constants.MAX_DETECTION_ATTEMPTS
             for attempt in range(max_attempts):
-                # 同時檢測兩種目標圖片是否存在於瀏覽器畫面的某個區域
+                # 以單次截圖同時檢測兩種目標圖片是否存在於瀏覽器畫面的某個區域
+                results = self.image_detector.detect_many_in_browser(
+                    context.driver,
+                    [Constants.GAME_RETURN, Constants.LOBBY_CONFIRM]
+                )
                 # has_game_return: 檢測是否在畫面中找到 game_return 圖片區域
-                has_game_return = self.detect_game_return(context.driver)
+                has_game_return = results[Constants.GAME_RETURN] is not None
                 # has_lobby_confirm: 檢測是否在畫面中找到 lobby_confirm 圖片區域
-                has_lobby_confirm = self.image_detector.detect_in_browser(
-                    context.driver,
-                    Constants.LOBBY_CONFIRM
-                ) is not None
+                has_lobby_confirm = results[Constants.LOBBY_CONFIRM] is not None
                 
                 # 情境 1: 檢測到 game_return
                 if has_game_return:
@@ -3818,19 +4146,23 @@ class BrowserRecoveryManager:
     ) -> bool:
         """等待所有瀏覽器顯示指定模板。
         
+        輪詢間隔由 AdaptiveWaitPolicy 決定：畫面有變化時縮短、長時間未變化時拉長，
+        總等待時間與固定間隔時相同（max_attempts × DETECTION_INTERVAL）。
+        
         Args:
             contexts: 瀏覽器上下文列表
             template_name: 模板名稱
-            max_attempts: 最大嘗試次數
+            max_attempts: 最大嘗試次數（換算為等待時間上限）
             
         Returns:
             是否所有瀏覽器都找到
         """
-        attempt = 0
+        policy = AdaptiveWaitPolicy()
+        deadline = time.monotonic() + max_attempts * Constants.DETECTION_INTERVAL
+        next_progress_at = time.monotonic() + Constants.DETECTION_PROGRESS_INTERVAL * Constants.DETECTION_INTERVAL
         
-        while attempt < max_attempts:
-            attempt += 1
-            all_found = True
+        while True:
+            found_count = 0
             
             for context in contexts:
                 try:
@@ -3839,17 +4171,23 @@ class BrowserRecoveryManager:
                         template_name
                     )
                     if not result:
-                        all_found = False
                         break
+                    found_count += 1
                 except Exception:
-                    all_found = False
                     break
             
-            if all_found:
+            if found_count == len(contexts):
+                self.logger.debug(f"{template_name} 等待完成：{policy.summary()}")
                 return True
             
+            now = time.monotonic()
+            if now >= deadline:
+                self.logger.debug(f"{template_name} 等待逾時：{policy.summary()}")
+                return False
+            
             # 顯示進度
-            if attempt % Constants.DETECTION_PROGRESS_INTERVAL == 0:
+            if now >= next_progress_at:
+                next_progress_at = now + Constants.DETECTION_PROGRESS_INTERVAL * Constants.DETECTION_INTERVAL
                 found_count = sum(
                     1 for context in contexts
                     if self.image_detector.detect_in_browser(
@@ -3859,9 +4197,11 @@ class BrowserRecoveryManager:
                 )
                 self.logger.info(f"檢測中... ({found_count}/{len(contexts)})")
             
-            time.sleep(Constants.DETECTION_INTERVAL)
-        
-        return False
+            # 任一瀏覽器畫面或已找到數量變化時回到最短間隔
+            policy.observe((found_count, tuple(
+                self.image_detector.get_frame_version(context.driver) for context in contexts
+            )))
+            policy.wait()
     
     def restart_and_recover(
         self,
@@ -4424,8 +4764,11 @@ class GameControlCenter:
                             self._blackscreen_timestamps.pop(i, None)
                             continue
                         
+                        # 單次截圖檢測黑屏、錯誤訊息與 game_return
+                        screen_states = self.recovery_manager.detect_screen_states(context.driver)
+                        
                         # 檢測是否有黑屏
-                        has_black_screen = self.recovery_manager.detect_black_screen(context.driver)
+                        has_black_screen = screen_states['black_screen']
                         current_time = time.time()
                         
                         if has_black_screen:
@@ -4461,8 +4804,8 @@ class GameControlCenter:
                                 self.logger.debug(f"[檢測] 瀏覽器 {i} 黑屏已消失")
                                 self._blackscreen_timestamps[i] = None
                         
-                        # 檢測是否有錯誤訊息（會自動記錄匹配值）
-                        has_error = self.recovery_manager.detect_error_message(context.driver)
+                        # 檢測是否有錯誤訊息
+                        has_error = screen_states['error_message']
                         
                         if has_error:
                             self.logger.warning(f"[檢測] 瀏覽器 {i} 出現錯誤訊息，正在導航到遊戲頁面並重新登入...")
@@ -4476,7 +4819,7 @@ class GameControlCenter:
                             continue
                         
                         # 檢測是否有 game_return 圖片
-                        has_game_return = self.recovery_manager.detect_game_return(context.driver)
+                        has_game_return = screen_states['game_return']
                         
                         if has_game_return:
                             self.logger.warning(f"[檢測] 瀏覽器 {i} 出現 game_return，正在點擊返回...")
@@ -7142,7 +7485,10 @@ class AutoSlotGameApp:
             finally:
                 self.browser_contexts.clear()
         
-        # 2. 停止所有 Proxy 伺服器
+        # 2. 關閉瀏覽器操作器的執行緒池
+        self.browser_operator.shutdown()
+        
+        # 3. 停止所有 Proxy 伺服器
         try:
             self.proxy_manager.stop_all_servers()
         except Exception as e:
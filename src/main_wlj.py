@@ -42,12 +42,13 @@ import socket
 import sys
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_futures
 from contextlib import contextmanager, suppress
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Protocol, Set, Tuple, Union
+from typing import Any, Callable, Deque, Dict, List, Optional, Protocol, Set, Tuple, Union
 
 # =============================================================================
 # 全域輸出緩衝設置 - 避免多執行緒環境下的輸出阻塞
@@ -186,6 +187,11 @@ class Constants:
     MAX_THREAD_WORKERS: int = 10
     MAX_BROWSER_COUNT: int = 16
     
+    # 瀏覽器任務優先權（數字越小越先執行，同優先權依提交順序）
+    TASK_PRIORITY_RECOVERY: int = 0            # 恢復任務（插隊到一般任務之前）
+    TASK_PRIORITY_NORMAL: int = 1              # 一般任務
+    TASK_PRIORITY_LEVELS: int = 2              # 優先權層數
+    
     # =========================================================================
     # 視窗配置
     # =========================================================================
@@ -889,12 +895,15 @@ class BrowserThread(threading.Thread):
         self._ready_event = threading.Event()  # 瀏覽器就緒事件
         self._creation_error: Optional[Exception] = None
 
-        # 任務佇列
-        self._task_queue: List[Tuple[Callable, tuple, dict]] = []
-        self._task_lock = threading.Lock()
-        self._task_event = threading.Event()  # 新任務通知
-        self._task_result: Any = None
-        self._task_done_event = threading.Event()  # 任務完成事件
+        # 任務佇列（每個優先權一個佇列，每個任務有自己的 Future）
+        self._task_queues: Tuple[Deque[Tuple[Future, Callable, tuple, dict, float]], ...] = tuple(
+            deque() for _ in range(Constants.TASK_PRIORITY_LEVELS)
+        )
+        self._task_condition = threading.Condition()  # 新任務或停止通知
+        self._task_stats: Dict[str, float] = {
+            'completed': 0, 'failed': 0, 'cancelled': 0,
+            'wait_total': 0.0, 'wait_max': 0.0, 'run_total': 0.0, 'peak_depth': 0,
+        }
 
     def run(self) -> None:
         """控制器主迴圈。
@@ -915,12 +924,12 @@ class BrowserThread(threading.Thread):
             # 2. 通知瀏覽器已就緒
             self._ready_event.set()
 
-            # 3. 等待任務或停止信號
-            while not self._stop_event.is_set():
-                # 每秒檢查一次
-                if self._task_event.wait(timeout=1.0):
-                    self._task_event.clear()
-                    self._process_tasks()
+            # 3. 等待任務或停止信號（阻塞等待，不輪詢）
+            while True:
+                task = self._next_task()
+                if task is None:
+                    break
+                self._run_task(*task)
 
         except Exception as e:
             self.logger.error(f"瀏覽器 {self.index} 發生異常: {e}")
@@ -950,27 +959,59 @@ class BrowserThread(threading.Thread):
             self._creation_error = e
             self._ready_event.set()
 
-    def _process_tasks(self) -> None:
-        """處理任務佇列中的所有任務。
+    def _next_task(self) -> Optional[Tuple[Future, Callable, tuple, dict, float]]:
+        """阻塞等待並取出優先權最高的任務。
 
-        依序執行佇列中的任務，並將結果儲存到 _task_result。
+        回傳:
+            任務，收到停止信號時為 None
         """
-        while True:
-            with self._task_lock:
-                if not self._task_queue:
-                    break
-                func, args, kwargs = self._task_queue.pop(0)
+        with self._task_condition:
+            while not self._stop_event.is_set():
+                for queue in self._task_queues:
+                    if queue:
+                        return queue.popleft()
+                self._task_condition.wait()
+            return None
 
-            try:
-                # 將 context 注入到任務中
-                self._task_result = func(self.context, *args, **kwargs)
-            except Exception as e:
-                self._task_result = e
-            finally:
-                self._task_done_event.set()
+    def _run_task(self, future: Future, func: Callable, args: tuple, kwargs: dict, submitted_at: float) -> None:
+        """執行單一任務，並將結果或例外設定到該任務的 Future。"""
+        if not future.set_running_or_notify_cancel():
+            # 提交者已因超時取消
+            with self._task_condition:
+                self._task_stats['cancelled'] += 1
+            return
+
+        started_at = time.monotonic()
+        try:
+            # 將 context 注入到任務中
+            result = func(self.context, *args, **kwargs)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finished_at = time.monotonic()
+
+        with self._task_condition:
+            stats = self._task_stats
+            stats['failed' if future.exception() is not None else 'completed'] += 1
+            stats['wait_total'] += started_at - submitted_at
+            stats['wait_max'] = max(stats['wait_max'], started_at - submitted_at)
+            stats['run_total'] += finished_at - started_at
+
+    def _fail_pending_tasks(self) -> None:
+        """以「瀏覽器已關閉」結束佇列中尚未執行的任務。"""
+        with self._task_condition:
+            pending = [task for queue in self._task_queues for task in queue]
+            for queue in self._task_queues:
+                queue.clear()
+        for future, *_ in pending:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError(f"瀏覽器 {self.index} 已關閉"))
 
     def _cleanup(self) -> None:
         """清理瀏覽器資源。"""
+        self._stop_event.set()
+        self._fail_pending_tasks()
         if self.driver:
             try:
                 self.driver.quit()
@@ -1000,19 +1041,62 @@ class BrowserThread(threading.Thread):
         """
         return self._creation_error
 
+    def submit_task(
+        self,
+        func: Callable[[BrowserContext], Any],
+        *args: Any,
+        priority: int = Constants.TASK_PRIORITY_NORMAL,
+        **kwargs: Any
+    ) -> Future:
+        """將任務加入瀏覽器的任務佇列，不等待完成。
+
+        優先權較高（數字較小）的任務先執行，同優先權依提交順序執行；
+        正在執行的任務不會被中斷。
+
+        參數:
+            func: 要執行的函數，第一個參數會是 BrowserContext。
+            *args: 額外的位置參數。
+            priority: 任務優先權（Constants.TASK_PRIORITY_*）。
+            **kwargs: 額外的關鍵字參數。
+
+        回傳:
+            該任務的 Future（結果或例外由任務設定）。
+
+        異常:
+            RuntimeError: 當瀏覽器已關閉時。
+        """
+        if not self.is_alive():
+            raise RuntimeError(f"瀏覽器 {self.index} 已關閉")
+
+        level = min(max(priority, 0), Constants.TASK_PRIORITY_LEVELS - 1)
+        future: Future = Future()
+        with self._task_condition:
+            if self._stop_event.is_set():
+                raise RuntimeError(f"瀏覽器 {self.index} 已關閉")
+            self._task_queues[level].append((future, func, args, kwargs, time.monotonic()))
+            depth = sum(len(queue) for queue in self._task_queues)
+            self._task_stats['peak_depth'] = max(self._task_stats['peak_depth'], depth)
+            self._task_condition.notify()
+        return future
+
     def execute_task(
         self,
         func: Callable[[BrowserContext], Any],
         *args: Any,
         timeout: Optional[float] = None,
+        priority: int = Constants.TASK_PRIORITY_NORMAL,
         **kwargs: Any
     ) -> Any:
-        """在瀏覽器中執行任務。
+        """在瀏覽器中執行任務並等待結果。
+
+        每次呼叫有自己的結果與超時，多個呼叫者可同時提交任務。
+        超時時尚未開始執行的任務會被取消。
 
         參數:
             func: 要執行的函數，第一個參數會是 BrowserContext。
             *args: 額外的位置參數。
             timeout: 超時時間（秒）。
+            priority: 任務優先權（Constants.TASK_PRIORITY_*）。
             **kwargs: 額外的關鍵字參數。
 
         回傳:
@@ -1022,33 +1106,56 @@ class BrowserThread(threading.Thread):
             RuntimeError: 當瀏覽器已關閉時。
             TimeoutError: 當任務執行超時時。
         """
-        if not self.is_alive() or self._stop_event.is_set():
-            raise RuntimeError(f"瀏覽器 {self.index} 已關閉")
+        future = self.submit_task(func, *args, priority=priority, **kwargs)
+        return self.wait_task(future, timeout)
 
-        # 重置任務完成事件
-        self._task_done_event.clear()
-        self._task_result = None
+    def wait_task(self, future: Future, timeout: Optional[float] = None) -> Any:
+        """等待 submit_task 提交的任務完成。
 
-        # 加入任務佇列
-        with self._task_lock:
-            self._task_queue.append((func, args, kwargs))
-        
-        # 通知有新任務
-        self._task_event.set()
-        
-        # 等待任務完成
-        if self._task_done_event.wait(timeout=timeout):
-            result = self._task_result
-            if isinstance(result, Exception):
-                raise result
-            return result
-        else:
+        參數:
+            future: submit_task 回傳的 Future。
+            timeout: 超時時間（秒），None 表示無限等待。
+
+        回傳:
+            任務執行的結果。
+
+        異常:
+            TimeoutError: 當任務執行超時時（尚未開始執行的任務會被取消）。
+        """
+        done, _ = wait_futures([future], timeout=timeout)
+        if not done:
+            future.cancel()
             raise TimeoutError(f"瀏覽器 {self.index} 任務執行超時")
-    
+        return future.result()
+
+    def get_task_stats(self) -> Dict[str, float]:
+        """取得任務佇列統計。
+
+        回傳:
+            包含 completed（成功數）、failed（失敗數）、cancelled（超時取消數）、
+            queued（目前排隊數）、peak_depth（最多排隊數）、avg_wait_ms / max_wait_ms
+            （提交到開始執行的時間）與 avg_run_ms（執行時間）的字典
+        """
+        with self._task_condition:
+            stats = dict(self._task_stats)
+            queued = sum(len(queue) for queue in self._task_queues)
+        finished = max(1, stats['completed'] + stats['failed'])
+        return {
+            'completed': stats['completed'],
+            'failed': stats['failed'],
+            'cancelled': stats['cancelled'],
+            'queued': queued,
+            'peak_depth': stats['peak_depth'],
+            'avg_wait_ms': stats['wait_total'] / finished * 1000,
+            'max_wait_ms': stats['wait_max'] * 1000,
+            'avg_run_ms': stats['run_total'] / finished * 1000,
+        }
+
     def stop(self) -> None:
         """停止瀏覽器並釋放資源。"""
         self._stop_event.set()
-        self._task_event.set()
+        with self._task_condition:
+            self._task_condition.notify_all()
 
     def is_browser_alive(self) -> bool:
         """檢查瀏覽器是否仍然有效。
@@ -2492,6 +2599,58 @@ class ImageDetector:
             self.logger.error(f"瀏覽器圖片檢測失敗: {e}")
             return None
     
+    def detect_many_in_browser(
+        self,
+        driver: WebDriver,
+        template_names: List[str],
+        threshold: float = Constants.MATCH_THRESHOLD
+    ) -> Dict[str, Optional[Tuple[int, int, float]]]:
+        """在瀏覽器中以單次截圖檢測多個模板圖片。
+        
+        只截圖一次，再將所有模板與同一張截圖比對，
+        取代多次呼叫 detect_in_browser 所造成的重複截圖與解碼。
+        模板檔案不存在時該模板結果為 None。
+        
+        參數:
+            driver: WebDriver 實例
+            template_names: 模板圖片檔名列表
+            threshold: 匹配閾值
+            
+        回傳:
+            模板檔名 → 檢測結果的字典，找到為 (x, y, confidence)，未找到為 None
+        """
+        results: Dict[str, Optional[Tuple[int, int, float]]] = {
+            name: None for name in template_names
+        }
+        
+        # 只比對存在的模板，全部不存在時不截圖
+        existing_names = [name for name in template_names if self.template_exists(name)]
+        if not existing_names:
+            return results
+        
+        try:
+            # 檢查瀏覽器是否仍然有效
+            try:
+                _ = driver.current_url
+            except Exception:
+                self.logger.warning("瀏覽器已關閉，無法進行圖片檢測")
+                return results
+            
+            screenshot = self.capture_screenshot(driver)
+        except Exception as e:
+            self.logger.error(f"瀏覽器圖片檢測失敗: {e}")
+            return results
+        
+        for name in existing_names:
+            try:
+                results[name] = self.match_template(
+                    screenshot, self.get_template_path(name), threshold
+                )
+            except Exception as e:
+                self.logger.error(f"瀏覽器圖片檢測失敗 [{name}]: {e}")
+        
+        return results
+    
     def _capture_cropped_template(
         self,
         driver: WebDriver,
@@ -3501,31 +3660,14 @@ class GameControlCenter:
                     if not bt.is_browser_alive() or not bt.context:
                         return (bt.index, False, False, False)
                     try:
-                        driver = bt.context.driver
-                        is_blackscreen = False
-                        is_error = False
-                        is_lobby_return = False
-                        
-                        # 檢測黑屏
-                        if blackscreen_template_exists:
-                            result = self._image_detector.detect_in_browser(
-                                driver, Constants.BLACK_SCREEN
-                            )
-                            is_blackscreen = result is not None
-                        
-                        # 檢測錯誤訊息
-                        if error_template_exists:
-                            result = self._image_detector.detect_in_browser(
-                                driver, Constants.ERROR_REMIND
-                            )
-                            is_error = result is not None
-                        
-                        # 檢測返回大廳
-                        if lobby_return_template_exists:
-                            result = self._image_detector.detect_in_browser(
-                                driver, Constants.LOBBY_RETURN
-                            )
-                            is_lobby_return = result is not None
+                        # 單次截圖同時比對三個模板（不存在的模板自動略過）
+                        results = self._image_detector.detect_many_in_browser(
+                            bt.context.driver,
+                            [Constants.BLACK_SCREEN, Constants.ERROR_REMIND, Constants.LOBBY_RETURN]
+                        )
+                        is_blackscreen = results[Constants.BLACK_SCREEN] is not None
+                        is_error = results[Constants.ERROR_REMIND] is not None
+                        is_lobby_return = results[Constants.LOBBY_RETURN] is not None
                         
                         return (bt.index, is_blackscreen, is_error, is_lobby_return)
                     except Exception:
@@ -4134,25 +4276,19 @@ class GameControlCenter:
             attempt += 1
             
             try:
-                driver = bt.context.driver
-                
-                # 優先檢測 game_confirm（正常流程）
-                if game_confirm_exists:
-                    result = self._image_detector.detect_in_browser(
-                        driver, Constants.GAME_CONFIRM
-                    )
-                    if result is not None:
-                        detected_template = Constants.GAME_CONFIRM
-                        continue
+                # 單次截圖同時比對兩個模板
+                results = self._image_detector.detect_many_in_browser(
+                    bt.context.driver,
+                    [Constants.GAME_CONFIRM, Constants.ERROR_REMIND]
+                )
                 
-                # 再檢測 error_remind
-                if error_remind_exists:
-                    result = self._image_detector.detect_in_browser(
-                        driver, Constants.ERROR_REMIND
-                    )
-                    if result is not None:
-                        detected_template = Constants.ERROR_REMIND
-                        continue
+                # 優先處理 game_confirm（正常流程），其次 error_remind
+                if results[Constants.GAME_CONFIRM] is not None:
+                    detected_template = Constants.GAME_CONFIRM
+                    continue
+                if results[Constants.ERROR_REMIND] is not None:
+                    detected_template = Constants.ERROR_REMIND
+                    continue
                 
             except Exception as e:
                 self.logger.debug(f"瀏覽器 {browser_index} 檢測時發生錯誤: {e}")
@@ -6637,7 +6773,8 @@ class AutoSlotGameAppStarter:
     def execute_on_all_browsers(
         self, 
         func: Callable[[BrowserContext], Any],
-        timeout: Optional[float] = None
+        timeout: Optional[float] = None,
+        priority: int = Constants.TASK_PRIORITY_NORMAL
     ) -> List[Tuple[int, Any, Optional[Exception]]]:
         """在所有瀏覽器上並行執行任務。
         
@@ -6647,6 +6784,7 @@ class AutoSlotGameAppStarter:
         參數:
             func: 要執行的函數，接收 BrowserContext 作為參數。
             timeout: 每個任務的超時時間（秒），None 表示無限等待。
+            priority: 任務優先權（Constants.TASK_PRIORITY_*）。
             
         回傳:
             結果列表，每個元素為 (index, result, error) 元組：
@@ -6663,37 +6801,22 @@ class AutoSlotGameAppStarter:
             ...         print(f"瀏覽器 {idx}: {url}")
         """
         results: List[Tuple[int, Any, Optional[Exception]]] = []
-        pending_threads: List[BrowserThread] = []
+        pending: List[Tuple[BrowserThread, Future]] = []
         
         # 1. 先將任務分發給所有執行緒
         for thread in self.browser_threads:
             if not thread.is_browser_alive():
                 results.append((thread.index, None, RuntimeError("瀏覽器已關閉")))
                 continue
-            
-            # 重置任務完成事件
-            thread._task_done_event.clear()
-            thread._task_result = None
-            
-            # 加入任務佇列
-            with thread._task_lock:
-                thread._task_queue.append((func, (), {}))
-            
-            # 通知執行緒有新任務
-            thread._task_event.set()
-            pending_threads.append(thread)
+            try:
+                pending.append((thread, thread.submit_task(func, priority=priority)))
+            except RuntimeError as e:
+                results.append((thread.index, None, e))
         
         # 2. 等待所有任務完成
-        for thread in pending_threads:
+        for thread, future in pending:
             try:
-                if thread._task_done_event.wait(timeout=timeout):
-                    result = thread._task_result
-                    if isinstance(result, Exception):
-                        results.append((thread.index, None, result))
-                    else:
-                        results.append((thread.index, result, None))
-                else:
-                    results.append((thread.index, None, TimeoutError(f"瀏覽器 {thread.index} 任務執行超時")))
+                results.append((thread.index, thread.wait_task(future, timeout), None))
             except Exception as e:
                 results.append((thread.index, None, e))
         
@@ -0,0 +1,1420 @@
+#!/usr/bin/env python3
+"""
+圖片檢測效能基準測試工具
+
+在不啟動瀏覽器的情況下，量測 main_common.ImageDetector 各處理路徑的耗時，
+用於比較優化前後的差異。
+
+執行方式：
+    python src/vision_benchmark.py decode            # 截圖解碼路徑比較
+    python src/vision_benchmark.py decode -n 50      # 指定每項重複次數
+    python src/vision_benchmark.py formats --frames 截圖資料夾
+    python src/vision_benchmark.py betsize --crops 金額截圖資料夾
+    python src/vision_benchmark.py pyramid --frames 截圖資料夾
+    python src/vision_benchmark.py pool --browsers 16
+    python src/vision_benchmark.py budget --browsers 16 --slots 2,4,8,0
+    python src/vision_benchmark.py corpus                          # 合成語料
+    python src/vision_benchmark.py corpus --corpus 語料資料夾 --output results/v1.json
+    python src/vision_benchmark.py corpus --corpus 語料資料夾 --compare results/v1.json
+    python src/vision_benchmark.py network --log network_logs/browser1_20250101_120000.jsonl
+    python src/vision_benchmark.py tasks --browsers 16 --callers 2
+
+測試項目：
+    decode: 舊版 PIL 解碼路徑 vs ImageDetector.decode_image（600x400 與 Full HD）
+    formats: 以各截圖格式（PNG / JPEG / WebP + 品質）重播已存截圖，
+             比對模板檢測結果是否與 PNG 一致（未指定截圖資料夾時使用合成畫面）
+    betsize: 金額模板逐一比對 vs 逐字元辨識的耗時與正確率
+             （金額截圖檔名為「金額.png」或「金額_編號.png」，未指定時使用合成金額）
+    pyramid: 整張截圖搜尋時，原解析度比對 vs 粗到細金字塔比對的耗時與分數差
+             （未指定截圖資料夾時使用 Full HD 合成畫面）
+    pool: 多瀏覽器同時檢測時，監控執行緒自行解碼比對 vs 視覺處理程序池的吞吐量
+          （每個瀏覽器一張合成畫面，比對錯誤監控的三個模板）
+    budget: 多瀏覽器同時檢測時，各種同時運算上限（VISION_COMPUTE_SLOTS）的
+            每輪耗時、等待名額時間與運算時間，用於決定各機器的設定值
+    corpus: 以已標註的截圖語料（黑屏 / 錯誤訊息 / 返回大廳 / 金額）透過模擬 WebDriver 重播
+            match_template、detect_in_browser、get_current_betsize、_compare_betsize_images，
+            列出各呼叫的耗時百分位數、吞吐量與正確率，可輸出結果檔並與先前版本比較
+            （語料資料夾沒有 labels.json 時建立標註檔範本；未指定語料時使用合成語料）
+    network: 以網路狀態規則離線重播記錄的網路訊息（NETWORK_RECORD_MODE=on 產生），
+             列出會觸發的狀態事件，並比較每則訊息的判斷耗時與單張畫面的檢測耗時
+    tasks: 以模擬 WebDriver 啟動 BrowserThread，多個呼叫者同時提交任務，
+           列出任務佇列的吞吐量、提交到完成的延遲，以及恢復優先權任務插隊時的延遲
+"""
+
+import argparse
+import base64
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from main_common import (
+    BetSizeGlyphReader, BetSizeTemplateBank, BrowserHelper, BrowserThread, CaptureFormat, ComputeBudget,
+    ConfigReader, Constants, ImageDetector, LoggerFactory, NetworkStateClassifier, UserCredential,
+    VisionWorkerPool, cv2_imread_unicode,
+)
+
+
+# =============================================================================
+# 測試設定
+# =============================================================================
+
+# 實際運行的視窗尺寸（寬, 高）
+BENCHMARK_FRAME_SIZES: Dict[str, Tuple[int, int]] = {
+    "600x400": (600, 400),
+    "Full HD": (1920, 1080),
+}
+DEFAULT_ITERATIONS: int = 30
+
+# 格式比較預設清單
+DEFAULT_FORMAT_SPECS: Tuple[str, ...] = (
+    "png", "jpeg:95", "jpeg:90", "jpeg:80", "jpeg:70", "webp:90", "webp:80", "webp:70",
+)
+
+# 監控與登入檢測使用的模板（金額識別固定使用 PNG，不列入比較）
+MONITORED_TEMPLATES: Tuple[str, ...] = (
+    Constants.BLACK_SCREEN,
+    Constants.ERROR_REMIND,
+    Constants.LOBBY_RETURN,
+    Constants.GAME_LOGIN,
+    Constants.GAME_CONFIRM,
+)
+
+
+# =============================================================================
+# 共用工具
+# =============================================================================
+
+def print_step(step: str, description: str) -> None:
+    """列印步驟資訊"""
+    print(f"\n{'='*70}")
+    print(f"[{step}] {description}")
+    print(f"{'='*70}\n")
+
+
+def make_synthetic_frame(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """產生近似遊戲畫面的合成截圖（BGR）。
+
+    以漸層背景、色塊與少量雜訊組成，PNG 壓縮特性接近實際遊戲畫面，
+    避免純雜訊圖片讓 PNG 解碼耗時失真。
+    """
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[..., 0] = (x * 255 // max(1, width - 1)).astype(np.uint8)
+    frame[..., 1] = (y * 255 // max(1, height - 1)).astype(np.uint8)
+    frame[..., 2] = ((x + y) % 256).astype(np.uint8)
+
+    for _ in range(40):
+        x0 = int(rng.integers(0, width - 20))
+        y0 = int(rng.integers(0, height - 20))
+        w = int(rng.integers(10, max(11, width // 6)))
+        h = int(rng.integers(10, max(11, height // 6)))
+        color = tuple(int(c) for c in rng.integers(0, 256, size=3))
+        cv2.rectangle(frame, (x0, y0), (x0 + w, y0 + h), color, -1)
+
+    noise = rng.integers(-8, 9, size=frame.shape, dtype=np.int16)
+    return np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def encode_png_base64(frame: np.ndarray) -> str:
+    """將 BGR 圖片編碼為 WebDriver 回傳格式（PNG base64）"""
+    is_success, buffer = cv2.imencode('.png', frame)
+    if not is_success:
+        raise RuntimeError("PNG 編碼失敗")
+    return base64.b64encode(buffer.tobytes()).decode('ascii')
+
+
+def time_call(func: Callable[[], object], iterations: int) -> List[float]:
+    """重複執行函式並回傳每次耗時（毫秒），先執行一次暖機"""
+    func()
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """已排序資料的百分位數（最近排名法）"""
+    index = min(len(ordered) - 1, int(round(len(ordered) * fraction)) - 1)
+    return ordered[max(0, index)]
+
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    """計算耗時統計（毫秒）"""
+    ordered = sorted(durations)
+    return {
+        "mean": statistics.fmean(ordered),
+        "p50": statistics.median(ordered),
+        "p95": percentile(ordered, 0.95),
+        "p99": percentile(ordered, 0.99),
+    }
+
+
+def print_row(name: str, stats: Dict[str, float], baseline: float = 0.0) -> None:
+    """列印單列統計結果"""
+    speedup = f"{baseline / stats['p50']:.2f}x" if baseline and stats['p50'] else "-"
+    print(
+        f"  {name:<34} p50 {stats['p50']:8.2f} ms   "
+        f"p95 {stats['p95']:8.2f} ms   mean {stats['mean']:8.2f} ms   {speedup:>7}"
+    )
+
+
+# =============================================================================
+# 解碼路徑比較
+# =============================================================================
+
+def legacy_decode_bgr(screenshot_base64: str) -> np.ndarray:
+    """舊版 capture_screenshot 的解碼路徑（base64 → PIL → numpy → BGR）"""
+    screenshot_bytes = base64.b64decode(screenshot_base64)
+    image = Image.open(io.BytesIO(screenshot_bytes))
+    return cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+
+
+def legacy_decode_gray(screenshot_base64: str) -> np.ndarray:
+    """舊版 get_current_betsize 的解碼路徑（PNG → PIL → numpy → 灰階）"""
+    screenshot_bytes = base64.b64decode(screenshot_base64)
+    image = Image.open(io.BytesIO(screenshot_bytes))
+    return cv2.cvtColor(np.array(image), cv2.COLOR_RGB2GRAY)
+
+
+def run_decode_benchmark(iterations: int) -> None:
+    """比較舊版 PIL 解碼與 ImageDetector.decode_image 的耗時"""
+    print_step("解碼", f"截圖解碼路徑比較（每項 {iterations} 次）")
+    detector = ImageDetector(LoggerFactory.get_logger())
+
+    for label, (width, height) in BENCHMARK_FRAME_SIZES.items():
+        frame = make_synthetic_frame(width, height)
+        payload = encode_png_base64(frame)
+
+        # 確認兩種路徑結果一致
+        if not np.array_equal(legacy_decode_bgr(payload), detector.decode_image(payload)):
+            print(f"  ✗ {label}: BGR 解碼結果不一致")
+        gray_diff = np.abs(
+            legacy_decode_gray(payload).astype(np.int16)
+            - detector.decode_image(payload, grayscale=True).astype(np.int16)
+        ).max()
+
+        print(f"{label}（PNG {len(payload) * 3 // 4 // 1024} KB，灰階最大差異 {gray_diff}）")
+        legacy_bgr = summarize(time_call(lambda: legacy_decode_bgr(payload), iterations))
+        print_row("PIL → BGR（舊版）", legacy_bgr)
+        print_row(
+            "decode_image → BGR",
+            summarize(time_call(lambda: detector.decode_image(payload), iterations)),
+            legacy_bgr['p50']
+        )
+        legacy_gray = summarize(time_call(lambda: legacy_decode_gray(payload), iterations))
+        print_row("PIL → 灰階（舊版）", legacy_gray)
+        print_row(
+            "decode_image → 灰階",
+            summarize(time_call(lambda: detector.decode_image(payload, grayscale=True), iterations)),
+            legacy_gray['p50']
+        )
+        bgr_frame = detector.decode_image(payload)
+        print_row(
+            "to_grayscale（重用緩衝區）",
+            summarize(time_call(lambda: detector.to_grayscale(bgr_frame, "bench"), iterations))
+        )
+        print()
+
+
+# =============================================================================
+# 截圖格式準確度報告
+# =============================================================================
+
+def encode_frame(frame: np.ndarray, capture_format: CaptureFormat) -> bytes:
+    """以指定格式編碼截圖（以 OpenCV 編碼器模擬 Chrome 的輸出）"""
+    if capture_format.format == "jpeg":
+        params = [cv2.IMWRITE_JPEG_QUALITY, capture_format.quality]
+        extension = ".jpg"
+    elif capture_format.format == "webp":
+        params = [cv2.IMWRITE_WEBP_QUALITY, capture_format.quality]
+        extension = ".webp"
+    else:
+        params = []
+        extension = ".png"
+    is_success, buffer = cv2.imencode(extension, frame, params)
+    if not is_success:
+        raise RuntimeError(f"{capture_format} 編碼失敗")
+    return buffer.tobytes()
+
+
+def best_match_score(screenshot: np.ndarray, template: np.ndarray) -> float:
+    """回傳模板在截圖中的最高 TM_CCOEFF_NORMED 分數"""
+    if screenshot.shape[0] < template.shape[0] or screenshot.shape[1] < template.shape[1]:
+        return 0.0
+    result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
+    return float(cv2.minMaxLoc(result)[1])
+
+
+def load_replay_frames(frames_dir: Optional[Path]) -> List[Tuple[str, np.ndarray]]:
+    """讀取已存截圖（PNG），回傳 (檔名, BGR 圖片) 列表"""
+    if frames_dir is None:
+        return []
+    frames = []
+    for path in sorted(frames_dir.glob("*.png")):
+        image = cv2_imread_unicode(path, cv2.IMREAD_COLOR)
+        if image is not None:
+            frames.append((path.name, image))
+    return frames
+
+
+def build_synthetic_replay(template_dir: Path) -> Tuple[List[Tuple[str, np.ndarray]], Dict[str, np.ndarray]]:
+    """產生合成截圖與模板（未提供實際截圖時使用）。
+
+    每個模板各產生一張包含該模板的畫面，另加一張不含任何模板的畫面。
+    """
+    width, height = BENCHMARK_FRAME_SIZES["600x400"]
+    rng = np.random.default_rng(1)
+    templates: Dict[str, np.ndarray] = {}
+    frames: List[Tuple[str, np.ndarray]] = []
+
+    for index, name in enumerate(MONITORED_TEMPLATES):
+        # 以平滑後的隨機紋理作為模板，避免與合成背景相似
+        texture = rng.integers(0, 256, size=(40, 90, 3), dtype=np.uint8)
+        template = cv2.GaussianBlur(texture, (5, 5), 0)
+        templates[name] = template
+        cv2.imencode('.png', template)[1].tofile(str(template_dir / name))
+        frame = make_synthetic_frame(width, height, seed=100 + index)
+        frame[150:190, 250:340] = template
+        frames.append((f"synthetic_{index}.png", frame))
+
+    frames.append(("synthetic_empty.png", make_synthetic_frame(width, height, seed=999)))
+    return frames, templates
+
+
+def run_format_report(frames_dir: Optional[Path], format_specs: List[str], threshold: float) -> None:
+    """以各截圖格式重播截圖，比較模板檢測結果與 PNG 是否一致"""
+    print_step("格式", f"截圖格式準確度報告（閾值 {threshold}）")
+    detector = ImageDetector(LoggerFactory.get_logger())
+
+    frames = load_replay_frames(frames_dir)
+    temp_dir: Optional[tempfile.TemporaryDirectory] = None
+    if frames:
+        templates = {
+            name: detector.load_template(detector.get_template_path(name))
+            for name in MONITORED_TEMPLATES if detector.template_exists(name)
+        }
+        print(f"截圖來源: {frames_dir}（{len(frames)} 張），模板: {len(templates)} 個")
+    else:
+        temp_dir = tempfile.TemporaryDirectory()
+        frames, templates = build_synthetic_replay(Path(temp_dir.name))
+        print(f"未提供截圖資料夾，使用合成畫面（{len(frames)} 張）")
+
+    if not templates:
+        print("  ✗ 找不到任何監控模板，請先截取模板")
+        return
+
+    # PNG 基準分數
+    baseline: Dict[Tuple[str, str], float] = {}
+    for frame_name, frame in frames:
+        decoded = detector.decode_image(encode_frame(frame, CaptureFormat()))
+        for template_name, template in templates.items():
+            baseline[(frame_name, template_name)] = best_match_score(decoded, template)
+
+    print()
+    print(f"  {'格式':<10} {'平均大小':>10} {'解碼 p50':>10} {'結果不一致':>10} {'最大分數差':>10} {'最小閾值餘裕':>12}")
+    for spec in format_specs:
+        capture_format = CaptureFormat.parse(spec)
+        sizes, decode_times = [], []
+        mismatches = 0
+        max_delta = 0.0
+        min_margin = 1.0
+
+        for frame_name, frame in frames:
+            payload = encode_frame(frame, capture_format)
+            sizes.append(len(payload))
+            start = time.perf_counter()
+            decoded = detector.decode_image(payload)
+            decode_times.append((time.perf_counter() - start) * 1000)
+
+            for template_name, template in templates.items():
+                score = best_match_score(decoded, template)
+                base_score = baseline[(frame_name, template_name)]
+                if (score >= threshold) != (base_score >= threshold):
+                    mismatches += 1
+                max_delta = max(max_delta, abs(score - base_score))
+                min_margin = min(min_margin, abs(score - threshold))
+
+        print(
+            f"  {str(capture_format):<10} {statistics.fmean(sizes) / 1024:>8.1f}KB "
+            f"{statistics.median(decode_times):>8.2f}ms {mismatches:>10} "
+            f"{max_delta:>10.4f} {min_margin:>12.4f}"
+        )
+
+    print()
+    print("  結果不一致為 0 且閾值餘裕足夠的最便宜格式，即可設定於 用戶設定.txt")
+    if temp_dir is not None:
+        temp_dir.cleanup()
+
+
+# =============================================================================
+# 金額識別比較
+# =============================================================================
+
+# 合成金額顯示區域尺寸（寬, 高）：模板為中央 1 倍邊距，識別區域為 2 倍邊距
+SYNTHETIC_BETSIZE_AREA: Tuple[int, int] = (
+    Constants.BETSIZE_CROP_MARGIN_X * 5, Constants.BETSIZE_CROP_MARGIN_Y * 5
+)
+
+
+def render_betsize(label: str, seed: int) -> np.ndarray:
+    """以 OpenCV 字型繪製金額顯示區域（灰階），加入少量雜訊"""
+    width, height = SYNTHETIC_BETSIZE_AREA
+    rng = np.random.default_rng(seed)
+    area = np.full((height, width), 35, dtype=np.uint8)
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    (text_w, text_h), _ = cv2.getTextSize(label, font, 0.5, 1)
+    origin = ((width - text_w) // 2, (height + text_h) // 2)
+    cv2.putText(area, label, origin, font, 0.5, 235, 1, cv2.LINE_AA)
+    noise = rng.normal(0, 3, size=area.shape)
+    return np.clip(area.astype(np.float64) + noise, 0, 255).astype(np.uint8)
+
+
+def crop_center(area: np.ndarray, margin_x: int, margin_y: int) -> np.ndarray:
+    """以中心點與邊距裁切（與 _get_betsize_crop_region 相同）"""
+    center_y, center_x = area.shape[0] // 2, area.shape[1] // 2
+    return area[center_y - margin_y:center_y + margin_y, center_x - margin_x:center_x + margin_x]
+
+
+def format_amount(amount: float) -> str:
+    """金額標籤（與金額模板檔名相同）"""
+    return str(int(amount)) if float(amount).is_integer() else str(amount)
+
+
+def build_synthetic_betsize(
+    template_dir: Path,
+    template_amounts: Tuple[float, ...]
+) -> List[Tuple[str, np.ndarray]]:
+    """產生合成金額模板與識別區域截圖，回傳 (正確金額標籤, 識別區域) 列表"""
+    margin_x, margin_y = Constants.BETSIZE_CROP_MARGIN_X, Constants.BETSIZE_CROP_MARGIN_Y
+    template_dir.mkdir(parents=True, exist_ok=True)
+    for amount in template_amounts:
+        label = format_amount(amount)
+        template = crop_center(render_betsize(label, seed=int(amount * 10)), margin_x, margin_y)
+        cv2.imencode('.png', template)[1].tofile(str(template_dir / f"{label}.png"))
+
+    crops = []
+    for index, amount in enumerate(Constants.GAME_BETSIZE):
+        label = format_amount(amount)
+        area = render_betsize(label, seed=10000 + index)
+        crops.append((label, crop_center(area, margin_x * 2, margin_y * 2)))
+    return crops
+
+
+def load_betsize_crops(crops_dir: Path) -> List[Tuple[str, np.ndarray]]:
+    """讀取金額截圖（灰階），檔名「金額.png」或「金額_編號.png」"""
+    crops = []
+    for path in sorted(crops_dir.glob("*.png")):
+        image = cv2_imread_unicode(path, cv2.IMREAD_GRAYSCALE)
+        if image is not None:
+            crops.append((path.stem.split("_")[0], image))
+    return crops
+
+
+def evaluate_reader(
+    read: Callable[[np.ndarray], Tuple[Optional[str], float]],
+    crops: List[Tuple[str, np.ndarray]],
+    iterations: int
+) -> Tuple[Dict[str, float], int, int]:
+    """量測識別耗時，回傳 (耗時統計, 正確數, 未識別數)"""
+    durations: List[float] = []
+    correct = unread = 0
+    for label, crop in crops:
+        durations.extend(time_call(lambda: read(crop), iterations))
+        text, _ = read(crop)
+        if text is None:
+            unread += 1
+        elif float(text) == float(label):
+            correct += 1
+    return summarize(durations), correct, unread
+
+
+def run_betsize_benchmark(crops_dir: Optional[Path], templates_dir: Optional[Path], iterations: int) -> None:
+    """比較金額模板逐一比對與逐字元辨識"""
+    print_step("金額", "金額模板逐一比對 vs 逐字元辨識")
+    logger = LoggerFactory.get_logger()
+    temp_dir: Optional[tempfile.TemporaryDirectory] = None
+    readers: List[Tuple[str, BetSizeTemplateBank]] = []
+
+    if crops_dir is not None:
+        crops = load_betsize_crops(crops_dir)
+        if templates_dir is None:
+            templates_dir = ImageDetector(logger).betsize_bank.bet_size_dir
+        readers.append(("金額模板", BetSizeTemplateBank(templates_dir, logger)))
+        print(f"金額截圖: {crops_dir}（{len(crops)} 張），金額模板: {templates_dir}")
+    else:
+        temp_dir = tempfile.TemporaryDirectory()
+        root = Path(temp_dir.name)
+        crops = build_synthetic_betsize(root / "all", Constants.GAME_BETSIZE)
+        build_synthetic_betsize(root / "digits", tuple(range(1, 11)))
+        readers.append(("全部金額模板", BetSizeTemplateBank(root / "all", logger)))
+        readers.append(("僅 1-10 金額模板", BetSizeTemplateBank(root / "digits", logger)))
+        print(f"未提供金額截圖，使用合成金額（{len(crops)} 個金額）")
+
+    if not crops:
+        print("  ✗ 找不到任何金額截圖")
+        return
+
+    for source_name, bank in readers:
+        bank.refresh()
+        if not bank.amounts:
+            print(f"  ✗ {source_name}: 沒有可用的金額模板")
+            continue
+        glyph_reader = BetSizeGlyphReader(bank, logger)
+
+        scan_stats, scan_correct, scan_unread = evaluate_reader(bank.match, crops, iterations)
+        glyph_stats, glyph_correct, glyph_unread = evaluate_reader(glyph_reader.read, crops, iterations)
+
+        print()
+        print(f"  {source_name}（字元庫: {''.join(glyph_reader.known_chars) or '(空)'}）")
+        print_row("逐一比對", scan_stats)
+        print(f"    正確 {scan_correct}/{len(crops)}，未識別 {scan_unread}")
+        print_row("逐字元辨識", glyph_stats, scan_stats['p50'])
+        print(f"    正確 {glyph_correct}/{len(crops)}，未識別 {glyph_unread}")
+
+    print()
+    print(f"  共 {len(crops)} 張；逐字元辨識耗時與金額數量無關")
+    if temp_dir is not None:
+        temp_dir.cleanup()
+
+
+# =============================================================================
+# 金字塔比對比較
+# =============================================================================
+
+def build_synthetic_fullhd_replay(
+    template_dir: Path,
+    count: int = 6
+) -> Tuple[List[Tuple[str, np.ndarray]], Dict[str, np.ndarray]]:
+    """產生 Full HD 合成畫面與登入階段大小的模板，半數畫面包含模板"""
+    width, height = BENCHMARK_FRAME_SIZES["Full HD"]
+    rng = np.random.default_rng(2)
+    texture = rng.integers(0, 256, size=(120, 260, 3), dtype=np.uint8)
+    template = cv2.GaussianBlur(texture, (9, 9), 0)
+    name = Constants.GAME_LOGIN
+    cv2.imencode('.png', template)[1].tofile(str(template_dir / name))
+
+    frames = []
+    for index in range(count):
+        frame = make_synthetic_frame(width, height, seed=200 + index)
+        if index % 2 == 0:
+            x = int(rng.integers(0, width - template.shape[1]))
+            y = int(rng.integers(0, height - template.shape[0]))
+            frame[y:y + template.shape[0], x:x + template.shape[1]] = template
+        frames.append((f"synthetic_fullhd_{index}.png", frame))
+    return frames, {name: template}
+
+
+def run_pyramid_benchmark(frames_dir: Optional[Path], iterations: int, threshold: float) -> None:
+    """比較整張截圖搜尋時原解析度比對與金字塔比對"""
+    print_step("金字塔", f"原解析度比對 vs 粗到細金字塔比對（閾值 {threshold}）")
+    detector = ImageDetector(LoggerFactory.get_logger())
+
+    frames = load_replay_frames(frames_dir)
+    temp_dir: Optional[tempfile.TemporaryDirectory] = None
+    if frames:
+        template_paths = {
+            name: detector.get_template_path(name)
+            for name in MONITORED_TEMPLATES if detector.template_exists(name)
+        }
+        print(f"截圖來源: {frames_dir}（{len(frames)} 張），模板: {len(template_paths)} 個")
+    else:
+        temp_dir = tempfile.TemporaryDirectory()
+        frames, templates = build_synthetic_fullhd_replay(Path(temp_dir.name))
+        template_paths = {name: Path(temp_dir.name) / name for name in templates}
+        print(f"未提供截圖資料夾，使用 Full HD 合成畫面（{len(frames)} 張）")
+
+    if not template_paths:
+        print("  ✗ 找不到任何模板，請先截取模板")
+        return
+
+    original_enabled = Constants.PYRAMID_MATCH_ENABLED
+    try:
+        for template_name, template_path in template_paths.items():
+            pyramid = detector.get_template_pyramid(template_path)
+            if not pyramid:
+                print(f"\n  {template_name}: 模板過小，不使用金字塔比對")
+                continue
+
+            full_times: List[float] = []
+            pyramid_times: List[float] = []
+            mismatches = 0
+            max_delta = 0.0
+            for _, frame in frames:
+                Constants.PYRAMID_MATCH_ENABLED = False
+                full_times.extend(time_call(
+                    lambda: detector.match_template(frame, template_path, threshold), iterations
+                ))
+                full_result = detector.match_template(frame, template_path, threshold)
+
+                Constants.PYRAMID_MATCH_ENABLED = True
+                pyramid_times.extend(time_call(
+                    lambda: detector.match_template(frame, template_path, threshold), iterations
+                ))
+                pyramid_result = detector.match_template(frame, template_path, threshold)
+
+                if (full_result is None) != (pyramid_result is None):
+                    mismatches += 1
+                elif full_result is not None and pyramid_result is not None:
+                    max_delta = max(max_delta, abs(full_result[2] - pyramid_result[2]))
+
+            full_stats = summarize(full_times)
+            factor = next(f for f in Constants.PYRAMID_FACTORS if f in pyramid)
+            print(f"\n  {template_name}（縮小倍率 {factor}x，畫面 {frames[0][1].shape[1]}x{frames[0][1].shape[0]}）")
+            print_row("原解析度比對", full_stats)
+            print_row("金字塔比對", summarize(pyramid_times), full_stats['p50'])
+            print(f"    檢測結果不一致 {mismatches}/{len(frames)}，最大分數差 {max_delta:.4f}")
+    finally:
+        Constants.PYRAMID_MATCH_ENABLED = original_enabled
+
+    print()
+    print(f"  分數差應小於 PYRAMID_SCORE_TOLERANCE（{Constants.PYRAMID_SCORE_TOLERANCE}），且結果不一致為 0")
+    if temp_dir is not None:
+        temp_dir.cleanup()
+
+
+# =============================================================================
+# 視覺處理程序池比較
+# =============================================================================
+
+# 錯誤監控比對的模板
+POOL_TEMPLATES: Tuple[str, ...] = (
+    Constants.BLACK_SCREEN,
+    Constants.ERROR_REMIND,
+    Constants.LOBBY_RETURN,
+)
+
+
+def build_synthetic_fleet(
+    template_dir: Path,
+    browsers: int,
+    frame_size: Tuple[int, int]
+) -> List[bytes]:
+    """產生錯誤監控模板與每個瀏覽器一張的合成畫面（PNG 位元組），約三分之一的畫面包含模板"""
+    width, height = frame_size
+    rng = np.random.default_rng(3)
+    templates = []
+    for name in POOL_TEMPLATES:
+        texture = rng.integers(0, 256, size=(60, 120, 3), dtype=np.uint8)
+        template = cv2.GaussianBlur(texture, (5, 5), 0)
+        cv2.imencode('.png', template)[1].tofile(str(template_dir / name))
+        templates.append(template)
+
+    frames = []
+    for index in range(browsers):
+        frame = make_synthetic_frame(width, height, seed=300 + index)
+        if index % 3 == 0:
+            template = templates[index % len(templates)]
+            x = int(rng.integers(0, width - template.shape[1]))
+            y = int(rng.integers(0, height - template.shape[0]))
+            frame[y:y + template.shape[0], x:x + template.shape[1]] = template
+        frames.append(cv2.imencode('.png', frame)[1].tobytes())
+    return frames
+
+
+def run_fleet_round(
+    executor: ThreadPoolExecutor,
+    frames: List[bytes],
+    detect: Callable[[bytes], Dict[str, Optional[Tuple[int, int, float]]]]
+) -> Tuple[float, List[Dict[str, Optional[Tuple[int, int, float]]]]]:
+    """模擬一輪監控：所有瀏覽器同時檢測，回傳 (整輪耗時毫秒, 各瀏覽器結果)"""
+    start = time.perf_counter()
+    results = list(executor.map(detect, frames))
+    return (time.perf_counter() - start) * 1000, results
+
+
+def run_pool_benchmark(browsers: int, workers: int, rounds: int, size_name: str, threshold: float) -> None:
+    """比較監控執行緒自行解碼比對與視覺處理程序池的吞吐量"""
+    frame_size = BENCHMARK_FRAME_SIZES[size_name]
+    print_step("程序池", f"{browsers} 個瀏覽器同時檢測（{size_name}，{rounds} 輪）")
+    detector = ImageDetector(LoggerFactory.get_logger())
+
+    with tempfile.TemporaryDirectory() as temp_name:
+        detector.image_dir = Path(temp_name)
+        frames = build_synthetic_fleet(detector.image_dir, browsers, frame_size)
+        names = list(POOL_TEMPLATES)
+        no_regions = {name: None for name in names}
+
+        def detect_threaded(data: bytes) -> Dict[str, Optional[Tuple[int, int, float]]]:
+            screenshot = detector.decode_image(data)
+            return detector._match_templates_in_frame(
+                screenshot, names, no_regions, (0, 0), False, threshold, None
+            )
+
+        request = {
+            'image_dir': str(detector.image_dir),
+            'names': names,
+            'regions': no_regions,
+            'geometry': None,
+            'offset': (0, 0),
+            'is_clipped': False,
+            'threshold': threshold,
+            'canvas_size': None,
+            'full_frame_fallback': False,
+        }
+        pool = VisionWorkerPool(workers, LoggerFactory.get_logger())
+        pool.start()
+        try:
+            with ThreadPoolExecutor(max_workers=browsers) as executor:
+                thread_durations: List[float] = []
+                pool_durations: List[float] = []
+                mismatches = 0
+                # 暖機（模板快取、工作程序內模板載入）
+                run_fleet_round(executor, frames, detect_threaded)
+                run_fleet_round(executor, frames, lambda data: pool.match(data, request))
+                for _ in range(rounds):
+                    duration, thread_results = run_fleet_round(executor, frames, detect_threaded)
+                    thread_durations.append(duration)
+                    duration, pool_results = run_fleet_round(
+                        executor, frames, lambda data: pool.match(data, request)
+                    )
+                    pool_durations.append(duration)
+                    mismatches += sum(
+                        1 for a, b in zip(thread_results, pool_results)
+                        if {k: v is None for k, v in a.items()} != {k: v is None for k, v in b.items()}
+                    )
+            stats = pool.get_stats()
+        finally:
+            pool.shutdown()
+
+    thread_stats = summarize(thread_durations)
+    pool_stats = summarize(pool_durations)
+    print(f"  工作程序: {pool.max_workers} 個，畫面 {frame_size[0]}x{frame_size[1]}，模板 {len(names)} 個")
+    print_row("監控執行緒自行比對（每輪）", thread_stats)
+    print_row("視覺處理程序池（每輪）", pool_stats, thread_stats['p50'])
+    print()
+    print(f"  吞吐量: 執行緒 {browsers * 1000 / thread_stats['mean']:.1f} 張/秒，"
+          f"程序池 {browsers * 1000 / pool_stats['mean']:.1f} 張/秒")
+    print(f"  程序池單次: 往返 {stats['avg_roundtrip_ms']:.2f} ms，"
+          f"工作程序處理 {stats['avg_compute_ms']:.2f} ms，"
+          f"排隊與傳輸 {stats['avg_overhead_ms']:.2f} ms")
+    print(f"  檢測結果不一致 {mismatches}/{browsers * rounds}")
+
+
+# =============================================================================
+# 影像運算資源比較
+# =============================================================================
+
+def run_budget_benchmark(
+    browsers: int,
+    slot_options: List[int],
+    rounds: int,
+    size_name: str,
+    threshold: float
+) -> None:
+    """比較各種同時運算上限下，多瀏覽器同時檢測的耗時與等待時間"""
+    frame_size = BENCHMARK_FRAME_SIZES[size_name]
+    cores = os.cpu_count() or 1
+    print_step("運算資源", f"{browsers} 個瀏覽器同時檢測（{size_name}，{rounds} 輪，CPU 核心 {cores}）")
+    detector = ImageDetector(LoggerFactory.get_logger())
+    original_budget = detector.compute_budget
+
+    with tempfile.TemporaryDirectory() as temp_name:
+        detector.image_dir = Path(temp_name)
+        frames = build_synthetic_fleet(detector.image_dir, browsers, frame_size)
+        names = list(POOL_TEMPLATES)
+        no_regions = {name: None for name in names}
+
+        def detect(data: bytes) -> Dict[str, Optional[Tuple[int, int, float]]]:
+            screenshot = detector.decode_image(data)
+            return detector._match_templates_in_frame(
+                screenshot, names, no_regions, (0, 0), False, threshold, None
+            )
+
+        baseline = 0.0
+        try:
+            with ThreadPoolExecutor(max_workers=browsers) as executor:
+                for slots in slot_options:
+                    budget = ComputeBudget(slots, logger=LoggerFactory.get_logger())
+                    budget.apply_opencv_threads()
+                    detector.compute_budget = budget
+                    run_fleet_round(executor, frames, detect)
+                    budget.reset_stats()
+                    durations = [run_fleet_round(executor, frames, detect)[0] for _ in range(rounds)]
+                    stats = summarize(durations)
+                    budget_stats = budget.get_stats()
+                    label = f"上限 {budget.slots}（OpenCV {budget.opencv_threads} 執行緒）"
+                    print_row(label, stats, baseline)
+                    print(
+                        f"    {'':<32} 等待 {budget_stats['avg_wait_ms']:7.2f} ms   "
+                        f"運算 {budget_stats['avg_compute_ms']:7.2f} ms   "
+                        f"等待佔比 {budget_stats['wait_ratio']:5.0%}   "
+                        f"最高同時 {budget_stats['peak_active']}"
+                    )
+                    baseline = baseline or stats['p50']
+        finally:
+            detector.compute_budget = original_budget
+            original_budget.apply_opencv_threads()
+
+    print()
+    print("  每輪耗時最低的上限即為建議的 VISION_COMPUTE_SLOTS；")
+    print("  等待佔比高但每輪耗時沒有下降，代表 CPU 已飽和，提高上限無益")
+
+
+# =============================================================================
+# 瀏覽器任務佇列
+# =============================================================================
+
+class FakeTaskDriver:
+    """模擬 WebDriver（只提供 BrowserThread 存活檢查與關閉需要的屬性）"""
+
+    current_url = "about:blank"
+
+    def quit(self) -> None:
+        """模擬關閉瀏覽器"""
+
+
+class FakeBrowserManager:
+    """模擬 BrowserManager，建立 FakeTaskDriver"""
+
+    def create_webdriver(self, local_proxy_port: Optional[int] = None) -> FakeTaskDriver:
+        """建立模擬 WebDriver"""
+        return FakeTaskDriver()
+
+
+def start_fake_browser_threads(count: int) -> List[BrowserThread]:
+    """啟動以模擬 WebDriver 運作的 BrowserThread"""
+    threads = []
+    for index in range(1, count + 1):
+        thread = BrowserThread(
+            index=index,
+            credential=UserCredential(username=f"bench{index}", password="bench"),
+            browser_manager=FakeBrowserManager(),
+            logger=LoggerFactory.get_logger()
+        )
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        if not thread.wait_until_ready(timeout=5):
+            raise RuntimeError(f"瀏覽器 {thread.index} 無法啟動")
+    return threads
+
+
+def run_task_queue_benchmark(browsers: int, callers: int, tasks: int, work_ms: float) -> None:
+    """多個呼叫者同時對每個瀏覽器提交任務，量測佇列吞吐量與延遲"""
+    print_step(
+        "任務佇列",
+        f"{browsers} 個瀏覽器，每個瀏覽器 {callers} 個呼叫者各提交 {tasks} 個任務（每個任務 {work_ms:.1f} ms）"
+    )
+    threads = start_fake_browser_threads(browsers)
+    work_seconds = work_ms / 1000
+
+    def task(context, caller: int, sequence: int) -> Tuple[int, int, int]:
+        time.sleep(work_seconds)
+        return (context.index, caller, sequence)
+
+    def run_caller(thread: BrowserThread, caller: int) -> Tuple[List[float], int]:
+        latencies = []
+        mixed = 0
+        for sequence in range(tasks):
+            start = time.perf_counter()
+            result = thread.execute_task(task, caller, sequence, timeout=30)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if result != (thread.index, caller, sequence):
+                mixed += 1
+        return latencies, mixed
+
+    try:
+        latencies: List[float] = []
+        mixed = 0
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=browsers * callers) as executor:
+            futures = [
+                executor.submit(run_caller, thread, caller)
+                for thread in threads for caller in range(callers)
+            ]
+            for future in futures:
+                caller_latencies, caller_mixed = future.result()
+                latencies.extend(caller_latencies)
+                mixed += caller_mixed
+        elapsed = time.perf_counter() - start
+
+        total = browsers * callers * tasks
+        print_row("execute_task 提交到完成", summarize(latencies))
+        print(f"  吞吐量 {total / elapsed:,.0f} 任務/秒（{total} 個任務，{elapsed:.2f} 秒）")
+        print(f"  理論下限 {tasks * callers * work_ms:.0f} ms（每個瀏覽器依序執行），實際 {elapsed * 1000:.0f} ms")
+        print(f"  結果錯置 {mixed}/{total}")
+
+        # 恢復任務插隊：先排入一批一般任務，再提交一個恢復優先權任務
+        backlog = 10
+        thread = threads[0]
+        normal = [thread.submit_task(task, 0, sequence) for sequence in range(backlog)]
+        start = time.perf_counter()
+        thread.execute_task(task, 1, 0, priority=Constants.TASK_PRIORITY_RECOVERY, timeout=30)
+        recovery_ms = (time.perf_counter() - start) * 1000
+        for future in normal:
+            thread.wait_task(future, timeout=30)
+        print(
+            f"  排隊 {backlog} 個一般任務時，恢復任務延遲 {recovery_ms:.1f} ms"
+            f"（依序執行約 {(backlog + 1) * work_ms:.0f} ms）"
+        )
+
+        stats = [t.get_task_stats() for t in threads]
+        print(
+            f"  佇列等待 平均 {statistics.fmean(s['avg_wait_ms'] for s in stats):.2f} ms   "
+            f"最長 {max(s['max_wait_ms'] for s in stats):.2f} ms   "
+            f"最多排隊 {max(s['peak_depth'] for s in stats)}"
+        )
+    finally:
+        for thread in threads:
+            thread.stop()
+        for thread in threads:
+            thread.join(timeout=5)
+
+
+# =============================================================================
+# 網路狀態重播
+# =============================================================================
+
+def run_network_replay(log_path: Path, rules_path: Path, iterations: int, threshold: float) -> None:
+    """以網路狀態規則重播記錄的訊息，並比較判斷耗時與畫面檢測耗時"""
+    print_step("網路狀態", f"重播 {log_path.name}（規則 {rules_path}）")
+    rules = ConfigReader(lib_path=rules_path.parent, logger=LoggerFactory.get_logger()).read_network_rules(
+        rules_path.name
+    )
+    if not rules:
+        print(f"  {rules_path} 沒有有效規則")
+        return
+    classifier = NetworkStateClassifier(rules)
+    entries = NetworkStateClassifier.read_frame_log(log_path)
+    if not entries:
+        print(f"  {log_path} 沒有可重播的訊息")
+        return
+
+    events = classifier.replay(entries)
+    start_time = float(entries[0].get('t', 0.0))
+    for event in events:
+        print(f"  +{event.timestamp - start_time:9.3f}s  {event.state:<13} {event.source:<6} {event.excerpt}")
+
+    counts = {state: sum(1 for event in events if event.state == state) for state in Constants.NETWORK_STATES}
+    source_counts = {
+        source: sum(1 for entry in entries if entry['source'] == source) for source in Constants.NETWORK_SOURCES
+    }
+    print()
+    print(
+        f"  訊息 {len(entries)} 則（" + "，".join(f"{k} {v}" for k, v in source_counts.items()) + "），"
+        f"狀態事件 {len(events)} 次（" + "，".join(f"{k} {v}" for k, v in counts.items() if v) + "）"
+    )
+
+    # 每則訊息的判斷耗時 vs 單張 600x400 畫面的三模板檢測耗時
+    per_message = summarize([
+        duration / len(entries)
+        for duration in time_call(lambda: [classifier.classify(e['source'], str(e['data'])) for e in entries], iterations)
+    ])
+    detector = ImageDetector(LoggerFactory.get_logger())
+    with tempfile.TemporaryDirectory() as temp_name:
+        detector.image_dir = Path(temp_name)
+        data = build_synthetic_fleet(detector.image_dir, 1, BENCHMARK_FRAME_SIZES["600x400"])[0]
+        names = list(POOL_TEMPLATES)
+        no_regions = {name: None for name in names}
+        per_frame = summarize(time_call(
+            lambda: detector._match_templates_in_frame(
+                detector.decode_image(data), names, no_regions, (0, 0), False, threshold, None
+            ),
+            iterations
+        ))
+    print()
+    print_row("畫面檢測（每張）", per_frame)
+    print_row("網路訊息判斷（每則）", per_message, per_frame['p50'])
+
+
+# =============================================================================
+# 檢測語料重播
+# =============================================================================
+
+CORPUS_LABELS_FILE: str = "labels.json"
+
+# 標註鍵 → 監控模板
+CORPUS_TEMPLATE_LABELS: Dict[str, str] = {
+    "black_screen": Constants.BLACK_SCREEN,
+    "error": Constants.ERROR_REMIND,
+    "lobby_return": Constants.LOBBY_RETURN,
+}
+
+# 量測的呼叫（報告與結果檔的順序）
+CORPUS_CALLS: Tuple[str, ...] = (
+    "match_template", "detect_in_browser", "get_current_betsize", "_compare_betsize_images",
+)
+
+
+class ReplayDriver:
+    """以已存截圖模擬 WebDriver，只實作 ImageDetector 檢測與金額識別會呼叫的方法"""
+
+    def __init__(
+        self,
+        png: bytes,
+        frame: np.ndarray,
+        canvas: Dict[str, float],
+        dpr: float,
+        session_id: str
+    ) -> None:
+        self.session_id = session_id
+        self.current_url = f"replay://{session_id}"
+        self.capabilities: Dict[str, object] = {}
+        self._png = png
+        self._frame = frame
+        self._canvas = dict(canvas)
+        self._dpr = dpr
+        self._viewport = (frame.shape[1] / dpr, frame.shape[0] / dpr)
+
+    def get_screenshot_as_png(self) -> bytes:
+        """整窗截圖（原始檔案位元組）"""
+        return self._png
+
+    def execute_script(self, script: str, *args: object) -> object:
+        """Canvas 位置、視窗尺寸查詢"""
+        if script == BrowserHelper.JS_GET_CANVAS_GEOMETRY % Constants.GAME_CANVAS:
+            return {**self._canvas, "vw": self._viewport[0], "vh": self._viewport[1], "dpr": self._dpr}
+        if script == BrowserHelper.JS_GET_CANVAS_RECT % Constants.GAME_CANVAS:
+            return dict(self._canvas)
+        if "innerWidth" in script:
+            return self._viewport[0]
+        if "innerHeight" in script:
+            return self._viewport[1]
+        return None
+
+    def execute_cdp_cmd(self, cmd: str, params: Dict[str, object]) -> Dict[str, str]:
+        """Page.captureScreenshot：由已存截圖裁切 clip 並以指定格式編碼"""
+        if cmd != "Page.captureScreenshot":
+            return {}
+        image = self._frame
+        clip = params.get("clip")
+        if clip:
+            left = int(round(clip["x"] * self._dpr))
+            top = int(round(clip["y"] * self._dpr))
+            right = int(round((clip["x"] + clip["width"]) * self._dpr))
+            bottom = int(round((clip["y"] + clip["height"]) * self._dpr))
+            image = image[max(0, top):bottom, max(0, left):right]
+            scale = float(clip.get("scale", 1.0))
+            if scale != 1.0:
+                image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        image_format = params.get("format", "png")
+        if image_format == "png":
+            buffer = cv2.imencode('.png', image)[1]
+        elif image_format == "webp":
+            buffer = cv2.imencode('.webp', image, [cv2.IMWRITE_WEBP_QUALITY, int(params.get("quality", 80))])[1]
+        else:
+            buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, int(params.get("quality", 80))])[1]
+        return {"data": base64.b64encode(buffer.tobytes()).decode('ascii')}
+
+
+def write_corpus_skeleton(corpus_dir: Path) -> None:
+    """為資料夾中的截圖建立標註檔範本（null 表示未標註，不列入正確率）"""
+    skeleton = {
+        "canvas": None,
+        "dpr": 1.0,
+        "frames": {
+            path.name: {**{key: None for key in CORPUS_TEMPLATE_LABELS}, "betsize": None}
+            for path in sorted(corpus_dir.glob("*.png"))
+        },
+    }
+    with open(corpus_dir / CORPUS_LABELS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(skeleton, f, ensure_ascii=False, indent=2)
+
+
+def load_corpus(corpus_dir: Path) -> List[Dict[str, object]]:
+    """讀取檢測語料（截圖 + labels.json）
+
+    labels.json 格式：
+        {
+          "canvas": {"x": 0, "y": 0, "w": 600, "h": 400},   // Canvas 位置（CSS 像素），null 表示整個視窗
+          "dpr": 1.0,
+          "frames": {
+            "001.png": {"black_screen": false, "error": true, "lobby_return": false, "betsize": 2},
+            ...
+          }
+        }
+    單張截圖可另外指定 canvas / dpr；標註為 null 或省略的項目不列入正確率
+    """
+    with open(corpus_dir / CORPUS_LABELS_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    default_dpr = float(data.get("dpr") or 1.0)
+    corpus = []
+    for name, labels in data.get("frames", {}).items():
+        path = corpus_dir / name
+        if not path.exists():
+            print(f"  ✗ 找不到截圖: {path}")
+            continue
+        png = path.read_bytes()
+        frame = cv2.imdecode(np.frombuffer(png, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            print(f"  ✗ 無法解碼截圖: {path}")
+            continue
+        dpr = float(labels.get("dpr") or default_dpr)
+        canvas = labels.get("canvas") or data.get("canvas") or {
+            "x": 0, "y": 0, "w": frame.shape[1] / dpr, "h": frame.shape[0] / dpr
+        }
+        corpus.append({"name": name, "png": png, "frame": frame, "labels": labels, "canvas": canvas, "dpr": dpr})
+    return corpus
+
+
+def build_synthetic_corpus(corpus_dir: Path, template_dir: Path, frames: int = 24) -> None:
+    """產生合成檢測語料：監控模板、金額模板與已標註的 600x400 畫面
+
+    每四張畫面依序為：無提示、黑屏、錯誤訊息、返回大廳（模板放在 ROI 中心附近），
+    每張畫面的金額顯示區域繪製不同金額
+    """
+    width, height = BENCHMARK_FRAME_SIZES["600x400"]
+    rng = np.random.default_rng(19)
+    templates: Dict[str, np.ndarray] = {}
+    for name in CORPUS_TEMPLATE_LABELS.values():
+        texture = rng.integers(0, 256, size=(60, 120, 3), dtype=np.uint8)
+        templates[name] = cv2.GaussianBlur(texture, (5, 5), 0)
+        cv2.imencode('.png', templates[name])[1].tofile(str(template_dir / name))
+    build_synthetic_betsize(template_dir / Constants.BETSIZE_TEMPLATE_DIR, Constants.GAME_BETSIZE)
+
+    label_keys = [None] + list(CORPUS_TEMPLATE_LABELS)
+    labels: Dict[str, Dict[str, object]] = {}
+    for index in range(frames):
+        frame = make_synthetic_frame(width, height, seed=1900 + index)
+        planted = label_keys[index % len(label_keys)]
+        if planted is not None:
+            template_name = CORPUS_TEMPLATE_LABELS[planted]
+            template = templates[template_name]
+            center_x, center_y = Constants.TEMPLATE_ROI[template_name][:2]
+            x = int(width * center_x - template.shape[1] / 2 + rng.integers(-15, 16))
+            y = int(height * center_y - template.shape[0] / 2 + rng.integers(-15, 16))
+            frame[y:y + template.shape[0], x:x + template.shape[1]] = template
+
+        amount = Constants.GAME_BETSIZE[index % len(Constants.GAME_BETSIZE)]
+        area = cv2.cvtColor(render_betsize(format_amount(amount), seed=20000 + index), cv2.COLOR_GRAY2BGR)
+        x = int(width * Constants.BETSIZE_DISPLAY_X) - area.shape[1] // 2
+        y = int(height * Constants.BETSIZE_DISPLAY_Y) - area.shape[0] // 2
+        frame[y:y + area.shape[0], x:x + area.shape[1]] = area
+
+        name = f"{index:03d}.png"
+        cv2.imencode('.png', frame)[1].tofile(str(corpus_dir / name))
+        labels[name] = {**{key: key == planted for key in CORPUS_TEMPLATE_LABELS}, "betsize": amount}
+
+    with open(corpus_dir / CORPUS_LABELS_FILE, 'w', encoding='utf-8') as f:
+        json.dump({"canvas": None, "dpr": 1.0, "frames": labels}, f, ensure_ascii=False, indent=2)
+
+
+def measure_call(func: Callable[[], object], iterations: int) -> Tuple[object, List[float]]:
+    """執行一次取得結果（兼作暖機），再重複量測耗時（毫秒）"""
+    result = func()
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return result, durations
+
+
+def evaluate_corpus(
+    detector: ImageDetector,
+    corpus: List[Dict[str, object]],
+    iterations: int,
+    threshold: float
+) -> Tuple[Dict[str, Dict[str, object]], List[Dict[str, object]]]:
+    """以語料量測各呼叫的耗時與正確率，回傳 (各呼叫統計, 結果不符清單)"""
+    durations: Dict[str, List[float]] = {call: [] for call in CORPUS_CALLS}
+    counts: Dict[str, Dict[str, int]] = {call: {"labelled": 0, "correct": 0} for call in CORPUS_CALLS}
+    mismatches: List[Dict[str, object]] = []
+
+    def record(call: str, item: Dict[str, object], target: str, expected: object, actual: object,
+               samples: List[float]) -> None:
+        durations[call].extend(samples)
+        if expected is None:
+            return
+        counts[call]["labelled"] += 1
+        if expected == actual:
+            counts[call]["correct"] += 1
+        else:
+            mismatches.append({
+                "frame": item["name"], "call": call, "target": target, "expected": expected, "actual": actual
+            })
+
+    for index, item in enumerate(corpus):
+        driver = ReplayDriver(item["png"], item["frame"], item["canvas"], item["dpr"], f"corpus-{index}")
+        labels = item["labels"]
+        screenshot = detector.decode_image(item["png"])
+        image_size = (screenshot.shape[1], screenshot.shape[0])
+        geometry = {**item["canvas"], "vw": image_size[0] / item["dpr"], "vh": image_size[1] / item["dpr"]}
+        canvas_size = detector._canvas_pixel_size(geometry, image_size)
+
+        for label_key, template_name in CORPUS_TEMPLATE_LABELS.items():
+            if not detector.can_detect(template_name):
+                continue
+            expected = labels.get(label_key)
+            if not detector.uses_luminance_detection(template_name):
+                template_path = detector.get_template_path(template_name)
+                result, samples = measure_call(
+                    lambda: detector.match_template(screenshot, template_path, threshold, canvas_size=canvas_size),
+                    iterations
+                )
+                record("match_template", item, template_name, expected, result is not None, samples)
+            result, samples = measure_call(
+                lambda: detector.detect_in_browser(driver, template_name, threshold), iterations
+            )
+            record("detect_in_browser", item, template_name, expected, result is not None, samples)
+
+        expected_amount = labels.get("betsize")
+        expected_amount = float(expected_amount) if expected_amount is not None else None
+        amount, samples = measure_call(
+            lambda: detector.get_current_betsize(driver, retry_count=1, silent=True), iterations
+        )
+        record("get_current_betsize", item, "betsize", expected_amount, amount, samples)
+
+        screenshot_gray = detector.decode_image(item["png"], grayscale=True)
+        crop_region = detector._get_betsize_crop_region(driver, image_size, margin_multiplier=2.0)
+        if crop_region is not None:
+            left, top, right, bottom = crop_region
+            screenshot_gray = screenshot_gray[top:bottom, left:right]
+        (text, _), samples = measure_call(lambda: detector._compare_betsize_images(screenshot_gray), iterations)
+        record("_compare_betsize_images", item, "betsize", expected_amount,
+               float(text) if text is not None else None, samples)
+
+    stats: Dict[str, Dict[str, object]] = {}
+    for call in CORPUS_CALLS:
+        if not durations[call]:
+            continue
+        latency = summarize(durations[call])
+        labelled, correct = counts[call]["labelled"], counts[call]["correct"]
+        stats[call] = {
+            "samples": len(durations[call]),
+            "latency_ms": {key: round(value, 4) for key, value in latency.items()},
+            "throughput_per_s": round(1000.0 / latency["mean"], 2) if latency["mean"] > 0 else None,
+            "labelled": labelled,
+            "correct": correct,
+            "accuracy": round(correct / labelled, 4) if labelled else None,
+        }
+    return stats, mismatches
+
+
+def compare_corpus_results(stats: Dict[str, Dict[str, object]], baseline_path: Path) -> bool:
+    """與先前的結果檔比較，列出 p50 耗時與正確率變化，回傳正確率是否下降"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    print()
+    print(f"  與 {baseline_path.name}（{baseline.get('tag') or baseline.get('created')}）比較")
+    regressed = False
+    for call, current in stats.items():
+        previous = baseline.get("calls", {}).get(call)
+        if previous is None:
+            continue
+        p50, previous_p50 = current["latency_ms"]["p50"], previous["latency_ms"]["p50"]
+        change = (p50 - previous_p50) / previous_p50 if previous_p50 else 0.0
+        accuracy, previous_accuracy = current["accuracy"], previous.get("accuracy")
+        accuracy_text = "-"
+        if accuracy is not None and previous_accuracy is not None:
+            accuracy_text = f"{previous_accuracy:.1%} → {accuracy:.1%}"
+            if accuracy < previous_accuracy:
+                regressed = True
+                accuracy_text += "  ✗ 正確率下降"
+        print(f"  {call:<26} p50 {previous_p50:8.2f} → {p50:8.2f} ms ({change:+.0%})   正確率 {accuracy_text}")
+    return regressed
+
+
+def run_corpus_benchmark(
+    corpus_dir: Optional[Path],
+    templates_dir: Optional[Path],
+    iterations: int,
+    threshold: float,
+    output_path: Optional[Path],
+    baseline_path: Optional[Path],
+    tag: str
+) -> int:
+    """以已標註的截圖語料量測 ImageDetector 各呼叫的耗時與正確率"""
+    logger = LoggerFactory.get_logger()
+    detector = ImageDetector(logger)
+    temp_dir: Optional[tempfile.TemporaryDirectory] = None
+
+    if corpus_dir is None:
+        temp_dir = tempfile.TemporaryDirectory()
+        root = Path(temp_dir.name)
+        (root / "corpus").mkdir()
+        build_synthetic_corpus(root / "corpus", root)
+        corpus_dir, templates_dir = root / "corpus", root
+        source_name = "synthetic"
+    else:
+        if not (corpus_dir / CORPUS_LABELS_FILE).exists():
+            write_corpus_skeleton(corpus_dir)
+            print(f"已建立標註檔範本 {corpus_dir / CORPUS_LABELS_FILE}，填入預期結果後重新執行")
+            return 1
+        source_name = str(corpus_dir)
+
+    if templates_dir is not None:
+        detector.image_dir = templates_dir
+        detector.betsize_bank = BetSizeTemplateBank(templates_dir / Constants.BETSIZE_TEMPLATE_DIR, logger)
+        detector.betsize_reader = BetSizeGlyphReader(detector.betsize_bank, logger)
+
+    try:
+        corpus = load_corpus(corpus_dir)
+        print_step("語料", f"{source_name}（{len(corpus)} 張，模板 {detector.image_dir}，每項 {iterations} 次）")
+        if not corpus:
+            print("  ✗ 沒有可用的截圖")
+            return 1
+
+        stats, mismatches = evaluate_corpus(detector, corpus, iterations, threshold)
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+    for call, call_stats in stats.items():
+        latency = call_stats["latency_ms"]
+        accuracy = call_stats["accuracy"]
+        print(
+            f"  {call:<26} p50 {latency['p50']:8.2f} ms   p95 {latency['p95']:8.2f} ms   "
+            f"p99 {latency['p99']:8.2f} ms   {call_stats['throughput_per_s'] or 0:8.1f} 次/秒   "
+            f"正確 {call_stats['correct']}/{call_stats['labelled']}"
+            + (f" ({accuracy:.1%})" if accuracy is not None else "")
+        )
+    for mismatch in mismatches:
+        print(
+            f"    ✗ {mismatch['frame']} {mismatch['call']} {mismatch['target']}: "
+            f"預期 {mismatch['expected']}，結果 {mismatch['actual']}"
+        )
+
+    results = {
+        "tag": tag,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "corpus": source_name,
+        "frames": len(corpus),
+        "iterations": iterations,
+        "environment": {
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "cpu_count": os.cpu_count(),
+        },
+        "settings": {
+            "threshold": threshold,
+            "BLACKSCREEN_DETECTION_MODE": Constants.BLACKSCREEN_DETECTION_MODE,
+            "BETSIZE_READ_MODE": Constants.BETSIZE_READ_MODE,
+            "VISION_COMPUTE_SLOTS": Constants.VISION_COMPUTE_SLOTS,
+        },
+        "calls": stats,
+        "mismatches": mismatches,
+    }
+    if output_path is not None:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print()
+        print(f"  結果已儲存: {output_path}")
+
+    if baseline_path is not None and compare_corpus_results(stats, baseline_path):
+        return 1
+    return 0
+
+
+# =============================================================================
+# 主程式
+# =============================================================================
+
+def main() -> int:
+    """主函式"""
+    parser = argparse.ArgumentParser(description="圖片檢測效能基準測試")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    decode_parser = subparsers.add_parser("decode", help="截圖解碼路徑比較")
+    decode_parser.add_argument("-n", "--iterations", type=int, default=DEFAULT_ITERATIONS)
+
+    formats_parser = subparsers.add_parser("formats", help="截圖格式準確度報告")
+    formats_parser.add_argument("--frames", type=Path, default=None, help="已存截圖資料夾（PNG）")
+    formats_parser.add_argument(
+        "--formats", default=",".join(DEFAULT_FORMAT_SPECS), help="以逗號分隔的格式清單"
+    )
+    formats_parser.add_argument("--threshold", type=float, default=Constants.MATCH_THRESHOLD)
+
+    betsize_parser = subparsers.add_parser("betsize", help="金額識別方式比較")
+    betsize_parser.add_argument("--crops", type=Path, default=None, help="金額截圖資料夾（灰階 PNG）")
+    betsize_parser.add_argument("--templates", type=Path, default=None, help="金額模板資料夾（預設 img/bet_size）")
+    betsize_parser.add_argument("-n", "--iterations", type=int, default=5)
+
+    pyramid_parser = subparsers.add_parser("pyramid", help="金字塔比對比較")
+    pyramid_parser.add_argument("--frames", type=Path, default=None, help="已存截圖資料夾（PNG）")
+    pyramid_parser.add_argument("-n", "--iterations", type=int, default=5)
+    pyramid_parser.add_argument("--threshold", type=float, default=Constants.MATCH_THRESHOLD)
+
+    pool_parser = subparsers.add_parser("pool", help="視覺處理程序池比較")
+    pool_parser.add_argument("--browsers", type=int, default=16, help="同時檢測的瀏覽器數")
+    pool_parser.add_argument("--workers", type=int, default=0, help="工作程序數（0 表示 CPU 核心數）")
+    pool_parser.add_argument("--size", choices=list(BENCHMARK_FRAME_SIZES), default="600x400")
+    pool_parser.add_argument("-n", "--rounds", type=int, default=10)
+    pool_parser.add_argument("--threshold", type=float, default=Constants.MATCH_THRESHOLD)
+
+    budget_parser = subparsers.add_parser("budget", help="同時運算上限比較")
+    budget_parser.add_argument("--browsers", type=int, default=16, help="同時檢測的瀏覽器數")
+    budget_parser.add_argument(
+        "--slots", default="1,2,4,0", help="以逗號分隔的同時運算上限清單（0 表示 CPU 核心數）"
+    )
+    budget_parser.add_argument("--size", choices=list(BENCHMARK_FRAME_SIZES), default="600x400")
+    budget_parser.add_argument("-n", "--rounds", type=int, default=10)
+    budget_parser.add_argument("--threshold", type=float, default=Constants.MATCH_THRESHOLD)
+
+    corpus_parser = subparsers.add_parser("corpus", help="檢測語料重播")
+    corpus_parser.add_argument("--corpus", type=Path, default=None, help="截圖語料資料夾（含 labels.json）")
+    corpus_parser.add_argument("--templates", type=Path, default=None, help="模板資料夾（預設 img）")
+    corpus_parser.add_argument("-n", "--iterations", type=int, default=5)
+    corpus_parser.add_argument("--threshold", type=float, default=Constants.MATCH_THRESHOLD)
+    corpus_parser.add_argument("--output", type=Path, default=None, help="結果檔路徑（JSON）")
+    corpus_parser.add_argument("--compare", type=Path, default=None, help="比較用的先前結果檔")
+    corpus_parser.add_argument("--tag", default="", help="結果檔中的版本標記")
+
+    network_parser = subparsers.add_parser("network", help="網路狀態規則離線重播")
+    network_parser.add_argument("--log", type=Path, required=True, help="網路訊息記錄檔（.jsonl）")
+    network_parser.add_argument(
+        "--rules", type=Path, default=Path(Constants.DEFAULT_LIB_PATH) / Constants.DEFAULT_NETWORK_RULES_FILE,
+        help="網路狀態規則檔"
+    )
+    network_parser.add_argument("-n", "--iterations", type=int, default=DEFAULT_ITERATIONS)
+    network_parser.add_argument("--threshold", type=float, default=Constants.MATCH_THRESHOLD)
+
+    tasks_parser = subparsers.add_parser("tasks", help="瀏覽器任務佇列吞吐量與延遲")
+    tasks_parser.add_argument("--browsers", type=int, default=16, help="瀏覽器數")
+    tasks_parser.add_argument("--callers", type=int, default=2, help="每個瀏覽器同時提交任務的呼叫者數")
+    tasks_parser.add_argument("-n", "--tasks", type=int, default=50, help="每個呼叫者提交的任務數")
+    tasks_parser.add_argument("--work-ms", type=float, default=1.0, help="每個任務的模擬執行時間（毫秒）")
+
+    args = parser.parse_args()
+
+    if args.command == "decode":
+        run_decode_benchmark(args.iterations)
+    elif args.command == "formats":
+        run_format_report(
+            args.frames,
+            [spec.strip() for spec in args.formats.split(",") if spec.strip()],
+            args.threshold
+        )
+    elif args.command == "betsize":
+        run_betsize_benchmark(args.crops, args.templates, args.iterations)
+    elif args.command == "pyramid":
+        run_pyramid_benchmark(args.frames, args.iterations, args.threshold)
+    elif args.command == "pool":
+        run_pool_benchmark(args.browsers, args.workers, args.rounds, args.size, args.threshold)
+    elif args.command == "budget":
+        run_budget_benchmark(
+            args.browsers,
+            [int(slots) for slots in args.slots.split(",") if slots.strip()],
+            args.rounds, args.size, args.threshold
+        )
+    elif args.command == "corpus":
+        return run_corpus_benchmark(
+            args.corpus, args.templates, args.iterations, args.threshold, args.output, args.compare, args.tag
+        )
+    elif args.command == "network":
+        run_network_replay(args.log, args.rules, args.iterations, args.threshold)
+    elif args.command == "tasks":
+        run_task_queue_benchmark(args.browsers, args.callers, args.tasks, args.work_ms)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())